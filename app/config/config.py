@@ -13,4 +13,47 @@ SECRET_KEY = os.getenv("secret_key")
 
 # Supabase Storage
 SUPABASE_URL = os.getenv("supabase_url")
-SUPABASE_SERVICE_KEY = os.getenv("supabase_service_key")
\ No newline at end of file
+SUPABASE_SERVICE_KEY = os.getenv("supabase_service_key")
+# Idempotency-Key responses are replayed for this many seconds
+IDEMPOTENCY_TTL = int(os.getenv("idempotency_ttl", "86400"))
+
+# Rate limiting: "memory" (per worker) or "shared" (shared memory, all workers on the host)
+RATE_LIMIT_BACKEND = os.getenv("rate_limit_backend", "memory")
+RATE_LIMIT_SHM_NAME = os.getenv("rate_limit_shm_name", "todo_rate_limit")
+# Number of reverse proxies in front of the app that append to X-Forwarded-For
+TRUSTED_PROXIES = int(os.getenv("trusted_proxies", "0"))
+
+# Logging: level, "json" or "rich" output, sampling of repeated errors (records per call site and window)
+LOG_LEVEL = os.getenv("log_level", "INFO")
+LOG_FORMAT = os.getenv("log_format") or ("rich" if ENVIRONMENT == "develop" else "json")
+LOG_SAMPLE_LIMIT = int(os.getenv("log_sample_limit", "10"))
+LOG_SAMPLE_WINDOW = float(os.getenv("log_sample_window", "60"))
+
+# Request profiler: share of requests profiled (0.001 = 0.1%), sampling interval,
+# output directory and lifetime of signed X-Debug-Profile tokens
+PROFILE_SAMPLE_RATE = float(os.getenv("profile_sample_rate", "0"))
+PROFILE_INTERVAL = float(os.getenv("profile_interval", "0.005"))
+PROFILE_DIR = os.getenv("profile_dir", os.path.join(os.getenv("TMPDIR", "/tmp"), "todo_profiles"))
+PROFILE_TOKEN_TTL = int(os.getenv("profile_token_ttl", "3600"))
+PROFILE_MAX_FILES = int(os.getenv("profile_max_files", "500"))
+
+# Tracing: exporter ("" = off, "file" = OTLP/JSON lines in trace_file, "otlp" = POST to trace_endpoint)
+SERVICE_NAME = os.getenv("service_name", "todo-app-backend")
+TRACE_EXPORTER = os.getenv("trace_exporter", "")
+TRACE_FILE = os.getenv("trace_file", os.path.join(os.getenv("TMPDIR", "/tmp"), "todo_traces.jsonl"))
+TRACE_ENDPOINT = os.getenv("trace_endpoint", "http://localhost:4318/v1/traces")
+TRACE_SAMPLE_RATE = float(os.getenv("trace_sample_rate", "1.0"))
+
+# Entity cache of repositories with a cache_ttl: entries kept per worker (0 = off)
+# in front of the shared tier it needs (off without one): "redis://host:6379/0"
+# (needs the redis package) or, for the workers of one host,
+# "shm://todo_cache?slots=32768&slot_size=2048"
+ENTITY_CACHE_SIZE = int(os.getenv("entity_cache_size", "10000"))
+CACHE_URL = os.getenv("cache_url", "")
+
+# Threads per worker reloading cache entries before or after they go stale
+CACHE_REFRESH_THREADS = int(os.getenv("cache_refresh_threads", "2"))
+
+# Versioned response cache of per-user list endpoints, seconds (0 = off). Needs
+# the shared tier, which holds the generations every worker checks
+RESPONSE_CACHE_TTL = int(os.getenv("response_cache_ttl", "30"))
@@ -1,7 +1,34 @@
-from spectree import SpecTree, SecurityScheme, Response
+from spectree import SpecTree, SecurityScheme, SecuritySchemeData, Response
 from spectree.plugins.falcon_plugin import FalconPlugin
 
-api_spec = SpecTree(
+
+class LazySpecTree(SpecTree):
+    """
+    SpecTree that builds the JSON schemas of the models with the OpenAPI
+    document. SpecTree generates one per model as each route is decorated,
+    which is most of the import time of the resources, while they are only
+    read by the document, served in develop only.
+
+    Overrides private SpecTree methods: spectree is pinned in requirements.txt
+    and tests/test_startup.py checks the document matches SpecTree's own.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._pending_models = []
+        super().__init__(*args, **kwargs)
+
+    def _add_model(self, model, mode="validation"):
+        self._pending_models.append((model, mode))
+        return self.naming_strategy(model)
+
+    def _generate_spec(self):
+        pending, self._pending_models = self._pending_models, []
+        for model, mode in pending:
+            super()._add_model(model, mode)
+        return super()._generate_spec()
+
+
+api_spec = LazySpecTree(
     "falcon",
     backend=FalconPlugin,
     title="Todo App API",
@@ -10,11 +37,7 @@ api_spec = SpecTree(
     security_schemes=[
         SecurityScheme(
             name="jwt",
-            data={
-                "type": "http",
-                "scheme": "bearer",
-                "bearerFormat": "JWT"
-            }
+            data=SecuritySchemeData(type="http", scheme="bearer", bearer_format="JWT")
         )
     ],
     security=[
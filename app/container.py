@@ -37,6 +37,12 @@ class ServiceContainer:
         
         return cls._instances[key]
     
+    @classmethod
+    def discard(cls, key: str):
+        """Drop an instance: the next get() creates a new one"""
+        with cls._lock:
+            cls._instances.pop(key, None)
+
     @classmethod
     def reset(cls):
         """Reset (untuk testing)"""
@@ -1,6 +1,8 @@
 from pony.orm import Database
 from app.config import config
 from app.utils.logger import logger
+from app.utils.metrics import instrument_database
+from app.utils.deadline import enforce_deadline
 
 _db = None
 
@@ -29,5 +31,13 @@ def init_db():
     import app.db.models
 
     db.generate_mapping(create_tables=False)
+    instrument_database(db)
+    enforce_deadline(db)
 
     logger.info("[DB] Pony ORM initialized")
+
+
+def disconnect_db():
+    """Close this thread's connection, e.g. in the gunicorn master before it forks workers."""
+    if _db is not None:
+        _db.disconnect()
@@ -3,13 +3,14 @@ from datetime import datetime, timezone
 from pony.orm import Required, Optional, PrimaryKey, Set, Json
 from app.db.database import dbcon
 from app.utils.enums import StatusTask, GroupRole
+from app.utils.uuid7 import uuid7
 
 db = dbcon()
 
 class UserDB(db.Entity):
     _table_ = "users"
     
-    id = PrimaryKey(uuid.UUID, default=uuid.uuid4)
+    id = PrimaryKey(uuid.UUID, default=uuid7)
     email = Required(str, unique=True)
     username = Optional(str, unique=True, nullable=True)
     password = Required(str)
@@ -27,9 +28,13 @@ class UserDB(db.Entity):
 class GroupDB(db.Entity):
     _table_ = "groups"
     
-    id = PrimaryKey(uuid.UUID, default=uuid.uuid4)
+    id = PrimaryKey(uuid.UUID, default=uuid7)
     name = Required(str)
     
+    # denormalized, maintained by GroupService
+    member_count = Required(int, default=0)
+    pending_count = Required(int, default=0)
+    
     created_at = Required(datetime, default=lambda: datetime.now(timezone.utc))
     
     # relasi
@@ -68,7 +73,7 @@ class GroupMemberDB(db.Entity):
 class TaskDB(db.Entity):
     _table_ = "tasks"
     
-    id = PrimaryKey(uuid.UUID, default=uuid.uuid4)
+    id = PrimaryKey(uuid.UUID, default=uuid7)
     title = Required(str)
     description = Optional(str, default="")
     due_date = Optional(datetime)
@@ -82,3 +87,29 @@ class TaskDB(db.Entity):
     # relasi
     assigned_to = Optional(UserDB, column="assigned_to_id", reverse="tasks")
     group = Optional(GroupDB, column="group_id", reverse="tasks")
+
+
+class TaskCounterDB(db.Entity):
+    _table_ = "task_counters"
+
+    scope = Required(str)
+    scope_id = Required(uuid.UUID)
+    status = Required(str)
+    count = Required(int, default=0)
+
+    PrimaryKey(scope, scope_id, status)
+
+
+class IdempotencyKeyDB(db.Entity):
+    _table_ = "idempotency_keys"
+
+    scope = Required(str)  # user id ("" for unauthenticated requests)
+    key = Required(str)
+    fingerprint = Required(str)
+    status = Optional(str, nullable=True)  # None until the first request completes
+    response = Optional(Json, nullable=True)
+
+    created_at = Required(datetime, default=lambda: datetime.now(timezone.utc))
+    expires_at = Required(datetime)
+
+    PrimaryKey(scope, key)
@@ -0,0 +1,64 @@
+"""
+Reconcile denormalized counters with their source tables and purge expired
+idempotency keys.
+
+Usage:
+    python -m app.jobs.reconcile_counters                 # run once
+    python -m app.jobs.reconcile_counters --interval 900  # run every 15 minutes
+"""
+import argparse
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from pony.orm import db_session
+from app.container import ServiceContainer
+from app.db.database import init_db
+from app.registry.service_registry import register_services
+from app.utils.enums import EntityType
+from app.utils.logger import logger
+
+
+def run_once():
+    with db_session:
+        task_drift = ServiceContainer.get(EntityType.TASK_COUNTER).reconcile()
+
+    with db_session:
+        group_drift = ServiceContainer.get(EntityType.GROUP).reconcile_member_counts()
+
+    logger.info(
+        f"[COUNTERS] Reconciled task counters ({task_drift} corrected) "
+        f"and group member counts ({group_drift} corrected)"
+    )
+
+    with db_session:
+        purged = ServiceContainer.get(EntityType.IDEMPOTENCY_KEY).purge_expired()
+
+    logger.info(f"[IDEMPOTENCY] Purged {purged} expired keys")
+    return task_drift + group_drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile denormalized counters")
+    parser.add_argument("--interval", type=int, default=0, help="Seconds between runs (0 = run once)")
+    args = parser.parse_args()
+
+    register_services()
+    init_db()
+
+    while True:
+        try:
+            run_once()
+        except Exception:
+            logger.exception("[COUNTERS] Reconciliation failed")
+            if not args.interval:
+                raise
+
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
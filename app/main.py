@@ -1,5 +1,4 @@
 import falcon
-from falcon_multipart.middleware import MultipartMiddleware
 from dotenv import load_dotenv
 
 # Load environment variables from .env
@@ -13,7 +12,15 @@ from app.routes.core import register_routes
 from app.db.database import init_db
 from app.middlewares.pony_db_session_middleware import PonyDbSessionMiddleware
 from app.middlewares.jwt_middleware import JWTMiddleware
+from app.middlewares.request_id_middleware import RequestIdMiddleware
+from app.middlewares.metrics_middleware import MetricsMiddleware
+from app.middlewares.profiler_middleware import ProfilerMiddleware
+from app.middlewares.tracing_middleware import TracingMiddleware
 from app.middlewares.cors_middleware import CORSMiddleware
+from app.middlewares.admission_middleware import AdmissionMiddleware
+from app.middlewares.rate_limit_middleware import RateLimitMiddleware
+from app.middlewares.multipart_middleware import MultipartMiddleware
+from app.middlewares.idempotency_middleware import IdempotencyMiddleware
 from app.registry.service_registry import register_services
 
 
@@ -25,10 +32,17 @@ def create_app():
     init_db()
 
     app = falcon.App(middleware=[
+        RequestIdMiddleware(),
+        MetricsMiddleware(),
+        ProfilerMiddleware(),
+        TracingMiddleware(),
         CORSMiddleware(),
+        AdmissionMiddleware(),
         JWTMiddleware(),
+        RateLimitMiddleware(),
         PonyDbSessionMiddleware(),
-        MultipartMiddleware()
+        MultipartMiddleware(),
+        IdempotencyMiddleware()
     ])
 
     register_error_handlers(app) # Register error handlers
@@ -0,0 +1,88 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from app.utils.deadline import set_deadline
+from app.utils.http_exceptions import service_unavailable
+from app.utils.logger import logger
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    limit: int       # concurrent requests per worker process
+    max_wait: float  # seconds a request may queue for a slot
+    timeout: float   # total seconds before the client is assumed to give up
+
+
+# Sized for `--threads 8`: no class can take every thread of a worker
+ROUTE_CLASSES = {
+    "auth": RouteClass("auth", limit=2, max_wait=2.0, timeout=10.0),
+    "read": RouteClass("read", limit=6, max_wait=1.0, timeout=10.0),
+    "write": RouteClass("write", limit=4, max_wait=2.0, timeout=15.0),
+    "upload": RouteClass("upload", limit=2, max_wait=2.0, timeout=60.0),
+}
+
+EXEMPT_PATHS = ("/health", "/metrics")
+
+
+class AdmissionMiddleware:
+    """
+    Per-route-class concurrency limits with bounded queueing.
+
+    A request waits at most `max_wait` seconds (and never past its deadline)
+    for a slot of its class, otherwise it is shed with 503 + Retry-After. The
+    deadline is the class timeout, shortened by an `X-Request-Timeout` header,
+    and is applied to Postgres as a statement timeout by the first statement
+    of the request (utils/deadline.py), if any.
+
+    Must come before PonyDbSessionMiddleware so queued requests don't hold a
+    db_session, and its slot is released only after the session is closed.
+    """
+
+    def __init__(self, route_classes=None):
+        self.route_classes = route_classes or ROUTE_CLASSES
+        self.slots = {
+            name: threading.BoundedSemaphore(route_class.limit)
+            for name, route_class in self.route_classes.items()
+        }
+
+    def classify(self, req) -> RouteClass:
+        if req.path.startswith("/api/auth/"):
+            return self.route_classes["auth"]
+        if req.method in ("GET", "HEAD"):
+            return self.route_classes["read"]
+        if req.content_type and req.content_type.startswith("multipart/form-data"):
+            return self.route_classes["upload"]
+        return self.route_classes["write"]
+
+    def process_request(self, req, resp):
+        if req.method == "OPTIONS" or req.path in EXEMPT_PATHS:
+            return
+
+        route_class = self.classify(req)
+        timeout = route_class.timeout
+        client_timeout = req.get_header("X-Request-Timeout")
+        if client_timeout:
+            try:
+                timeout = min(timeout, max(float(client_timeout), 0.0))
+            except ValueError:
+                pass
+
+        started = time.monotonic()
+        if not self.slots[route_class.name].acquire(timeout=min(route_class.max_wait, timeout)):
+            logger.warning(f"[ADMISSION] Shedding {req.method} {req.path} ({route_class.name} limit reached)")
+            service_unavailable(retry_after=math.ceil(route_class.max_wait))
+
+        req.context["admission_class"] = route_class.name
+        set_deadline(timeout - (time.monotonic() - started))
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        name = req.context.get("admission_class")
+        if name is None:
+            return
+
+        set_deadline(None)
+        self.slots[name].release()
+        req.context["admission_class"] = None
@@ -19,7 +19,7 @@ class CORSMiddleware:
 
         resp.set_header(
             "Access-Control-Allow-Headers",
-            "Authorization, Content-Type"
+            "Authorization, Content-Type, Idempotency-Key, X-Request-Timeout, X-Request-ID, X-Debug-Profile, traceparent"
         )
         resp.set_header(
             "Access-Control-Allow-Methods",
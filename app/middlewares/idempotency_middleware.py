@@ -0,0 +1,73 @@
+import hashlib
+import json
+import falcon
+
+from app.container import ServiceContainer
+from app.utils.enums import EntityType
+from app.utils.http_exceptions import bad_request
+
+
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH")
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMiddleware:
+    """
+    Replay the stored response of POST/PUT/PATCH requests retried with the same
+    `Idempotency-Key` header.
+
+    Must come after PonyDbSessionMiddleware: the key is claimed, the request
+    handled and its response stored in the same transaction, so a failed
+    request releases the key and a concurrent duplicate waits for the first
+    one to commit.
+    """
+
+    @property
+    def service(self):
+        return ServiceContainer.get(EntityType.IDEMPOTENCY_KEY)
+
+    def process_resource(self, req, resp, resource, params):
+        if req.method not in IDEMPOTENT_METHODS:
+            return
+
+        key = req.get_header("Idempotency-Key")
+        if not key:
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            bad_request(msg=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+
+        # Keys are per user; public endpoints share the anonymous scope
+        scope = str((req.context.get("user") or {}).get("id", ""))
+
+        stored = self.service.begin(scope, key, self.fingerprint(req))
+        if stored is None:
+            req.context["idempotency_key"] = (scope, key)
+            return
+
+        resp.status, resp.media = stored
+        resp.set_header("Idempotent-Replayed", "true")
+        resp.complete = True
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        claim = req.context.get("idempotency_key")
+        if not claim or not req_succeeded:
+            return
+
+        self.service.finish(*claim, falcon.code_to_http_status(resp.status), resp.media)
+
+    @staticmethod
+    def fingerprint(req) -> str:
+        """Hash of what makes two requests the same: method, URL and body."""
+        digest = hashlib.sha256(f"{req.method} {req.path}?{req.query_string}".encode())
+
+        if req.content_type and req.content_type.startswith("application/json"):
+            media = req.get_media(default_when_empty=None)
+            digest.update(json.dumps(media, sort_keys=True, separators=(",", ":")).encode())
+        elif "multipart_parts" in req.context:
+            # Multipart bodies are already consumed by MultipartMiddleware, and
+            # their boundary changes on every retry: hash the parts it described
+            digest.update(json.dumps(req.context["multipart_parts"], separators=(",", ":")).encode())
+        else:
+            digest.update(f"{req.content_type}:{req.content_length}".encode())
+
+        return digest.hexdigest()
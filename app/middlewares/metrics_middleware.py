@@ -0,0 +1,27 @@
+import time
+
+from app.utils.metrics import REQUEST_LATENCY, REQUESTS, REQUESTS_IN_FLIGHT
+
+
+class MetricsMiddleware:
+    """
+    Per-route latency histograms, status code counts and in-flight requests.
+
+    Routes are labelled by their URI template (e.g. /api/user/tasks/{id}) so ids
+    don't create new series; requests that match no route share "unmatched".
+    Comes right after RequestIdMiddleware so admission waits are measured too.
+    """
+
+    def process_request(self, req, resp):
+        req.context["metrics_started"] = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        started = req.context.get("metrics_started")
+        if started is None:
+            return
+
+        REQUESTS_IN_FLIGHT.dec()
+        route = req.uri_template or "unmatched"
+        REQUEST_LATENCY.labels(route, req.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(route, req.method, str(resp.status_code)).inc()
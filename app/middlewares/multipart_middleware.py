@@ -0,0 +1,53 @@
+import hashlib
+import falcon
+from falcon_multipart.middleware import MultipartMiddleware as BaseMultipartMiddleware
+
+
+class MultipartMiddleware(BaseMultipartMiddleware):
+    """
+    Parse `multipart/form-data` bodies into request params (falcon_multipart),
+    and describe each part in `req.context["multipart_parts"]`: name, filename,
+    size and SHA-256 of the content.
+
+    The body itself can't identify a request: its boundary is new on every
+    send, so a retry of the same upload has a different body. The parts are
+    what IdempotencyMiddleware fingerprints instead.
+    """
+
+    def process_request(self, req, resp, **kwargs):
+        if "multipart/form-data" not in (req.content_type or ""):
+            return
+
+        # This must be done to avoid a bug in cgi.FieldStorage
+        req.env.setdefault("QUERY_STRING", "")
+
+        stream = req.stream.stream if hasattr(req.stream, "stream") else req.stream
+        try:
+            form = self.parse(stream=stream, environ=req.env)
+        except ValueError as e:  # Invalid boundary?
+            raise falcon.HTTPBadRequest(title="Error parsing file", description=str(e))
+
+        parts = []
+        for name in form:
+            value = self.parse_field(form[name])
+            req._params[name] = value
+            for field in value if isinstance(value, list) else [value]:
+                parts.append(self.describe(name, field))
+
+        req.context["multipart_parts"] = sorted(parts)
+
+    @staticmethod
+    def describe(name: str, field) -> tuple:
+        """(name, filename, size, sha256) of a part; filename is "" for plain fields."""
+        digest = hashlib.sha256()
+        if getattr(field, "filename", None):
+            size = 0
+            for chunk in iter(lambda: field.file.read(1 << 16), b""):
+                digest.update(chunk)
+                size += len(chunk)
+            field.file.seek(0)
+            return name, field.filename, size, digest.hexdigest()
+
+        data = field.encode() if isinstance(field, str) else bytes(field)
+        digest.update(data)
+        return name, "", len(data), digest.hexdigest()
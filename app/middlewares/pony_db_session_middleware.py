@@ -1,4 +1,6 @@
 from pony.orm import db_session, OptimisticCheckError
+from app.utils.entity_cache import begin_transaction, end_transaction
+from app.utils.response_cache import defer_bumps, flush_bumps
 from app.utils.logger import logger
 
 class PonyDbSessionMiddleware:
@@ -8,6 +10,8 @@ class PonyDbSessionMiddleware:
             return  # ⛔ jangan buka db_session
         
         # open transaction
+        begin_transaction()
+        defer_bumps()
         db_session.__enter__()
 
     def process_response(self, req, resp, resource, req_succeeded):
@@ -24,5 +28,8 @@ class PonyDbSessionMiddleware:
             # Object has been deleted — no need to raise, operation succeeded
             logger.warning(f"OptimisticCheckError (ignored): {e}")
         except Exception:
-            logger.exception("Error closing db_session")
+            logger.exception("Error closing db_session", extra={"boundary": True})
             raise
+        finally:
+            end_transaction()
+            flush_bumps()
@@ -0,0 +1,47 @@
+import random
+
+from app.config.config import PROFILE_SAMPLE_RATE
+from app.utils.logger import logger
+from app.utils.profiler import start_profile, stop_profile, save_profile, verify_profile_token
+
+
+class ProfilerMiddleware:
+    """
+    Profile a request with the sampling profiler when it carries a valid signed
+    `X-Debug-Profile` header (python -m app.utils.profiler token), or at random
+    for a `profile_sample_rate` share of requests. Unprofiled requests only pay
+    for one random() call.
+
+    Requested profiles return their file name in `X-Profile-Id`.
+    """
+
+    def process_request(self, req, resp):
+        token = req.get_header("X-Debug-Profile")
+        requested = bool(token) and verify_profile_token(token)
+        if not requested and not (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE):
+            return
+
+        req.context["profile"] = start_profile()
+        req.context["profile_requested"] = requested
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        profile = req.context.get("profile")
+        if profile is None:
+            return
+
+        stop_profile(profile)
+        req.context["profile"] = None
+        try:
+            name = save_profile(
+                profile,
+                route=req.uri_template or "unmatched",
+                method=req.method,
+                status=resp.status_code,
+                request_id=req.context.get("request_id", ""),
+            )
+        except OSError as e:
+            logger.warning(f"[PROFILER] Could not save profile: {e}")
+            return
+
+        if req.context.get("profile_requested"):
+            resp.set_header("X-Profile-Id", name)
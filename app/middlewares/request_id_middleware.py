@@ -0,0 +1,30 @@
+import re
+import uuid
+import falcon
+
+from app.utils.logger import begin_request, end_request
+
+
+# Accept client/proxy ids that are safe to echo and log
+REQUEST_ID_PATTERN = re.compile(r"^[\w.:-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """
+    Give every request an id (the incoming `X-Request-ID` when valid), attach
+    it to every log record of the request and return it in `X-Request-ID`.
+
+    Must come first, so every other middleware logs with the id.
+    """
+
+    def process_request(self, req, resp):
+        request_id = req.get_header("X-Request-ID")
+        if not request_id or not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        req.context["request_id"] = request_id
+        resp.set_header("X-Request-ID", request_id)
+        begin_request(request_id)
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        end_request(ignore=(falcon.HTTPError,))
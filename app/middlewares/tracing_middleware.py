@@ -0,0 +1,51 @@
+from app.utils.tracing import TRACING_ENABLED, SPAN_KIND_SERVER, STATUS_ERROR, open_span, close_span
+
+
+class TracingMiddleware:
+    """
+    Root span per request (continuing an incoming W3C `traceparent`) and a
+    child span around the resource responder. Service, repository and storage
+    spans nest below it (utils/tracing.py). The trace id is returned in
+    `X-Trace-Id`.
+    """
+
+    def process_request(self, req, resp):
+        if not TRACING_ENABLED:
+            return
+
+        span, token = open_span(
+            f"{req.method}",
+            kind=SPAN_KIND_SERVER,
+            attributes={"http.request.method": req.method, "url.path": req.path},
+            traceparent=req.get_header("traceparent"),
+        )
+        req.context["trace_span"] = (span, token)
+        if span.sampled:
+            resp.set_header("X-Trace-Id", span.trace_id)
+
+    def process_resource(self, req, resp, resource, params):
+        if req.context.get("trace_span") is None or resource is None:
+            return
+
+        responder = f"{type(resource).__name__}.on_{req.method.lower()}"
+        req.context["trace_resource_span"] = open_span(responder, attributes={"app.layer": "resource"})
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        root = req.context.get("trace_span")
+        if root is None:
+            return
+
+        resource_span = req.context.get("trace_resource_span")
+        if resource_span is not None:
+            if not req_succeeded:
+                resource_span[0].status = STATUS_ERROR
+            close_span(*resource_span)
+
+        span, token = root
+        route = req.uri_template or "unmatched"
+        span.name = f"{req.method} {route}"
+        span.set_attribute("http.route", route)
+        span.set_attribute("http.response.status_code", resp.status_code)
+        if resp.status_code >= 500:
+            span.status = STATUS_ERROR
+        close_span(span, token)
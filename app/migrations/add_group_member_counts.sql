@@ -0,0 +1,26 @@
+BEGIN;
+
+-- =========================
+-- GROUP MEMBER COUNTS
+-- =========================
+-- Denormalized member counts, maintained by GroupService on write.
+-- member_count  = admins + members
+-- pending_count = join requests waiting for approval
+ALTER TABLE groups
+    ADD COLUMN IF NOT EXISTS member_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS pending_count INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill from existing memberships
+UPDATE groups g
+SET member_count = c.member_count,
+    pending_count = c.pending_count
+FROM (
+    SELECT group_id,
+           COUNT(*) FILTER (WHERE role <> 'pending') AS member_count,
+           COUNT(*) FILTER (WHERE role = 'pending') AS pending_count
+    FROM group_members
+    GROUP BY group_id
+) c
+WHERE c.group_id = g.id;
+
+COMMIT;
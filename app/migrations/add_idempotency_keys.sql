@@ -0,0 +1,27 @@
+BEGIN;
+
+-- =========================
+-- IDEMPOTENCY KEYS
+-- =========================
+-- Responses of POST/PUT/PATCH requests sent with an Idempotency-Key header,
+-- replayed when the same key is retried before expires_at.
+-- scope = id of the authenticated user ('' for public endpoints)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope VARCHAR(64) NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    fingerprint CHAR(64) NOT NULL,
+    status VARCHAR(64),
+    response JSON,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+
+    CONSTRAINT pk_idempotency_keys
+        PRIMARY KEY (scope, key)
+);
+
+-- Purge of expired keys (jobs/reconcile_counters.py)
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at
+    ON idempotency_keys (expires_at);
+
+COMMIT;
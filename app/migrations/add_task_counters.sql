@@ -0,0 +1,34 @@
+BEGIN;
+
+-- =========================
+-- TASK COUNTERS
+-- =========================
+-- Denormalized per-status task counts, maintained by TaskService on write.
+-- scope = 'group' -> scope_id is groups.id (group tasks)
+-- scope = 'user'  -> scope_id is users.id  (personal tasks, group_id IS NULL)
+CREATE TABLE IF NOT EXISTS task_counters (
+    scope VARCHAR(20) NOT NULL,
+    scope_id UUID NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+
+    CONSTRAINT pk_task_counters
+        PRIMARY KEY (scope, scope_id, status)
+);
+
+-- Backfill from existing tasks
+INSERT INTO task_counters (scope, scope_id, status, count)
+SELECT 'group', group_id, status, COUNT(*)
+FROM tasks
+WHERE NOT is_deleted AND group_id IS NOT NULL
+GROUP BY group_id, status
+ON CONFLICT (scope, scope_id, status) DO UPDATE SET count = EXCLUDED.count;
+
+INSERT INTO task_counters (scope, scope_id, status, count)
+SELECT 'user', assigned_to_id, status, COUNT(*)
+FROM tasks
+WHERE NOT is_deleted AND group_id IS NULL AND assigned_to_id IS NOT NULL
+GROUP BY assigned_to_id, status
+ON CONFLICT (scope, scope_id, status) DO UPDATE SET count = EXCLUDED.count;
+
+COMMIT;
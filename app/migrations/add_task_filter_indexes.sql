@@ -0,0 +1,29 @@
+BEGIN;
+
+-- =========================
+-- TASK FILTER / SORT INDEXES
+-- =========================
+-- Back the operator filters and sort fields whitelisted in
+-- TaskRepository.index_map (id and assigned_to_id are already indexed).
+-- Task lists are always scoped by assignee or group, so each index leads
+-- with the scope column, and every whitelisted field has an index under
+-- both scopes.
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to_created_at
+    ON tasks(assigned_to_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to_due_date
+    ON tasks(assigned_to_id, due_date);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to_status
+    ON tasks(assigned_to_id, status);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_group_created_at
+    ON tasks(group_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_group_due_date
+    ON tasks(group_id, due_date);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_group_status
+    ON tasks(group_id, status);
+
+COMMIT;
@@ -0,0 +1,23 @@
+BEGIN;
+
+-- =========================
+-- TASK SEARCH
+-- =========================
+-- Used by the `q` parameter of the task lists (TaskRepository):
+-- full-text match on title + description, trigram fuzzy/prefix match on title.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE tasks
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_search_vector
+    ON tasks USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_title_trgm
+    ON tasks USING GIN (lower(title) gin_trgm_ops);
+
+COMMIT;
@@ -9,6 +9,8 @@ from app.services.group_service import GroupService
 from app.services.group_member_service import GroupMemberService
 from app.services.task_service import TaskService
 from app.services.storage_service import StorageService
+from app.services.task_counter_service import TaskCounterService
+from app.services.idempotency_service import IdempotencyService
 
 
 def register_services():
@@ -18,5 +20,7 @@ def register_services():
     ServiceContainer.register(EntityType.GROUP_MEMBER, lambda: GroupMemberService())
     ServiceContainer.register(EntityType.TASK, lambda: TaskService())
     ServiceContainer.register(EntityType.STORAGE, lambda: StorageService())  # ← tambahkan
+    ServiceContainer.register(EntityType.TASK_COUNTER, lambda: TaskCounterService())
+    ServiceContainer.register(EntityType.IDEMPOTENCY_KEY, lambda: IdempotencyService())
     
     ServiceContainer.boot()
\ No newline at end of file
@@ -1,10 +1,114 @@
+import json
 import math
+import re
+import time
 import uuid
 from pony.orm import commit
-from typing import Type, Protocol, Optional
+from typing import Type, Protocol, Optional, get_args
 from pydantic import BaseModel
-from pony.orm import select, desc
+from pony.orm import select, desc, raw_sql, Json, db_session
 from app.utils.logger import logger
+from app.utils.metrics import record_cache
+from app.utils.entity_cache import EntityCache, ENTITY_CACHE_ENABLED
+from app.utils.tracing import trace_methods
+from app.utils.serializer import get_serializer
+from app.utils.other import parse_datetime
+
+
+# Bound value placeholder inside filter_map predicates
+_PARAM_RE = re.compile(r"(?<![\w.])v(?!\w)")
+
+# Compiled query plans, keyed by (entity, predicates, order_by, columns, rank)
+_query_plans = {}
+_query_plan_stats = {}
+
+# Column projections, keyed by (entity, response schema)
+_projections = {}
+
+# SQL alias of the `t` loop variable of query plans, keyed by entity
+_aliases = {}
+_ALIAS_RE = re.compile(r'\bFROM\s+"[^"]+"\s+"([^"]+)"')
+
+# Operators usable as `field[op]=value` on indexed fields
+_OPERATORS = {"eq": "==", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "in": "in"}
+
+
+def _compile_plan(entity_name, exprs, order_by=None, columns=None, rank=None):
+    conditions, params = [], []
+
+    def bind(expr):
+        if _PARAM_RE.search(expr):
+            name = f"p{len(params)}"
+            params.append(name)
+            expr = _PARAM_RE.sub(name, expr)
+        return expr
+
+    for expr in exprs:
+        conditions.append(f"({bind(expr)})")
+
+    if columns:
+        source = "select((" + ", ".join(f"t.{c}" for c in columns) + ",) for t in entity"
+    else:
+        source = "select(t for t in entity"
+    if conditions:
+        source += " if " + " and ".join(conditions)
+    source += ")"
+
+    if order_by:
+        terms = []
+        for term in order_by:
+            field_name = term.lstrip("-")
+            descending = term.startswith("-")
+            if columns:
+                # Tuple results are ordered by column position
+                position = columns.index(field_name) + 1
+                terms.append(str(-position if descending else position))
+            elif descending:
+                terms.append(f"desc(entity.{field_name})")
+            else:
+                terms.append(f"entity.{field_name}")
+        source += f".order_by({', '.join(terms)})"
+
+    if rank:
+        # Pony puts the latest order_by first, so relevance becomes the primary key
+        source += f".order_by({bind(rank)})"
+
+    if columns:
+        # Rows are unique by primary key; DISTINCT would also fail on JSON columns
+        source += ".without_distinct()"
+
+    code = f"def plan(entity, {', '.join(params)}):\n    return {source}\n"
+    namespace = {"select": select, "desc": desc, "raw_sql": raw_sql}
+    exec(compile(code, f"<query plan {entity_name}>", "exec"), namespace)
+
+    logger.debug(f"[QUERY PLAN] Compiled {entity_name}: {source}")
+    return namespace["plan"]
+
+
+def _get_plan(entity, exprs, order_by=None, columns=None, rank=None):
+    signature = (entity.__name__, exprs, order_by, columns, rank)
+
+    stats = _query_plan_stats.setdefault(entity.__name__, {"hits": 0, "misses": 0})
+    plan = _query_plans.get(signature)
+    record_cache("query_plan", plan is not None)
+    if plan is None:
+        stats["misses"] += 1
+        plan = _query_plans[signature] = _compile_plan(*signature)
+    else:
+        stats["hits"] += 1
+
+    return plan
+
+
+def _model_type(annotation):
+    """Find the pydantic model inside an annotation such as Optional[Model]."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _model_type(arg)
+        if model is not None:
+            return model
+    return None
 
 
 # -------------------------------
@@ -24,10 +128,22 @@ class BaseRepositoryProtocol(Protocol):
     def __init__(self, schema_class: Optional[Type[BaseModel]] = None): ...
     
     def entity_label(self) -> str: ...
+
+    def is_postgres(self) -> bool: ...
     
-    def apply_query_options(self, query, filters, order_by=None): ...
+    def build_query(self, filters, order_by=None, columns=None): ...
+
+    def plan_cache_stats(self) -> dict: ...
+
+    def validate_query(self, filters=None, order_by=None): ...
+
+    def get_projection(self, schema): ...
+
+    def fetch_projected(self, rows, columns, relations): ...
     
-    def get_by_id(self, id, to_model=False, schema_response=None): ...
+    def get_by_id(self, id, to_model=False, schema_response=None, cached=True): ...
+
+    def invalidate_cache(self, id): ...
     
     def get_all_with_filters_and_pagination(self, filters=None, page=1, limit=10, order_by="-created_at", to_model=False,  schema_response=None): ...
     
@@ -47,6 +163,10 @@ class BaseRepositoryProtocol(Protocol):
 
     def delete_with_filters(self, filters=None, soft_delete=True): ...
 
+    def execute_sql(self, sql: str, params: dict = None): ...
+
+    def update_returning(self, id, data: dict, conditions=(), params: dict = None, returning=("t.id",)): ...
+
 # -------------------------------
 # BaseRepository (runtime)
 # -------------------------------
@@ -57,17 +177,48 @@ class BaseRepository:
     Attributes:
         entity: The database entity (model) associated with this repository.
         schema_class: The default schema class to be used for data serialization/deserialization.
-        filter_map: A mapping of fields to their respective filter handlers.
+        filter_map: A mapping of fields to predicate builders. Each builder takes the
+            filter value and returns (predicate, bound_value), where predicate is a
+            Pony expression over `t` that references the bound value as `v`.
+        prefetch: Relation attribute names loaded together with list queries.
+        cache_ttl: Seconds get_by_id results are kept in the entity cache
+            (utils/entity_cache.py); None disables it.
+        cache_stale_ttl: Seconds an expired entry is still served while it is
+            reloaded in the background. Only entries whose generation no
+            write has replaced are served, so this only delays changes made
+            outside the repositories.
+        cache_exclude: Attribute names left out of cached entities (secrets);
+            reading one on a cached entity loads the row again.
     """
     entity: None
     schema_class = Type[BaseModel]
+    prefetch = ()
+    cache_ttl = None
+    cache_stale_ttl = 0
+    cache_exclude = ()
     
-    # mapping field to filter → handler
+    # mapping field to filter → (predicate, bound value), or None to skip
     filter_map = {
-        "id": lambda x, v: x.filter(lambda t: t.id == uuid.UUID(v)),
-        "is_deleted": lambda x, v: x.filter(lambda t: t.is_deleted == v),
+        "id": lambda v: ("t.id == v", uuid.UUID(str(v))),
+        "is_deleted": lambda v: ("t.is_deleted == v", v),
     }
     
+    # mapping field to filter → (order_by expression, bound value);
+    # when that filter is used, results are sorted by relevance first
+    rank_map = {}
+    
+    # Indexed fields → (attribute path, value cast). Only these can be used with
+    # operators (`field[gte]=...`, `field[in]=a,b`) and, if plain columns, in sort
+    index_map = {
+        "id": ("id", lambda v: uuid.UUID(str(v))),
+        "created_at": ("created_at", parse_datetime),
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Spans around public methods when tracing is enabled
+        trace_methods(cls, "repository")
+    
     def __init__(self, schema_class: Type[BaseModel] = None):
         """
         Initialize the BaseRepository.
@@ -77,63 +228,237 @@ class BaseRepository:
             raise NotImplementedError(
                 "Repository must define entity"
             )
+        self.cache = (
+            EntityCache(self.entity, self.cache_ttl, self.cache_stale_ttl, self.cache_exclude)
+            if self.cache_ttl and ENTITY_CACHE_ENABLED else None
+        )
     
+    @property
+    def is_postgres(self) -> bool:
+        return self.entity._database_.provider_name == "postgres"
+
+    @property
+    def sql_alias(self) -> str:
+        """
+        SQL alias Pony gives the `t` loop variable of query plans, for raw_sql
+        fragments that reference columns. Read from the SQL of a probe query
+        rather than assumed ("t-1" in Pony 0.7).
+        """
+        name = self.entity.__name__
+        if name not in _aliases:
+            with db_session:  # translation only, no connection
+                sql = select(t for t in self.entity).get_sql()
+            _aliases[name] = _ALIAS_RE.search(sql).group(1)
+        return _aliases[name]
+
     @property
     def entity_label(self) -> str:
         name = self.entity.__name__ if self.entity else self.__class__.__name__
         return name.replace("DB", "").replace("Model", "")
 
-    def apply_query_options(self, query, filters, order_by=None):
+    def build_query(self, filters, order_by=None, columns=None):
         """
-        Apply filters to a query.
+        Build a query from filters using a compiled, cached query plan.
+
+        Each distinct combination of predicates, ordering, ranking and projected columns is
+        compiled once into a single parameterized `select(...)`; later calls only
+        bind new values.
 
         Args:
-            query: The query to apply filters to.
             filters: A list of filters to apply.
+            order_by: Comma-separated field names to sort by, each prefixed with "-" for descending order.
+            columns: Attribute names to select as tuples instead of entities.
 
         Returns:
             The filtered query.
         """
         try:
             filters = filters or []
-            
+            predicates = []
+            rank = None
+
             # Default soft delete — only if model has is_deleted field
             has_is_deleted = hasattr(self.entity, "is_deleted")
             if has_is_deleted and not any(f.get("field") == "is_deleted" for f in filters):
                 handler = self.filter_map.get("is_deleted")
                 if handler:
-                    query = handler(query, False)
+                    predicates.append(("is_deleted", *handler(False)))
 
-            # Apply filters
             for f in filters:
-                field = f.get("field")
-                value = f.get("value")
+                if f.get("op"):
+                    condition = self._operator_condition(f)
+                    if condition:
+                        predicates.append((f"{f['field']}[{f['op']}]", *condition))
+                    continue
+
+                handler = self.filter_map.get(f.get("field"))
+                condition = handler(f.get("value")) if handler else None
+                if condition:
+                    predicates.append((f.get("field"), *condition))
+
+                ranker = self.rank_map.get(f.get("field"))
+                if ranker and rank is None:
+                    rank = ranker(f.get("value"))
+
+            # Sorted field signature → one plan per combination regardless of filter order
+            predicates.sort(key=lambda p: (p[0], p[1]))
+
+            plan = _get_plan(
+                self.entity,
+                tuple(expr for _, expr, _ in predicates),
+                self._resolve_order_by(order_by),
+                tuple(columns) if columns else None,
+                rank[0] if rank else None,
+            )
 
-                handler = self.filter_map.get(field)
-                if handler:
-                    query = handler(query, value)
-            
-            # Apply ordering
-            if order_by:
-                descending = order_by.startswith("-")
-                field_name = order_by.lstrip("-")
-
-                field = getattr(self.entity, field_name, None)
-                if field:
-                    query = query.order_by(desc(field) if descending else field)
-            
-            return query
+            values = [value for _, expr, value in predicates if _PARAM_RE.search(expr)]
+            if rank and _PARAM_RE.search(rank[0]):
+                values.append(rank[1])
+            return plan(self.entity, *values)
         except Exception as e:
-            logger.error(f"Error in apply_query_options: {e}", exc_info=e)
+            logger.error(f"Error in build_query: {e}", exc_info=e)
             raise
 
+    def _resolve_order_by(self, order_by):
+        if not order_by:
+            return None
+
+        terms = []
+        for term in str(order_by).split(","):
+            term = term.strip()
+            attr = self.entity._adict_.get(term.lstrip("-"))
+            if attr is None or attr.is_collection:
+                continue
+            terms.append(term)
+
+        return tuple(terms) or None
+
+    def _operator_condition(self, f):
+        indexed = self.index_map.get(f.get("field"))
+        operator = _OPERATORS.get(f.get("op"))
+        if not indexed or not operator:
+            return None
+
+        attr, cast = indexed
+        value = f.get("value")
+        if operator == "in":
+            values = value if isinstance(value, (list, tuple)) else str(value).split(",")
+            values = [cast(item) for item in values if str(item).strip()]
+            if not values:
+                raise ValueError("Empty list")
+            return f"t.{attr} in v", values
+        return f"t.{attr} {operator} v", cast(value)
+
+    def validate_query(self, filters=None, order_by=None):
+        """
+        Check operator filters and sort fields against index_map.
+
+        Raises:
+            ValueError: On a field without a supporting index, an unknown
+                operator or a value that can't be parsed.
+        """
+        for f in filters or []:
+            if not f.get("op"):
+                continue
+            if f.get("field") not in self.index_map:
+                raise ValueError(f"Filtering on '{f.get('field')}' is not supported")
+            if f.get("op") not in _OPERATORS:
+                raise ValueError(f"Unknown operator '{f.get('op')}' for '{f.get('field')}'")
+            try:
+                self._operator_condition(f)
+            except (ValueError, TypeError):
+                raise ValueError(f"Invalid value for '{f['field']}[{f['op']}]'")
+
+        for term in str(order_by or "").split(","):
+            field_name = term.strip().lstrip("-")
+            if not field_name:
+                continue
+            attr = self.index_map.get(field_name, ("",))[0]
+            if attr != field_name:
+                raise ValueError(f"Sorting by '{field_name}' is not supported")
+
+    def plan_cache_stats(self) -> dict:
+        """Hit/miss counters of the compiled query plan cache for this entity."""
+        stats = _query_plan_stats.get(self.entity.__name__, {"hits": 0, "misses": 0})
+        size = sum(1 for key in _query_plans if key[0] == self.entity.__name__)
+        return {**stats, "size": size}
+
+    def get_projection(self, schema):
+        """
+        Map a response schema onto the entity's columns.
+
+        Returns:
+            (columns, relations) where relations maps a relation field to
+            (related entity, nested columns), or None when the schema needs
+            collections or computed attributes and must be built from entities.
+        """
+        key = (self.entity.__name__, schema)
+        if key in _projections:
+            return _projections[key]
+
+        columns, relations = [], {}
+        for name, field in schema.model_fields.items():
+            attr = self.entity._adict_.get(name)
+            if attr is None or attr.is_collection:
+                columns = None
+                break
+
+            if attr.is_relation:
+                related = attr.py_type
+                nested = _model_type(field.annotation)
+                pk_attrs = related._pk_attrs_
+                if nested is None or len(pk_attrs) != 1 or pk_attrs[0].name not in nested.model_fields:
+                    columns = None
+                    break
+
+                nested_columns = list(nested.model_fields)
+                if any(
+                    c not in related._adict_ or related._adict_[c].is_relation or related._adict_[c].is_collection
+                    for c in nested_columns
+                ):
+                    columns = None
+                    break
+                relations[name] = (related, nested_columns)
+
+            columns.append(name)
+
+        _projections[key] = (columns, relations) if columns else None
+        return _projections[key]
+
+    def fetch_projected(self, rows, columns, relations):
+        """
+        Turn projected tuple rows into dicts, loading each relation for the
+        whole page with one IN query instead of one lazy load per row.
+        """
+        rows = [dict(zip(columns, row)) for row in rows]
+
+        for name, (related, nested_columns) in relations.items():
+            pk = related._pk_attrs_[0].name
+            ids = {getattr(row[name], pk) for row in rows if row[name] is not None}
+            if not ids:
+                continue
+
+            plan = _get_plan(related, (f"t.{pk} in v",), None, tuple(nested_columns))
+            by_pk = {}
+            for values in plan(related, list(ids)):
+                item = dict(zip(nested_columns, values))
+                by_pk[item[pk]] = item
+
+            for row in rows:
+                if row[name] is not None:
+                    row[name] = by_pk.get(getattr(row[name], pk))
+
+        return rows
+
     # @db_session
-    def get_by_id(self, id, to_model=False, schema_response=None):
+    def get_by_id(self, id, to_model=False, schema_response=None, cached=True):
         """
         Retrieve an entity by its ID.
 
         Args:
             id: The ID of the entity to retrieve.
+            cached: Use the entity cache, when the repository has one. Pass
+                False when the entity is about to be modified.
 
         Returns:
             The entity with the specified ID.
@@ -146,7 +471,15 @@ class BaseRepository:
             if hasattr(self.entity, "is_deleted"):
                 filters["is_deleted"] = False
 
-            query = self.entity.get(**filters)
+            query, generation = self.cache.get(id) if self.cache and cached else (None, None)
+            if query is not None and getattr(query, "is_deleted", False):
+                query = None  # deleted earlier in this transaction
+            elif query is None:
+                started = time.perf_counter()
+                query = self.entity.get(**filters)
+                if query is not None and self.cache and cached:
+                    self.cache.put(query, generation, time.perf_counter() - started)
+
             if to_model:
                 return query
             
@@ -168,7 +501,7 @@ class BaseRepository:
             filters: A list of filters to apply.
             page: The page number for pagination.
             limit: The number of entities per page.
-            order_by: Field name to sort by, prefixed with "-" for descending order. 
+            order_by: Comma-separated field names to sort by, each prefixed with "-" for descending order. 
 
         Returns:
             A tuple containing the filtered entities and pagination details.
@@ -180,13 +513,26 @@ class BaseRepository:
             if filters is None:
                 filters = []
             
-            query = select(e for e in self.entity)
-            query = self.apply_query_options(query, filters, order_by)
+            schema = schema_response or self.schema
+            projection = self.get_projection(schema) if schema and not to_model else None
+
+            query = self.build_query(filters, order_by)
+            if projection:
+                # Select only the columns the schema needs (plus the sort columns)
+                columns, relations = projection
+                for term in self._resolve_order_by(order_by) or ():
+                    if term.lstrip("-") not in columns:
+                        columns = [*columns, term.lstrip("-")]
+                rows_query = self.build_query(filters, order_by, columns=columns)
+            elif self.prefetch:
+                rows_query = query = query.prefetch(*(getattr(self.entity, name) for name in self.prefetch))
+            else:
+                rows_query = query
             
             # Paginate
             page = max(page, 1)
             if limit <= 0:
-                items = list(query)  # ✅ Convert to list
+                items = list(rows_query)  # ✅ Convert to list
                 total = len(items)
                 total_pages = 1
             else:
@@ -196,15 +542,14 @@ class BaseRepository:
 
                 offset = (page - 1) * limit
                 # ✅ Use .limit() and .offset() instead of slicing
-                items = list(query.limit(limit, offset=offset))
-            
-            schema = schema_response or self.schema
+                items = list(rows_query.limit(limit, offset=offset))
+
+            if projection:
+                items = self.fetch_projected(items, columns, relations)
 
             if schema and not to_model:
-                items = [
-                    schema.model_validate(obj).model_dump(mode="json")
-                    for obj in items
-                ]
+                serialize = get_serializer(schema)
+                items = [serialize(obj) for obj in items]
             
             return items, {
                 "page": page,
@@ -240,8 +585,7 @@ class BaseRepository:
                 filters = []
             
             # Build query
-            query = select(e for e in self.entity)
-            query = self.apply_query_options(query, filters)
+            query = self.build_query(filters)
 
             result = query.first()
 
@@ -280,8 +624,7 @@ class BaseRepository:
         try:
             filters = filters or []
 
-            query = select(e for e in self.entity)
-            query = self.apply_query_options(query, filters)
+            query = self.build_query(filters)
 
             return query.count()
 
@@ -305,6 +648,7 @@ class BaseRepository:
         """
         try:
             entity_obj = self.entity(**data)
+            self.invalidate_cache(entity_obj.get_pk())
             if to_model:
                 return entity_obj
             
@@ -328,11 +672,12 @@ class BaseRepository:
             Exception: If an error occurs during update.
         """
         try:
-            entity_obj = self.get_by_id(data.get("id"), to_model=True)
+            entity_obj = self.get_by_id(data.get("id"), to_model=True, cached=False)
             if not entity_obj:
                 return None
             
             entity_obj.set(**data)
+            self.invalidate_cache(entity_obj.get_pk())
             result = entity_obj
             
             if self.schema and result is not None:
@@ -363,6 +708,7 @@ class BaseRepository:
                 return None
             
             entity_obj.set(**data)
+            self.invalidate_cache(entity_obj.get_pk())
             result = entity_obj
             
             if self.schema and result is not None:
@@ -389,14 +735,14 @@ class BaseRepository:
             Exception: If an error occurs during update.
         """
         try:
-            query = select(e for e in self.entity)
-            query = self.apply_query_options(query, filters)
+            query = self.build_query(filters)
 
             if query.count() == 0:
                 return None
 
             for entity_obj in query:
                 entity_obj.set(**data)
+                self.invalidate_cache(entity_obj.get_pk())
 
             return True
         except Exception as e:
@@ -419,9 +765,10 @@ class BaseRepository:
             Exception: If an error occurs during deletion.
         """
         try:
-            obj = self.get_by_id(id, to_model=True)
+            obj = self.get_by_id(id, to_model=True, cached=False)
             if not obj:
                 return None
+            self.invalidate_cache(obj.get_pk())
 
             if soft_delete and hasattr(obj, "is_deleted"):
                 obj.is_deleted = True
@@ -449,8 +796,7 @@ class BaseRepository:
             Exception: If an error occurs during deletion.
         """
         try:
-            query = select(e for e in self.entity)
-            query = self.apply_query_options(query, filters)
+            query = self.build_query(filters)
 
             if query.count() == 0:
                 return None
@@ -458,10 +804,98 @@ class BaseRepository:
             if soft_delete and hasattr(self.entity, "is_deleted"):
                 for data in query:
                     data.is_deleted = True
+                    self.invalidate_cache(data.get_pk())
             else:
+                if self.cache:
+                    for data in query:
+                        self.invalidate_cache(data.get_pk())
                 query.delete(bulk=True)
 
             return True
         except Exception as e:
             logger.error(f"Error in delete_with_filters: {e}", exc_info=e)
             raise
+
+    def invalidate_cache(self, id):
+        """Drop an entity from the entity cache after writing it outside the methods above."""
+        if self.cache:
+            self.cache.invalidate(id)
+
+    def execute_sql(self, sql: str, params: dict = None):
+        """
+        Execute a raw SQL statement on the entity's database.
+
+        Args:
+            sql: The SQL statement, referencing parameters as `$name`.
+            params: Mapping of parameter names to values.
+
+        Returns:
+            The DB-API cursor of the executed statement.
+
+        Raises:
+            Exception: If an error occurs during execution.
+        """
+        try:
+            return self.entity._database_.execute(sql, {}, dict(params or {}))
+        except Exception as e:
+            logger.error(f"Error in execute_sql: {e}", exc_info=e)
+            raise
+
+    def update_returning(self, id, data: dict, conditions=(), params: dict = None, returning=("t.id",)):
+        """
+        Update one row in a single `UPDATE ... RETURNING` statement (Postgres only).
+
+        The row is locked and read as `old` in the same statement, so returned
+        expressions can compare previous (`old.col`) and new (`t.col`) values.
+
+        Args:
+            id: Primary key of the row.
+            data: Attribute names → new values (relations take an entity, id or None).
+            conditions: Extra SQL predicates over `t`/`old`, e.g. permission checks.
+            params: Values for `$name` parameters used in conditions/returning.
+            returning: SQL expressions to return.
+
+        Returns:
+            A dict of the returned columns, or None if no row matched — it does not
+            exist, is soft-deleted, or a condition failed.
+
+        Raises:
+            Exception: If an error occurs during execution.
+        """
+        try:
+            table = self.entity._table_
+            pk = self.entity._pk_columns_[0]
+
+            sets, values = [], {"id": uuid.UUID(str(id))}
+            for i, (name, value) in enumerate(data.items()):
+                attr = self.entity._adict_[name]
+                if attr.is_relation and value is not None and not isinstance(value, uuid.UUID):
+                    value = value.get_pk() if hasattr(value, "get_pk") else uuid.UUID(str(value))
+                elif attr.py_type is Json:
+                    value = json.dumps(value)
+                sets.append(f"{attr.columns[0]} = $d{i}")
+                values[f"d{i}"] = value
+
+            where = [f"{pk} = $id"]
+            if hasattr(self.entity, "is_deleted"):
+                where.append("NOT is_deleted")
+
+            sql = (
+                f"WITH old AS (SELECT * FROM {table} WHERE {' AND '.join(where)} FOR UPDATE) "
+                f"UPDATE {table} AS t SET {', '.join(sets)} FROM old "
+                f"WHERE {' AND '.join([f't.{pk} = old.{pk}', *(f'({c})' for c in conditions)])} "
+                f"RETURNING {', '.join(returning)}"
+            )
+            cursor = self.execute_sql(sql, {**(params or {}), **values})
+            self.invalidate_cache(values["id"])
+
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+        except Exception as e:
+            logger.error(f"Error in update_returning: {e}", exc_info=e)
+            raise
+
+
+trace_methods(BaseRepository, "repository")
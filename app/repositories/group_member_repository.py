@@ -1,19 +1,27 @@
 import uuid
+from pony.orm import select
 from app.schemas.group_member import *
 from app.repositories.base import BaseRepository
 from app.db.models import GroupMemberDB
 
 class GroupMemberRepository(BaseRepository):
     entity = GroupMemberDB
+    prefetch = ("user",)
     
-    # Mapping filter fields:
-    # q = Query object, v = Value input, t = Table entity
+    # Mapping filter fields → (predicate, bound value):
+    # v = Value input, t = Table entity
     filter_map = {
-        "role": lambda x, v: x.filter(lambda t: t.role.lower() == v),
-        "group_id": lambda x, v: x.filter(lambda t: t.group and t.group.id == uuid.UUID(v)),
-        "user_id": lambda x, v: x.filter(lambda t: t.user and t.user.id == uuid.UUID(v)),
+        "role": lambda v: ("t.role.lower() == v", v),
+        "group_id": lambda v: ("t.group.id == v", uuid.UUID(str(v))),
+        "user_id": lambda v: ("t.user.id == v", uuid.UUID(str(v))),
     }
     
     def __init__(self):
         # We pass the repo and the schema variable to the parent
-        super().__init__(schema_class=GroupMemberResponse)
\ No newline at end of file
+        super().__init__(schema_class=GroupMemberResponse)
+
+    def get_members_of_groups(self, group_ids: list):
+        """Memberships of several groups with their users, in one prefetched query."""
+        group_ids = [uuid.UUID(str(x)) for x in group_ids]
+        query = select(m for m in GroupMemberDB if m.group.id in group_ids)
+        return list(query.prefetch(GroupMemberDB.user))
\ No newline at end of file
@@ -1,17 +1,195 @@
+import uuid
+from pony.orm import select, count
 from app.schemas.group import *
 from app.repositories.base import BaseRepository
-from app.db.models import GroupDB
+from app.db.models import GroupDB, GroupMemberDB
+from app.utils.enums import GroupRole
+from app.utils.logger import logger
+
+# Groups recounted per statement (and per transaction) by reconcile_member_counts
+RECONCILE_BATCH = 500
+
 
 class GroupRepository(BaseRepository):
     entity = GroupDB
+    cache_ttl = 60
+    cache_stale_ttl = 30
     
-    # Mapping filter fields:
-    # q = Query object, v = Value input, t = Table entity
+    # Mapping filter fields → (predicate, bound value):
+    # v = Value input, t = Table entity
     filter_map = {
-        "ids": lambda x, v: x.filter(lambda t: t.id in v),
-        "name": lambda x, v: x.filter(lambda t: t.name.lower() == v),
+        "ids": lambda v: ("t.id in v", [uuid.UUID(str(x)) for x in v]),
+        "name": lambda v: ("t.name.lower() == v", v),
     }
     
     def __init__(self):
         # We pass the repo and the schema variable to the parent
-        super().__init__(schema_class=GroupResponse)
\ No newline at end of file
+        super().__init__(schema_class=GroupResponse)
+
+    def get_groups_by_member(self, user_id, after=None, limit: int = 100):
+        """
+        Groups a user belongs to, together with the user's own role, in a single
+        group_members JOIN groups statement. Keyset-paginated on (created_at, id) desc.
+
+        Args:
+            user_id: The member's user id.
+            after: (created_at, id) of the last group on the previous page.
+            limit: The number of groups per page.
+
+        Returns:
+            A tuple of (rows as dicts, has_more).
+        """
+        try:
+            user_id = uuid.UUID(str(user_id))
+            limit = max(limit, 1)
+
+            if after:
+                after_at, after_id = after
+                query = select(
+                    (m.group.id, m.group.name, m.group.created_at, m.group.member_count, m.group.pending_count, m.role)
+                    for m in GroupMemberDB
+                    if m.user.id == user_id and (
+                        m.group.created_at < after_at
+                        or (m.group.created_at == after_at and m.group.id < after_id)
+                    )
+                )
+            else:
+                query = select(
+                    (m.group.id, m.group.name, m.group.created_at, m.group.member_count, m.group.pending_count, m.role)
+                    for m in GroupMemberDB
+                    if m.user.id == user_id
+                )
+
+            # ORDER BY created_at DESC, id DESC
+            rows = query.order_by(-3, -1).limit(limit + 1)[:]
+
+            fields = ("id", "name", "created_at", "member_count", "pending_count", "role")
+            items = [dict(zip(fields, row)) for row in rows[:limit]]
+
+            return items, len(rows) > limit
+        except Exception as e:
+            logger.error(f"Error in get_groups_by_member: {e}", exc_info=e)
+            raise
+
+    def adjust_member_counts(self, group_id, members: int = 0, pending: int = 0):
+        """
+        Atomically shift the denormalized member/pending counters of a group.
+        """
+        group_id = uuid.UUID(str(group_id))
+        self.invalidate_cache(group_id)
+
+        if not self.is_postgres:
+            group = self.entity.get(id=group_id)
+            if group:
+                group.member_count += members
+                group.pending_count += pending
+            return
+
+        self.execute_sql(
+            """
+            UPDATE groups
+            SET member_count = member_count + $members,
+                pending_count = pending_count + $pending
+            WHERE id = $group_id
+            """,
+            {"group_id": group_id, "members": members, "pending": pending},
+        )
+
+    def compute_member_counts(self) -> dict:
+        """
+        Recount memberships from the group_members table.
+
+        Returns:
+            {group_id: (member_count, pending_count)} for every group with members.
+        """
+        try:
+            counts = {}
+            rows = select(
+                (m.group.id, m.role, count(m)) for m in GroupMemberDB
+            )
+            for group_id, role, n in rows:
+                members, pending = counts.get(group_id, (0, 0))
+                if role == GroupRole.PENDING.value:
+                    pending += n
+                else:
+                    members += n
+                counts[group_id] = (members, pending)
+
+            return counts
+        except Exception as e:
+            logger.error(f"Error in compute_member_counts: {e}", exc_info=e)
+            raise
+
+    def reconcile_member_counts(self, after=None, batch: int = RECONCILE_BATCH):
+        """
+        Correct member_count / pending_count of the next `batch` groups by id.
+
+        On Postgres this is one statement per batch, without a table lock. It
+        reads the counts and recounts the memberships in the same snapshot, and
+        adds the difference, as adjust_member_counts() does. A join or leave
+        that commits meanwhile is in neither side, so its own adjustment stays
+        on top. Only the corrected rows are locked, until the caller commits
+        the batch.
+
+        Args:
+            after: Id of the last group of the previous batch; None to start.
+
+        Returns:
+            (ids of the groups corrected, id to pass as `after` for the next
+            batch or None when every group was seen).
+        """
+        try:
+            if not self.is_postgres:
+                # Single-writer stand-ins (SQLite): diff in Python, in one go
+                return self._reconcile_member_counts_in_session(), None
+
+            cursor = self.execute_sql(
+                """
+                WITH batch AS (
+                    SELECT id, member_count, pending_count
+                    FROM groups
+                    WHERE $after IS NULL OR id > $after
+                    ORDER BY id
+                    LIMIT $batch
+                ), counted AS (
+                    SELECT b.id, b.member_count, b.pending_count,
+                           count(m.user_id) FILTER (WHERE m.role <> $pending) AS members,
+                           count(m.user_id) FILTER (WHERE m.role = $pending) AS pending
+                    FROM batch b
+                    LEFT JOIN group_members m ON m.group_id = b.id
+                    GROUP BY b.id, b.member_count, b.pending_count
+                ), updated AS (
+                    UPDATE groups g
+                    SET member_count = g.member_count + (c.members - c.member_count),
+                        pending_count = g.pending_count + (c.pending - c.pending_count)
+                    FROM counted c
+                    WHERE g.id = c.id AND (c.members, c.pending) <> (c.member_count, c.pending_count)
+                    RETURNING g.id
+                )
+                SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1),
+                       (SELECT array_agg(id::text) FROM updated),
+                       (SELECT count(*) FROM batch)
+                """,
+                {
+                    "after": uuid.UUID(str(after)) if after else None,
+                    "batch": batch,
+                    "pending": GroupRole.PENDING.value,
+                },
+            )
+            last_id, corrected, seen = cursor.fetchone()
+            return corrected or [], last_id if seen == batch else None
+        except Exception as e:
+            logger.error(f"Error in reconcile_member_counts: {e}", exc_info=e)
+            raise
+
+    def _reconcile_member_counts_in_session(self) -> list:
+        actual = self.compute_member_counts()
+        corrected = []
+
+        for group in self.entity.select():
+            members, pending = actual.get(group.id, (0, 0))
+            if (group.member_count, group.pending_count) != (members, pending):
+                group.set(member_count=members, pending_count=pending)
+                corrected.append(group.id)
+
+        return corrected
@@ -0,0 +1,101 @@
+import json
+from datetime import datetime, timezone
+from app.schemas.idempotency import IdempotencyKeySchema
+from app.repositories.base import BaseRepository
+from app.db.models import IdempotencyKeyDB
+from app.utils.logger import logger
+
+class IdempotencyRepository(BaseRepository):
+    entity = IdempotencyKeyDB
+
+    # Mapping filter fields → (predicate, bound value):
+    # v = Value input, t = Table entity
+    filter_map = {
+        "scope": lambda v: ("t.scope == v", v),
+        "key": lambda v: ("t.key == v", v),
+    }
+
+    def __init__(self):
+        # We pass the repo and the schema variable to the parent
+        super().__init__(schema_class=IdempotencyKeySchema)
+
+    def claim(self, scope: str, key: str, fingerprint: str, expires_at: datetime):
+        """
+        Reserve a key for the current request, or return the request that owns it.
+
+        On Postgres the insert waits on the primary key while another transaction
+        holds the same key, so concurrent duplicates are serialized until the first
+        one commits (or rolls back, in which case the waiter gets the key).
+        Expired keys are taken over.
+
+        Returns:
+            None if the key was claimed, otherwise the stored IdempotencyKeyDB.
+        """
+        try:
+            now = datetime.now(timezone.utc)
+
+            if not self.is_postgres:
+                # Single-writer stand-ins (SQLite) don't need the upsert
+                row = self.entity.get(scope=scope, key=key)
+                if row is None:
+                    self.entity(scope=scope, key=key, fingerprint=fingerprint, created_at=now, expires_at=expires_at)
+                    return None
+                if row.expires_at.replace(tzinfo=row.expires_at.tzinfo or timezone.utc) > now:
+                    return row
+                row.set(fingerprint=fingerprint, status=None, response=None, created_at=now, expires_at=expires_at)
+                return None
+
+            cursor = self.execute_sql(
+                """
+                INSERT INTO idempotency_keys (scope, key, fingerprint, created_at, expires_at)
+                VALUES ($scope, $key, $fingerprint, $now, $expires_at)
+                ON CONFLICT (scope, key) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    status = NULL,
+                    response = NULL,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at
+                WHERE idempotency_keys.expires_at <= excluded.created_at
+                RETURNING key
+                """,
+                {
+                    "scope": scope,
+                    "key": key,
+                    "fingerprint": fingerprint,
+                    "now": now,
+                    "expires_at": expires_at,
+                },
+            )
+            if cursor.fetchone():
+                return None
+            return self.entity.get(scope=scope, key=key)
+        except Exception as e:
+            logger.error(f"Error in claim: {e}", exc_info=e)
+            raise
+
+    def complete(self, scope: str, key: str, status: str, response):
+        """Store the response of a claimed key."""
+        try:
+            if not self.is_postgres:
+                self.entity[scope, key].set(status=status, response=response)
+                return
+
+            # The claim was inserted with raw SQL, so skip loading it into the session
+            self.execute_sql(
+                "UPDATE idempotency_keys SET status = $status, response = $response "
+                "WHERE scope = $scope AND key = $key",
+                {
+                    "scope": scope,
+                    "key": key,
+                    "status": status,
+                    "response": json.dumps(response) if response is not None else None,
+                },
+            )
+        except Exception as e:
+            logger.error(f"Error in complete: {e}", exc_info=e)
+            raise
+
+    def purge_expired(self) -> int:
+        """Delete expired keys. Returns the number of deleted rows."""
+        now = datetime.now(timezone.utc)
+        return self.entity.select(lambda k: k.expires_at <= now).delete(bulk=True)
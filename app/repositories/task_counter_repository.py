@@ -0,0 +1,185 @@
+import uuid
+from pony.orm import select, count
+from app.schemas.task import TaskCounterSchema
+from app.repositories.base import BaseRepository
+from app.db.models import TaskCounterDB, TaskDB
+from app.utils.enums import CounterScope
+from app.utils.logger import logger
+
+class TaskCounterRepository(BaseRepository):
+    entity = TaskCounterDB
+    
+    # Mapping filter fields → (predicate, bound value):
+    # v = Value input, t = Table entity
+    filter_map = {
+        "scope": lambda v: ("t.scope == v", v),
+        "scope_id": lambda v: ("t.scope_id == v", uuid.UUID(str(v))),
+    }
+    
+    def __init__(self):
+        # We pass the repo and the schema variable to the parent
+        super().__init__(schema_class=TaskCounterSchema)
+
+    def increment(self, scope: str, scope_id, status: str, delta: int = 1):
+        """
+        Atomically add `delta` to a counter, creating the row when missing.
+        A single upsert keeps concurrent writers from losing updates.
+        """
+        scope_id = uuid.UUID(str(scope_id))
+
+        if not self.is_postgres:
+            # Single-writer stand-ins (SQLite) don't need the upsert
+            counter = self.entity.get(scope=scope, scope_id=scope_id, status=status)
+            if counter:
+                counter.count += delta
+            else:
+                self.entity(scope=scope, scope_id=scope_id, status=status, count=delta)
+            return
+
+        self.execute_sql(
+            """
+            INSERT INTO task_counters (scope, scope_id, status, count)
+            VALUES ($scope, $scope_id, $status, $delta)
+            ON CONFLICT (scope, scope_id, status)
+            DO UPDATE SET count = task_counters.count + excluded.count
+            """,
+            {
+                "scope": scope,
+                "scope_id": scope_id,
+                "status": status,
+                "delta": delta,
+            },
+        )
+
+    def get_counts(self, scope: str, scope_id) -> dict:
+        """Return {status: count} for one scope (primary key range lookup)."""
+        scope_id = uuid.UUID(str(scope_id))
+        rows = select(
+            (c.status, c.count) for c in TaskCounterDB
+            if c.scope == scope and c.scope_id == scope_id
+        )
+        return {status: n for status, n in rows}
+
+    def delete_scope(self, scope: str, scope_id):
+        return self.delete_with_filters(
+            filters=[
+                {"field": "scope", "value": scope},
+                {"field": "scope_id", "value": scope_id},
+            ],
+            soft_delete=False,
+        )
+
+    def compute_actual_counts(self) -> dict:
+        """
+        Recount tasks from the source table.
+
+        Returns:
+            {(scope, scope_id, status): count} for every non-empty counter.
+        """
+        try:
+            actual = {}
+
+            group_rows = select(
+                (t.group.id, t.status, count(t)) for t in TaskDB
+                if not t.is_deleted and t.group is not None
+            )
+            for group_id, status, n in group_rows:
+                actual[(CounterScope.GROUP.value, group_id, status)] = n
+
+            user_rows = select(
+                (t.assigned_to.id, t.status, count(t)) for t in TaskDB
+                if not t.is_deleted and t.group is None and t.assigned_to is not None
+            )
+            for user_id, status, n in user_rows:
+                actual[(CounterScope.USER.value, user_id, status)] = n
+
+            return actual
+        except Exception as e:
+            logger.error(f"Error in compute_actual_counts: {e}", exc_info=e)
+            raise
+
+    def reconcile(self) -> int:
+        """
+        Bring every counter to the count of its tasks.
+
+        On Postgres this is a single statement without a table lock. It reads
+        the counters and recounts the tasks in the same snapshot, and adds the
+        difference to the drifted counters, as increment() does. A create or
+        delete that commits meanwhile is not in the snapshot on either side,
+        so its own increment stays on top of the correction. Only the rows
+        corrected are locked, for the moment they are updated. Counters with
+        no tasks are set to zero rather than deleted, so a concurrent
+        increment never recreates a row from scratch.
+
+        Returns:
+            The number of counter rows that were corrected.
+        """
+        try:
+            if not self.is_postgres:
+                # Single-writer stand-ins (SQLite): diff in Python
+                return self._reconcile_in_session()
+
+            cursor = self.execute_sql(
+                """
+                WITH actual AS (
+                    SELECT $group_scope AS scope, group_id AS scope_id, status, count(*) AS count
+                    FROM tasks
+                    WHERE NOT is_deleted AND group_id IS NOT NULL
+                    GROUP BY group_id, status
+                    UNION ALL
+                    SELECT $user_scope, assigned_to_id, status, count(*)
+                    FROM tasks
+                    WHERE NOT is_deleted AND group_id IS NULL AND assigned_to_id IS NOT NULL
+                    GROUP BY assigned_to_id, status
+                ), drift AS (
+                    SELECT coalesce(a.scope, c.scope) AS scope,
+                           coalesce(a.scope_id, c.scope_id) AS scope_id,
+                           coalesce(a.status, c.status) AS status,
+                           coalesce(a.count, 0) - coalesce(c.count, 0) AS delta,
+                           c.scope IS NOT NULL AS seen
+                    FROM actual a
+                    FULL JOIN task_counters c
+                      ON c.scope = a.scope AND c.scope_id = a.scope_id AND c.status = a.status
+                    WHERE coalesce(a.count, 0) <> coalesce(c.count, 0)
+                ), updated AS (
+                    UPDATE task_counters c
+                    SET count = c.count + d.delta
+                    FROM drift d
+                    WHERE d.seen AND c.scope = d.scope AND c.scope_id = d.scope_id AND c.status = d.status
+                    RETURNING 1
+                ), inserted AS (
+                    INSERT INTO task_counters (scope, scope_id, status, count)
+                    SELECT scope, scope_id, status, delta FROM drift WHERE NOT seen
+                    ON CONFLICT (scope, scope_id, status)
+                    DO UPDATE SET count = task_counters.count + excluded.count
+                    RETURNING 1
+                )
+                SELECT (SELECT count(*) FROM updated) + (SELECT count(*) FROM inserted)
+                """,
+                {
+                    "group_scope": CounterScope.GROUP.value,
+                    "user_scope": CounterScope.USER.value,
+                },
+            )
+            return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error in reconcile: {e}", exc_info=e)
+            raise
+
+    def _reconcile_in_session(self) -> int:
+        actual = self.compute_actual_counts()
+        drift = 0
+
+        for counter in self.entity.select():
+            expected = actual.pop((counter.scope, counter.scope_id, counter.status), 0)
+            if counter.count == expected:
+                continue
+
+            drift += 1
+            counter.count = expected
+
+        for (scope, scope_id, status), n in actual.items():
+            drift += 1
+            self.entity(scope=scope, scope_id=scope_id, status=status, count=n)
+
+        return drift
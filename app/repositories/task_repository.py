@@ -1,27 +1,135 @@
+import json
+import re
 import uuid
 from app.schemas.task import *
 from app.repositories.base import BaseRepository
 from app.db.models import TaskDB
+from app.utils.enums import StatusTask, GroupRole
+from app.utils.other import parse_datetime
+
+# Full-text search (see migrations/add_task_search.sql). {t} is the SQL alias
+# of the `t` loop variable (BaseRepository.sql_alias); "%" must be doubled in raw SQL.
+_TS_QUERY = "to_tsquery('simple', replace($v, ' ', ':* & ') || ':*')"
+_PG_SEARCH = '("{t}"."search_vector" @@ ' + _TS_QUERY + ' OR $v <%% lower("{t}"."title"))'
+_PG_RANK = 'ts_rank("{t}"."search_vector", ' + _TS_QUERY + ') + word_similarity($v, lower("{t}"."title")) DESC'
+
+# Fallback for other providers (SQLite): phrase match, title hits first
+_FALLBACK_RANK = 'instr(lower("{t}"."title"), $v) > 0 DESC'
+
+# Single-statement task updates (Postgres): membership checks as predicates,
+# previous counter key and the TaskResponse relations in RETURNING
+_IS_MEMBER = (
+    "EXISTS (SELECT 1 FROM group_members m WHERE m.group_id = t.group_id "
+    f"AND m.user_id = {{user}} AND m.role <> '{GroupRole.PENDING.value}')"
+)
+_CAN_EDIT = f"(t.group_id IS NULL AND old.assigned_to_id = $user_id) OR {_IS_MEMBER.format(user='$user_id')}"
+_CAN_ASSIGN = (
+    "EXISTS (SELECT 1 FROM users u WHERE u.id = $assigned_to_id AND NOT u.is_deleted) "
+    f"AND (t.group_id IS NULL OR {_IS_MEMBER.format(user='$assigned_to_id')})"
+)
+_TASK_RETURNING = (
+    "t.id", "t.title", "t.description", "t.status", "t.due_date", "t.attachment",
+    "t.created_at", "t.updated_at",
+    "(SELECT json_build_object('id', u.id, 'full_name', u.full_name, 'email', u.email, 'username', u.username) "
+    "FROM users u WHERE u.id = t.assigned_to_id) AS assigned_to",
+    "(SELECT json_build_object('id', g.id, 'name', g.name) FROM groups g WHERE g.id = t.group_id) AS \"group\"",
+    "old.status AS old_status", "old.group_id AS old_group_id", "old.assigned_to_id AS old_assigned_to_id",
+)
+
+
+def search_terms(q):
+    """Normalize a search string into lowercase words separated by single spaces."""
+    return " ".join(re.findall(r"\w+", (q or "").lower()))
+
 
 class TaskRepository(BaseRepository):
     entity = TaskDB
-    
-    # Mapping filter fields:
-    # q = Query object, v = Value input, t = Table entity
+
+    # Mapping filter fields → (predicate, bound value):
+    # v = Value input, t = Table entity
     filter_map = {
         **BaseRepository.filter_map,
-        "title": lambda x, v: x.filter(lambda t: t.title.lower() == v),
-        "status": lambda x, v: x.filter(lambda t: t.status == v),
-        "user_id": lambda x, v: x.filter(
-            lambda t: t.assigned_to and t.assigned_to.id == uuid.UUID(v)
-        ),
-        "group_id": lambda x, v: (
-            x.filter(lambda t: t.group is None)
+        "title": lambda v: ("t.title.lower() == v", v),
+        "status": lambda v: ("t.status == v", v),
+        "user_id": lambda v: ("t.assigned_to.id == v", uuid.UUID(str(v))),
+        "group_id": lambda v: (
+            ("t.group is None", None)
             if v in (None, "null", "")
-            else x.filter(lambda t: t.group and t.group.id == uuid.UUID(v))
+            else ("t.group.id == v", uuid.UUID(str(v)))
         ),
     }
-    
+
+    # Indexed fields usable in operator filters and sort (migrations/add_task_filter_indexes.sql)
+    index_map = {
+        **BaseRepository.index_map,
+        "due_date": ("due_date", parse_datetime),
+        "status": ("status", lambda v: StatusTask(v).value),
+        "assigned_to_id": ("assigned_to.id", lambda v: uuid.UUID(str(v))),
+    }
+
+    @staticmethod
+    def search_postgres(alias):
+        search, rank = _PG_SEARCH.format(t=alias), _PG_RANK.format(t=alias)
+        # Queries without word characters can't become a tsquery: plain phrase match
+        filters = {
+            "q": lambda v: (
+                (f"raw_sql({search!r})", search_terms(v))
+                if search_terms(v)
+                else TaskRepository._phrase_match(v)
+            ),
+        }
+        ranks = {"q": lambda v: (f"raw_sql({rank!r})", search_terms(v)) if search_terms(v) else None}
+        return filters, ranks
+
+    @staticmethod
+    def search_fallback(alias):
+        rank = _FALLBACK_RANK.format(t=alias)
+        filters = {"q": TaskRepository._phrase_match}
+        ranks = {"q": lambda v: (f"raw_sql({rank!r})", v.strip().lower()) if v and v.strip() else None}
+        return filters, ranks
+
+    @staticmethod
+    def _phrase_match(v):
+        if v and v.strip():
+            return "v in t.title.lower() or v in t.description.lower()", v.strip().lower()
+        return None
+
     def __init__(self):
         # We pass the repo and the schema variable to the parent
         super().__init__(schema_class=TaskResponse)
+
+        search = self.search_postgres if self.is_postgres else self.search_fallback
+        filters, self.rank_map = search(self.sql_alias)
+        self.filter_map = {**self.filter_map, **filters}
+
+    def update_checked(self, task_id, data: dict, user_id=None):
+        """
+        Update a task in one round trip (Postgres only), provided `user_id` (if
+        given) may edit it and a new assignee exists and belongs to the task's group.
+
+        Returns:
+            The updated task as a TaskResponse-shaped dict plus old_status,
+            old_group_id and old_assigned_to_id, or None if nothing was updated.
+        """
+        conditions = []
+        params = {"user_id": uuid.UUID(str(user_id)) if user_id else None}
+        if user_id:
+            conditions.append(_CAN_EDIT)
+        if data.get("assigned_to") is not None:
+            conditions.append(_CAN_ASSIGN)
+            params["assigned_to_id"] = uuid.UUID(str(data["assigned_to"]))
+
+        row = self.update_returning(
+            task_id,
+            data,
+            conditions=conditions,
+            params=params,
+            returning=_TASK_RETURNING,
+        )
+
+        # Pony leaves JSON values undecoded on raw cursors
+        if row:
+            for key in ("attachment", "assigned_to", "group"):
+                if isinstance(row[key], str):
+                    row[key] = json.loads(row[key])
+        return row
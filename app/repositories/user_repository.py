@@ -4,13 +4,16 @@ from app.db.models import UserDB
 
 class UserRepository(BaseRepository):
     entity = UserDB
+    cache_ttl = 300
+    cache_stale_ttl = 60
+    cache_exclude = ("password",)
     
-    # Mapping filter fields:
-    # q = Query object, v = Value input, t = Table entity
+    # Mapping filter fields → (predicate, bound value):
+    # v = Value input, t = Table entity
     filter_map = {
         **BaseRepository.filter_map,
-        "email": lambda x, v: x.filter(lambda t: t.email == v),
-        "username": lambda x, v: x.filter(lambda t: t.username == v),
+        "email": lambda v: ("t.email == v", v),
+        "username": lambda v: ("t.username == v", v),
     }
     
     def __init__(self):
@@ -9,6 +9,7 @@ class BaseAuthResource(BaseResource):
 
 class AuthLoginResource(BaseAuthResource):
     skip_auth = True
+    rate_limit = "login"
     
     @api_spec.validate(
         json=UserLoginSchema,
@@ -25,6 +26,7 @@ class AuthLoginResource(BaseAuthResource):
 
 class AuthRegisterResource(BaseAuthResource):
     skip_auth = True
+    rate_limit = "register"
     
     @api_spec.validate(
         json=UserRegisterSchema,
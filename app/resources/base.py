@@ -1,9 +1,14 @@
 import falcon
 import json
+import re
 from pydantic import ValidationError
 from itertools import chain
 from app.config.spectree import api_spec, Response
 from app.utils.logger import logger
+from app.utils.metrics import render_metrics
+
+# Operator filters in the query string: `due_date[gte]=...`, `status[in]=todo,done`
+OPERATOR_PARAM = re.compile(r"^(\w+)\[(\w+)\]$")
 
 
 class HealthResource:
@@ -13,6 +18,12 @@ class HealthResource:
     def on_get(self, req, resp):
         resp.media = {"status": "OK"}
 
+class MetricsResource:
+    skip_auth = True
+
+    def on_get(self, req, resp):
+        resp.data, resp.content_type = render_metrics()
+
 class BaseResource:
     def parse_body(self, req, schema):
         try:
@@ -39,7 +50,7 @@ class BaseResource:
         if metadata:
             resp.media["metadata"] = metadata
 
-    def generate_filters_resource(self, req=None, params_string=[], params_int=[], params_bool=[], params_list=[]):
+    def generate_filters_resource(self, req=None, params_string=[], params_int=[], params_bool=[], params_list=[], operators=False):
         filters = []
 
         # Handle string and int parameters
@@ -89,4 +100,12 @@ class BaseResource:
 
                 filters.append({"field": param, "value": items})
 
+        # Handle operator parameters (validated against the repository's index_map)
+        if operators:
+            for key, value in req.params.items():
+                match = OPERATOR_PARAM.match(key)
+                if match and value not in ["", None]:
+                    field, op = match.groups()
+                    filters.append({"field": field, "op": op, "value": value})
+
         return filters
\ No newline at end of file
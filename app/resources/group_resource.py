@@ -1,7 +1,8 @@
 from app.resources.base import api_spec, Response, BaseResource
 from app.services.group_service import GroupService
 from app.schemas.group import *
-from app.utils.enums import TagsSwagger
+from app.utils.enums import TagsSwagger, CounterScope
+from app.utils.response_cache import cached_response, scope
 
 class BaseGroupResource(BaseResource):
     def __init__(self):
@@ -10,14 +11,20 @@ class BaseGroupResource(BaseResource):
 class MyGroupsResource(BaseGroupResource):
 
     @api_spec.validate(
-        query=GroupFilter,
+        query=MyGroupFilter,
         resp=Response(HTTP_200=ListMyGroupResponseResource),
         tags=[TagsSwagger.GROUP.value]
     )
+    @cached_response(scopes=lambda media: [scope(CounterScope.GROUP, group["id"]) for group in media["data"]])
     def on_get(self, req, resp):
-        self.resource_response(resp=resp, data=self.service.get_all_group_by_member(
-            user_id=req.context["user"]["id"]
-        ))
+        limit = req.get_param_as_int("limit", default=100, required=False)
+        data, metadata = self.service.get_all_group_by_member(
+            user_id=req.context["user"]["id"],
+            cursor=req.get_param("cursor"),
+            limit=max(limit, 1),
+            include_members=req.get_param_as_bool("include_members", default=False),
+        )
+        self.resource_response(resp=resp, data=data, metadata=metadata)
 
 class GroupsResource(BaseGroupResource):
 
@@ -36,6 +43,7 @@ class GroupsResource(BaseGroupResource):
             page=page,
             limit=limit,
             filters=filters,
+            schema_response=GroupSummaryResponse,
         )
         self.resource_response(resp=resp, data=data, pagination=pagination)
     
@@ -80,6 +88,27 @@ class GroupsWithIdResource(BaseGroupResource):
             user_id=req.context["user"]["id"],
         ))
 
+class GroupMembersResource(BaseGroupResource):
+
+    @api_spec.validate(
+        query=GroupMemberFilter,
+        resp=Response(HTTP_200=ListGroupMemberResponseResource),
+        tags=[TagsSwagger.GROUP.value]
+    )
+    def on_get(self, req, resp, id: str):
+        filters = self.generate_filters_resource(req, params_string=["role"])
+        page = req.get_param_as_int("page", default=1, required=False)
+        limit = req.get_param_as_int("limit", default=100, required=False)
+
+        data, pagination = self.service.get_group_members(
+            group_id=id,
+            user_id=req.context["user"]["id"],
+            filters=filters,
+            page=page,
+            limit=limit,
+        )
+        self.resource_response(resp=resp, data=data, pagination=pagination)
+
 class GroupInviteResource(BaseGroupResource):
     @api_spec.validate(
         resp=Response(HTTP_200=InviteGroupResponseResource),
@@ -3,6 +3,8 @@ from app.services.task_service import TaskService
 from app.schemas.task import *
 from app.utils.enums import TagsSwagger
 from app.utils.http_exceptions import bad_request
+from app.utils.response_cache import cached_response
+from app.utils.single_flight import single_flight
 
 class BaseGroupResource(BaseResource):
     def __init__(self):
@@ -15,8 +17,9 @@ class TaskResource(BaseGroupResource):
         resp=Response(HTTP_200=ListTaskResponseResource),
         tags=[TagsSwagger.TASK.value]
     )
+    @cached_response()
     def on_get(self, req, resp):
-        filters = self.generate_filters_resource(req, params_string=["title", "status"])
+        filters = self.generate_filters_resource(req, params_string=["title", "status", "q"], operators=True)
         page = req.get_param_as_int("page", default=1, required=False)
         limit = req.get_param_as_int("limit", default=100, required=False)
         
@@ -26,6 +29,7 @@ class TaskResource(BaseGroupResource):
             page=page,
             limit=limit,
             filters=filters,
+            order_by=req.get_param("sort"),
         )
         self.resource_response(resp=resp, data=data, pagination=pagination)
     
@@ -42,6 +46,18 @@ class TaskResource(BaseGroupResource):
         ))
 
 
+class TaskCountersResource(BaseGroupResource):
+
+    @api_spec.validate(
+        resp=Response(HTTP_200=TaskCounterResponseResource),
+        tags=[TagsSwagger.TASK.value]
+    )
+    def on_get(self, req, resp):
+        self.resource_response(resp=resp, data=self.service.get_task_counters(
+            user_id=req.context["user"]["id"],
+        ))
+
+
 class TaskWithIdResource(BaseGroupResource):
 
     @api_spec.validate(
@@ -59,7 +75,7 @@ class TaskWithIdResource(BaseGroupResource):
     def on_put(self, req, resp, id: str):
         body = self.parse_body(req, TaskPayload)
         body["id"] = id
-        self.resource_response(resp=resp, data=self.service.update_task(body))
+        self.resource_response(resp=resp, data=self.service.update_task(body, user_id=req.context["user"]["id"]))
     
     @api_spec.validate(
         json=TaskUpdateStatusOrAssign,
@@ -68,7 +84,11 @@ class TaskWithIdResource(BaseGroupResource):
     )
     def on_patch(self, req, resp, id: str):
         body = self.parse_body(req, TaskUpdateStatusOrAssign)
-        self.resource_response(resp=resp, data=self.service.update_status_or_assign(task_id=id, payload=body))
+        self.resource_response(resp=resp, data=self.service.update_status_or_assign(
+            task_id=id,
+            payload=body,
+            user_id=req.context["user"]["id"],
+        ))
     
     @api_spec.validate(
         resp=Response(HTTP_200=BaseResponse[bool]),
@@ -84,8 +104,10 @@ class GroupTasksResource(BaseGroupResource):
         resp=Response(HTTP_200=ListTaskResponseResource),
         tags=[TagsSwagger.GROUP.value]
     )
+    # Same board for every member: share one query between concurrent requests of the group
+    @single_flight(scope=lambda req, id: f"group:{id}")
     def on_get(self, req, resp, id: int):
-        filters = self.generate_filters_resource(req, params_string=["title", "status", "user_id"])
+        filters = self.generate_filters_resource(req, params_string=["title", "status", "user_id", "q"], operators=True)
         page = req.get_param_as_int("page", default=1, required=False)
         limit = req.get_param_as_int("limit", default=100, required=False)
         
@@ -94,9 +116,22 @@ class GroupTasksResource(BaseGroupResource):
             page=page,
             limit=limit,
             filters=filters,
+            order_by=req.get_param("sort"),
         )
         self.resource_response(resp=resp, data=data, pagination=pagination)
 
+class GroupTaskCountersResource(BaseGroupResource):
+
+    @api_spec.validate(
+        resp=Response(HTTP_200=TaskCounterResponseResource),
+        tags=[TagsSwagger.GROUP.value]
+    )
+    def on_get(self, req, resp, id: str):
+        self.resource_response(resp=resp, data=self.service.get_task_counters(
+            user_id=req.context["user"]["id"],
+            group_id=id,
+        ))
+
 class TaskAttachmentResource(BaseGroupResource):
 
     @api_spec.validate(
@@ -54,7 +54,7 @@ class UserProfileResource(BaseUserResource):
         
         payload = req.media
         payload["id"] = usr_id
-        self.resource_response(resp=resp, data=self.service.update_one_with_filters(filters={"id": usr_id}, data=payload))
+        self.resource_response(resp=resp, data=self.service.update_profile(payload=payload, user_id=usr_id))
 
 class UserPasswordResource(BaseUserResource):
 
@@ -1,16 +1,17 @@
 # Resource Entities
-from app.resources.base import HealthResource
+from app.resources.base import HealthResource, MetricsResource
 from app.resources.auth_resource import AuthLoginResource, AuthRegisterResource
 from app.resources.user_resource import UserProfileResource, UsersResource, UserPasswordResource
 from app.resources.group_resource import (
     GroupsResource, GroupsWithIdResource, MyGroupsResource,
     RequestJoinGroupResource, ApproveNewMemberGroupResource,
     GroupInviteResource, GroupPreviewResource, LeaveGroupResource,
-    RemoveMembersFromGroupResource
+    RemoveMembersFromGroupResource, GroupMembersResource
 )
 from app.resources.task_resource import (
     TaskResource, TaskWithIdResource, GroupTasksResource,
-    TaskAttachmentResource, TaskAttachmentWithIdResource
+    TaskAttachmentResource, TaskAttachmentWithIdResource,
+    TaskCountersResource, GroupTaskCountersResource
 )
 
 def register_auth_routes(add):
@@ -25,13 +26,16 @@ def register_group_routes(add):
     add("/user/groups/{id}/approve", ApproveNewMemberGroupResource())
     add("/user/groups/{id}/invite", GroupInviteResource())
     add("/user/groups/{id}/tasks", GroupTasksResource())
+    add("/user/groups/{id}/tasks/counters", GroupTaskCountersResource())
     add("/user/groups/{id}/leave", LeaveGroupResource())
+    add("/user/groups/{id}/members", GroupMembersResource())
     add("/user/groups/{id}/members/{user_id}", RemoveMembersFromGroupResource())
     add("/user/groups/preview/{token}", GroupPreviewResource())
 
 
 def register_task_routes(add):
     add("/user/tasks", TaskResource())
+    add("/user/tasks/counters", TaskCountersResource())
     add("/user/tasks/{id}", TaskWithIdResource())
     add("/user/tasks/{id}/attachments", TaskAttachmentResource())
     add("/user/tasks/{id}/attachments/{attachment_id}", TaskAttachmentWithIdResource())
@@ -41,6 +45,7 @@ def register_routes(app, api_prefix="/api"):
         app.add_route(f"{api_prefix}{base}{path}", resource)
 
     app.add_route("/health", HealthResource())
+    app.add_route("/metrics", MetricsResource())
     register_auth_routes(add)
     register_group_routes(add)
     register_task_routes(add)
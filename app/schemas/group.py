@@ -15,18 +15,48 @@ class GroupResponse(BaseModel):
     id: UUID
     name: str
     created_at: Optional[datetime] = None
+    member_count: int = 0
+    pending_count: int = 0
     members: List[GroupMemberSimple] = Field(default_factory=list)
     
     model_config = ConfigDict(from_attributes=True)
+
+# Lightweight group for list responses (no embedded members)
+class GroupSummaryResponse(BaseModel):
+    id: UUID
+    name: str
+    created_at: Optional[datetime] = None
+    member_count: int = 0
+    pending_count: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
     
 class GroupResponseResource(BaseResponse):
     data: GroupResponse
 
 class ListGroupResponseResource(ListResponseWithPagination):
-    data: List[GroupResponse]
+    data: List[GroupSummaryResponse]
+
+# Groups of the current user, with the user's own role
+class MyGroupFilter(BaseModel):
+    cursor: Optional[str] = None
+    limit: Optional[int] = Field(default=100)
+    include_members: Optional[bool] = False
+
+class MyGroupResponse(GroupSummaryResponse):
+    role: str
+    members: Optional[List[GroupMemberSimple]] = None
 
 class ListMyGroupResponseResource(ListResponse):
-    data: List[GroupResponse]
+    data: List[MyGroupResponse]
+    metadata: Dict[str, Any] = Field({})
+
+# Group members (paginated)
+class GroupMemberFilter(BasePaginationFilter):
+    role: Optional[str] = None
+
+class ListGroupMemberResponseResource(ListResponseWithPagination):
+    data: List[GroupMemberSimple]
 
 class JoinGroupPayload(BaseModel):
     token: str
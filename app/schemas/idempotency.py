@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel, ConfigDict
+
+class IdempotencyKeySchema(BaseModel):
+    scope: str
+    key: str
+    fingerprint: str
+    status: Optional[str] = None
+    response: Optional[Any] = None
+    created_at: datetime
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
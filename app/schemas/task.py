@@ -9,6 +9,14 @@ from app.schemas.common import GroupSimple, UserSimple
 class TaskFilter(BasePaginationFilter):
     title: Optional[str] = None
     status: Optional[StatusTask] = None
+    q: Optional[str] = Field(default=None, description="Search in title and description")
+    sort: Optional[str] = Field(default=None, description="Comma-separated, '-' for descending: -due_date,id. Fields: id, created_at, due_date, status")
+    due_date_gte: Optional[datetime] = Field(default=None, alias="due_date[gte]")
+    due_date_lt: Optional[datetime] = Field(default=None, alias="due_date[lt]")
+    created_at_gte: Optional[datetime] = Field(default=None, alias="created_at[gte]")
+    created_at_lt: Optional[datetime] = Field(default=None, alias="created_at[lt]")
+    status_in: Optional[str] = Field(default=None, alias="status[in]", description="Comma-separated statuses")
+    assigned_to_id_in: Optional[str] = Field(default=None, alias="assigned_to_id[in]", description="Comma-separated user ids")
 
 class TaskPayload(BaseModel):
     title: str
@@ -97,4 +105,19 @@ class AttachmentResponse(BaseModel):
     file_size: int
     file_type: str
     uploaded_by: str
-    uploaded_at: str
\ No newline at end of file
+    uploaded_at: str
+# Task counters
+class TaskCounterSchema(BaseModel):
+    scope: str
+    scope_id: UUID
+    status: str
+    count: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TaskCounterResponse(BaseModel):
+    counts: Dict[str, int] = Field(default_factory=dict)
+    total: int = 0
+
+class TaskCounterResponseResource(BaseResponse):
+    data: TaskCounterResponse
@@ -1,7 +1,8 @@
 from typing import TypeVar, Generic, Optional
 from app.utils.logger import logger
+from app.utils.tracing import trace_methods
 from app.utils.other import list_filter_dict_to_list
-from app.utils.http_exceptions import not_found
+from app.utils.http_exceptions import not_found, bad_request
 from app.repositories.base import BaseRepositoryProtocol
 
 TRepo = TypeVar("TRepo", bound=BaseRepositoryProtocol)
@@ -15,6 +16,11 @@ class BaseService(Generic[TRepo]):
     """
     repository: Optional[TRepo] = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Spans around public methods when tracing is enabled
+        trace_methods(cls, "service")
+
     def __init__(self, repository: Optional[TRepo] = None):
         """
         Initialize the BaseService with a repository and schema class.
@@ -37,7 +43,7 @@ class BaseService(Generic[TRepo]):
     def format_filters(self, filters=None):
         return filters if isinstance(filters, list) else list_filter_dict_to_list(filters=filters or [])
 
-    def get_all_with_filters_and_pagination(self, filters=[], page=1, limit=10, to_model=False, schema_response=None):
+    def get_all_with_filters_and_pagination(self, filters=[], page=1, limit=10, to_model=False, schema_response=None, order_by=None):
         """
         Retrieve all records with filters and pagination.
 
@@ -46,20 +52,28 @@ class BaseService(Generic[TRepo]):
             page: The page number for pagination.
             limit: The number of records per page.
             schema_response: The schema to use for serializing the response data.
+            order_by: Comma-separated sort fields ("-due_date,id"); defaults to created_at.
 
         Returns:
             A tuple containing the filtered data and pagination details.
 
         Raises:
+            HTTPError: 400 if a filter or sort field is not backed by an index.
             Exception: If an error occurs during data retrieval.
         """
+        try:
+            self.repo.validate_query(filters, order_by)
+        except ValueError as e:
+            bad_request(msg=str(e))
+
         try:
             datas, pagination = self.repo.get_all_with_filters_and_pagination(
                 filters=filters,
                 page=page,
                 limit=limit,
                 to_model=to_model,
-                schema_response=schema_response
+                schema_response=schema_response,
+                **({"order_by": order_by} if order_by else {})
             )
             
             return datas, pagination
@@ -88,7 +102,7 @@ class BaseService(Generic[TRepo]):
             logger.error(f"Err in get_all_with_filters: {e}", exc_info=e)
             raise
 
-    def get_by_id(self, id=None, to_model=False, schema_response=None, raise_error=True):
+    def get_by_id(self, id=None, to_model=False, schema_response=None, raise_error=True, cached=True):
         """
         Retrieve a record by its ID.
 
@@ -97,6 +111,7 @@ class BaseService(Generic[TRepo]):
             to_model: If True, convert the record to a model instance.
             schema_response: The schema to use for serializing the response data.
             raise_error: If True, return None instead of raising error when not found.
+            cached: Use the repository's entity cache; pass False before modifying the record.
 
         Returns:
             The record with the specified ID.
@@ -105,7 +120,7 @@ class BaseService(Generic[TRepo]):
             Exception: If an error occurs during data retrieval.
         """
         try:
-            datas = self.repo.get_by_id(id, to_model=to_model, schema_response=schema_response)
+            datas = self.repo.get_by_id(id, to_model=to_model, schema_response=schema_response, cached=cached)
             if not datas and raise_error:
                 not_found(
                     title=f"{self.entity_name} not found",
@@ -297,3 +312,6 @@ class BaseService(Generic[TRepo]):
         except Exception as e:
             logger.error(f"Error in delete_with_filters: {e}", exc_info=e)
             raise
+
+
+trace_methods(BaseService, "service")
@@ -3,8 +3,8 @@ from app.container import ServiceContainer
 from app.repositories.group_member_repository import GroupMemberRepository
 from app.services.base import BaseService
 from app.utils.logger import logger
-from app.utils.enums import EntityType
-from app.utils.http_exceptions import not_found
+from app.utils.enums import EntityType, GroupRole
+from app.utils.http_exceptions import not_found, forbidden
 
 if TYPE_CHECKING:
     from app.services.group_service import GroupService
@@ -19,4 +19,15 @@ class GroupMemberService(BaseService[GroupMemberRepository]):
     @property
     def group_service(self) -> "GroupService":
         return ServiceContainer.get(EntityType.GROUP)
+
+    def require_member(self, group_id: str, user_id: str):
+        """Raise 403 unless the user is a member of the group (not pending). Returns the membership."""
+        member = self.get_one_by_filters(
+            {"group_id": group_id, "user_id": user_id},
+            to_model=True,
+            raise_error=False,
+        )
+        if member is None or member.role == GroupRole.PENDING.value:
+            forbidden(msg="You are not a member of this group")
+        return member
     
\ No newline at end of file
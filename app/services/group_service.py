@@ -1,17 +1,26 @@
+import uuid
+from datetime import datetime
+from pony.orm import commit
 from typing import TYPE_CHECKING
 from app.container import ServiceContainer
 from app.repositories.group_repository import GroupRepository
 from app.services.base import BaseService
-from app.schemas.group import GroupResponse, PreviewGroupResponse
+from app.schemas.group import GroupResponse, MyGroupResponse, PreviewGroupResponse
+from app.schemas.common import GroupMemberSimple
 from app.utils.logger import logger
-from app.utils.enums import EntityType, GroupRole
+from app.utils.enums import EntityType, GroupRole, CounterScope
 from app.utils.http_exceptions import not_found, bad_request, forbidden, conflict
 from app.utils.token_group import verify_group_invite_token, generate_group_invite_token
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.serializer import get_serializer
+from app.utils.deadline import check_deadline
+from app.utils.response_cache import bump_version, scope
 
 if TYPE_CHECKING:
     from app.services.group_member_service import GroupMemberService
     from app.services.user_service import UserService
     from app.services.task_service import TaskService
+    from app.services.task_counter_service import TaskCounterService
 
 class GroupService(BaseService[GroupRepository]):
     
@@ -31,17 +40,47 @@ class GroupService(BaseService[GroupRepository]):
     def task_service(self) -> "TaskService":
         return ServiceContainer.get(EntityType.TASK)
 
-    def get_all_group_by_member(self, user_id: str):
-        group_members = self.group_member_service.get_all_with_filters(filters={
-            "user_id": user_id,
-        }, to_model=True)
-        
-        if not group_members:
-            return []
-        
-        group_ids = {x.group.id: x for x in group_members}
+    @property
+    def task_counter_service(self) -> "TaskCounterService":
+        return ServiceContainer.get(EntityType.TASK_COUNTER)
+
+    def get_all_group_by_member(self, user_id: str, cursor: str = None, limit: int = 100, include_members: bool = False):
+        after = None
+        if cursor:
+            try:
+                created_at, group_id = decode_cursor(cursor)
+                after = (datetime.fromisoformat(created_at), uuid.UUID(group_id))
+            except (ValueError, TypeError):
+                bad_request(msg="Invalid cursor")
+
+        rows, has_more = self.repo.get_groups_by_member(user_id, after=after, limit=limit)
+        serialize = get_serializer(MyGroupResponse)
+        items = [serialize(row) for row in rows]
 
-        return self.get_all_with_filters({"ids": list(group_ids.keys())})
+        if include_members and items:
+            members_by_group = {}
+            serialize_member = get_serializer(GroupMemberSimple)
+            for member in self.group_member_service.repo.get_members_of_groups([row["id"] for row in rows]):
+                members_by_group.setdefault(str(member.group.id), []).append(
+                    serialize_member(member)
+                )
+            for item in items:
+                item["members"] = members_by_group.get(item["id"], [])
+
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None
+        return items, {"next_cursor": next_cursor, "limit": limit}
+    
+    def get_group_members(self, group_id: str, user_id: str, filters: list = None, page: int = 1, limit: int = 100):
+        self.get_by_id(id=group_id, to_model=True)
+        self.group_member_service.require_member(group_id, user_id)
+
+        filters = [*(filters or []), {"field": "group_id", "value": group_id}]
+        return self.group_member_service.get_all_with_filters_and_pagination(
+            filters=filters,
+            page=page,
+            limit=limit,
+            schema_response=GroupMemberSimple,
+        )
     
     def create_group(self, payload: dict = None, user_id: str = None):
         try:
@@ -50,8 +89,8 @@ class GroupService(BaseService[GroupRepository]):
             if not user:
                 not_found(msg=f"User id '{user_id}' is not found.")
             
-            # Make a new group
-            new_group = self.repo.create(payload, to_model=True)
+            # Make a new group (the creator is its first member)
+            new_group = self.repo.create({**payload, "member_count": 1}, to_model=True)
             
             # Assign account to admin group member
             self.group_member_service.create({
@@ -59,6 +98,7 @@ class GroupService(BaseService[GroupRepository]):
                 "user": user,
                 "role": GroupRole.ADMIN.value
             }, to_model=True)
+            bump_version(scope(CounterScope.USER, user_id))
             
             return GroupResponse.model_validate(new_group).model_dump(mode="json")
             
@@ -66,6 +106,11 @@ class GroupService(BaseService[GroupRepository]):
             logger.error(f"Err in create_group: {e}", exc_info=e)
             raise
     
+    def update(self, data):
+        result = super().update(data)
+        bump_version(scope(CounterScope.GROUP, data.get("id")))
+        return result
+
     def delete_group_by_id(self, group_id: str, user_id: str):
         group = self.get_by_id(id=group_id, to_model=True)
         if not group:
@@ -82,13 +127,18 @@ class GroupService(BaseService[GroupRepository]):
         filters = {
             "group_id": group_id
         }
-        
+
+        # Large groups take a while to delete: bail out before the bulk deletes
+        check_deadline()
+
         # Delete Member Group & Task
         self.group_member_service.delete_with_filters(filters=filters, soft_delete=False)
         self.task_service.delete_with_filters(filters=filters, soft_delete=False)
+        self.task_counter_service.delete_scope(CounterScope.GROUP, group_id)
 
         # Delete Group
         self.repo.delete_by_id(id=group_id, soft_delete=False)
+        bump_version(scope(CounterScope.GROUP, group_id))
 
         return True
 
@@ -121,10 +171,7 @@ class GroupService(BaseService[GroupRepository]):
         if not group:
             not_found(msg="Group not found")
 
-        result = PreviewGroupResponse.model_validate(group).model_dump(mode="json")
-        result["member_count"] = len([m for m in group.members if m.role != "pending"])
-        
-        return result
+        return PreviewGroupResponse.model_validate(group).model_dump(mode="json")
 
     def request_join_group_by_token(self, token: str, user_id: str):
         data = verify_group_invite_token(token)
@@ -153,6 +200,8 @@ class GroupService(BaseService[GroupRepository]):
             "user": user,
             "role": "pending"
         }, to_model=True)
+        self.repo.adjust_member_counts(group_id, pending=1)
+        bump_version(scope(CounterScope.GROUP, group_id), scope(CounterScope.USER, user_id))
 
         return {"message": "Success requested"}
     
@@ -173,12 +222,16 @@ class GroupService(BaseService[GroupRepository]):
         if member.role != "pending":
             conflict(msg="User is not pending")
 
+        bump_version(scope(CounterScope.GROUP, group_id), scope(CounterScope.USER, user_id))
+
         if approve:
             member.role = "member"
+            self.repo.adjust_member_counts(group_id, members=1, pending=-1)
             return {"approved": True, "message": "Member approved"}
         else:
             # Reject — hapus dari group
             member.delete()
+            self.repo.adjust_member_counts(group_id, pending=-1)
             return {"approved": False, "message": "Member rejected"}
     
     def leave_group_by_user(self, group_id: str, user_id: str):
@@ -192,6 +245,7 @@ class GroupService(BaseService[GroupRepository]):
 
         self.task_service.unassign_tasks_by_user_in_group(group_id=group_id, user_id=user_id)
         
+        self._release_member_count(group_id, user_id, member.role)
         self.group_member_service.delete_with_filters(filters=filters)
 
         return True
@@ -214,6 +268,44 @@ class GroupService(BaseService[GroupRepository]):
 
         self.task_service.unassign_tasks_by_user_in_group(group_id=group_id, user_id=user_id)
         
+        self._release_member_count(group_id, user_id, member.role)
         self.group_member_service.delete_with_filters(filters=filters)
 
-        return True
\ No newline at end of file
+        return True
+
+    def _release_member_count(self, group_id: str, user_id: str, role: str):
+        bump_version(scope(CounterScope.GROUP, group_id), scope(CounterScope.USER, user_id))
+        if role == GroupRole.PENDING.value:
+            self.repo.adjust_member_counts(group_id, pending=-1)
+        else:
+            self.repo.adjust_member_counts(group_id, members=-1)
+
+    def reconcile_member_counts(self) -> int:
+        """
+        Rebuild member_count / pending_count from group_members and fix any
+        drift, a batch of groups per transaction.
+
+        Returns:
+            The number of groups that were corrected.
+        """
+        try:
+            drift, after = 0, None
+            while True:
+                corrected, after = self.repo.reconcile_member_counts(after)
+                # Release the batch's row locks before the next one
+                commit()
+                for group_id in corrected:
+                    self.repo.invalidate_cache(group_id)
+                    bump_version(scope(CounterScope.GROUP, group_id))
+
+                drift += len(corrected)
+                if after is None:
+                    break
+
+            if drift:
+                logger.warning(f"[COUNTERS] Reconciled {drift} drifted group member count(s)")
+
+            return drift
+        except Exception as e:
+            logger.error(f"Err in reconcile_member_counts: {e}", exc_info=e)
+            raise
\ No newline at end of file
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+from app.config.config import IDEMPOTENCY_TTL
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.services.base import BaseService
+from app.utils.http_exceptions import conflict, unprocessable
+from app.utils.logger import logger
+
+class IdempotencyService(BaseService[IdempotencyRepository]):
+
+    def __init__(self):
+        # We pass the repo and the schema variable to the parent
+        super().__init__(repository=IdempotencyRepository())
+
+    def begin(self, scope: str, key: str, fingerprint: str):
+        """
+        Claim an idempotency key for a request.
+
+        Returns:
+            None if the request should run, or (status, response) to replay.
+
+        Raises:
+            HTTPError: 422 if the key was used for a different request,
+            409 if the original request has not completed yet.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=IDEMPOTENCY_TTL)
+        stored = self.repo.claim(scope, key, fingerprint, expires_at)
+        if stored is None:
+            return None
+
+        if stored.fingerprint != fingerprint:
+            unprocessable(msg="Idempotency-Key was already used for a different request")
+        if stored.status is None:
+            conflict(msg="A request with this Idempotency-Key is still in progress")
+
+        logger.info(f"[IDEMPOTENCY] Replaying response for key {key}")
+        return stored.status, stored.response
+
+    def finish(self, scope: str, key: str, status: str, response):
+        self.repo.complete(scope, key, status, response)
+
+    def purge_expired(self) -> int:
+        return self.repo.purge_expired()
@@ -1,13 +1,21 @@
 import uuid
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
 from app.config.config import SUPABASE_URL, SUPABASE_SERVICE_KEY
 from app.utils.logger import logger
+from app.utils.metrics import STORAGE_LATENCY
+from app.utils.tracing import trace_methods, SPAN_KIND_CLIENT
+
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 BUCKET_NAME = "task-attachments"
 
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
+    # The Supabase client stack is imported on the first upload or delete, not at boot
+    from supabase import create_client
     return create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
 
@@ -26,11 +34,12 @@ class StorageService:
             unique_name = f"{uuid.uuid4()}_{file_name}"
             file_path = f"{task_id}/{unique_name}"
 
-            self.client.storage.from_(self.bucket).upload(
-                path=file_path,
-                file=file_bytes,
-                file_options={"content-type": content_type},
-            )
+            with STORAGE_LATENCY.labels("upload").time():
+                self.client.storage.from_(self.bucket).upload(
+                    path=file_path,
+                    file=file_bytes,
+                    file_options={"content-type": content_type},
+                )
 
             # Build public URL
             file_url = (
@@ -61,7 +70,8 @@ class StorageService:
         """
         try:
             file_path = f"{task_id}/{unique_file_name}"
-            self.client.storage.from_(self.bucket).remove([file_path])
+            with STORAGE_LATENCY.labels("delete").time():
+                self.client.storage.from_(self.bucket).remove([file_path])
             return True
         except Exception as e:
             logger.error(f"Error deleting file: {e}", exc_info=e)
@@ -74,7 +84,8 @@ class StorageService:
         """
         try:
             # List semua file dalam folder
-            files = self.client.storage.from_(self.bucket).list(task_id)
+            with STORAGE_LATENCY.labels("list").time():
+                files = self.client.storage.from_(self.bucket).list(task_id)
             if not files:
                 return True
             
@@ -82,8 +93,12 @@ class StorageService:
             paths = [f"{task_id}/{f['name']}" for f in files]
             
             # Remove semua sekaligus
-            self.client.storage.from_(self.bucket).remove(paths)
+            with STORAGE_LATENCY.labels("delete").time():
+                self.client.storage.from_(self.bucket).remove(paths)
             return True
         except Exception as e:
             logger.error(f"Error deleting folder: {e}", exc_info=e)
-            raise
\ No newline at end of file
+            raise
+
+
+trace_methods(StorageService, "storage", kind=SPAN_KIND_CLIENT)
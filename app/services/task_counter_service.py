@@ -0,0 +1,75 @@
+import uuid
+from app.repositories.task_counter_repository import TaskCounterRepository
+from app.services.base import BaseService
+from app.utils.logger import logger
+from app.utils.enums import CounterScope, StatusTask
+
+class TaskCounterService(BaseService[TaskCounterRepository]):
+    
+    def __init__(self):
+        # We pass the repo and the schema variable to the parent
+        super().__init__(repository=TaskCounterRepository())
+
+    @staticmethod
+    def snapshot(task):
+        """
+        Resolve the counter a task contributes to.
+
+        Group tasks count towards their group, personal tasks (no group)
+        towards the assigned user. Returns (scope, scope_id, status) or None.
+        """
+        if task is None or task.is_deleted:
+            return None
+        return TaskCounterService.snapshot_values(
+            task.status,
+            task.group.id if task.group else None,
+            task.assigned_to.id if task.assigned_to else None,
+        )
+
+    @staticmethod
+    def snapshot_values(status, group_id=None, assigned_to_id=None):
+        """Same as snapshot(), from raw column values (e.g. an UPDATE ... RETURNING row)."""
+        if group_id:
+            return (CounterScope.GROUP.value, uuid.UUID(str(group_id)), status)
+        if assigned_to_id:
+            return (CounterScope.USER.value, uuid.UUID(str(assigned_to_id)), status)
+        return None
+
+    def record_change(self, before=None, after=None):
+        """Move one task between counters, given snapshots taken around a write."""
+        if before == after:
+            return
+        if before:
+            self.repo.increment(*before, delta=-1)
+        if after:
+            self.repo.increment(*after, delta=1)
+
+    def get_counters(self, scope: CounterScope, scope_id: str):
+        counts = {status.value: 0 for status in StatusTask}
+        for status, n in self.repo.get_counts(scope.value, scope_id).items():
+            counts[status] = max(n, 0)
+
+        return {
+            "counts": counts,
+            "total": sum(counts.values()),
+        }
+
+    def delete_scope(self, scope: CounterScope, scope_id: str):
+        return self.repo.delete_scope(scope.value, scope_id)
+
+    def reconcile(self) -> int:
+        """
+        Rebuild counters from the tasks table and fix any drift.
+
+        Returns:
+            The number of counter rows that were corrected.
+        """
+        try:
+            drift = self.repo.reconcile()
+            if drift:
+                logger.warning(f"[COUNTERS] Reconciled {drift} drifted task counter(s)")
+            
+            return drift
+        except Exception as e:
+            logger.error(f"Err in reconcile: {e}", exc_info=e)
+            raise
@@ -5,14 +5,27 @@ from app.repositories.task_repository import TaskRepository
 from app.services.base import BaseService
 from app.schemas.task import  *
 from app.utils.logger import logger
-from app.utils.http_exceptions import not_found
-from app.utils.enums import EntityType
+from app.utils.http_exceptions import not_found, forbidden
+from app.utils.enums import EntityType, CounterScope, GroupRole
+from app.utils.serializer import get_serializer
+from app.utils.deadline import check_deadline
+from app.utils.response_cache import bump_version, scope
 
 if TYPE_CHECKING:
     from app.services.group_service import GroupService
     from app.services.group_member_service import GroupMemberService
     from app.services.user_service import UserService
     from app.services.storage_service import StorageService
+    from app.services.task_counter_service import TaskCounterService
+
+
+def _is_uuid(value) -> bool:
+    try:
+        UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
 
 class TaskService(BaseService[TaskRepository]):
     
@@ -36,6 +49,10 @@ class TaskService(BaseService[TaskRepository]):
     def storage_service(self) -> "StorageService":
         return ServiceContainer.get(EntityType.STORAGE)
 
+    @property
+    def task_counter_service(self) -> "TaskCounterService":
+        return ServiceContainer.get(EntityType.TASK_COUNTER)
+
     def create_task(self, payload: dict = None, user_id: str = None):
         try:
             payload = payload or {}
@@ -92,6 +109,9 @@ class TaskService(BaseService[TaskRepository]):
                 },
                 to_model=True,
             )
+            after = self.task_counter_service.snapshot(new_task)
+            self.task_counter_service.record_change(after=after)
+            self._bump_list_versions(after)
 
             return TaskResponse.model_validate(new_task).model_dump(mode="json")
 
@@ -99,98 +119,142 @@ class TaskService(BaseService[TaskRepository]):
             logger.error(f"Create task error: {e}")
             raise
     
-    def update_task(self, payload: dict = None):
+    def update_task(self, payload: dict = None, user_id: str = None):
         try:
             payload = payload or {}
 
-            task = self.repo.get_by_id(id=payload.get("id"), to_model=True)
-            if not task:
-                not_found(msg="Task not found")
-
             # Validate payload (Pydantic)
             validated_payload = TaskUpdate.model_validate(payload).model_dump()
 
-            assigned_to_id = payload.get("assigned_to_id")
+            data = {
+                key: validated_payload[key]
+                for key in ("title", "description", "status", "due_date", "attachment")
+            }
             if "assigned_to_id" in payload:
-                new_user = None
-                if assigned_to_id:  # hanya fetch user jika tidak None
-                    new_user = self.user_service.get_by_id(
-                        id=assigned_to_id,
-                        to_model=True,
-                        raise_error=False,
-                    )
+                data["assigned_to"] = payload.get("assigned_to_id") or None  # None = unassign
 
-                    if not new_user:
-                        not_found(msg=f"User '{assigned_to_id}' not found")
-
-                    if task.group:
-                        is_member = self.group_member_service.get_one_by_filters(
-                            {"group_id": str(task.group.id), "user_id": assigned_to_id},
-                            raise_error=True,
-                        )
-                        if not is_member:
-                            not_found(msg="User is not in this group")
-
-                validated_payload["assigned_to"] = new_user  # None = unassign
-
-            return self.update(validated_payload)
+            return self._update_checked(payload.get("id"), data, user_id)
 
         except Exception as e:
             logger.error(f"Update task error: {e}")
             raise
 
-    def update_status_or_assign(self, task_id: str, payload: dict):
+    def update_status_or_assign(self, task_id: str, payload: dict, user_id: str = None):
         try:
             # Validate request
             validated = TaskUpdateStatusOrAssign.model_validate(payload)
 
-            task = self.repo.get_by_id(task_id, to_model=True)
-            if not task:
-                not_found(msg="Task not found")
+            data = {}
+            if validated.status is not None:
+                data["status"] = validated.status
+            if validated.assigned_to_id is not None:
+                data["assigned_to"] = validated.assigned_to_id
 
-            update_data = {"id": task_id}
+            return self._update_checked(task_id, data, user_id)
 
-            # =========================
-            # Update STATUS
-            # =========================
-            if validated.status is not None:
-                update_data["status"] = validated.status
+        except Exception as e:
+            logger.error(f"Error update_status_or_assign: {e}")
+            raise
 
-            # =========================
-            # Update ASSIGNED USER
-            # =========================
-            if validated.assigned_to_id is not None:
-                new_user = self.user_service.get_by_id(
-                    id=validated.assigned_to_id,
+    def _update_checked(self, task_id: str, data: dict, user_id: str = None):
+        """
+        Apply a task update if `user_id` (when given) may edit the task and a new
+        assignee exists and belongs to the task's group.
+
+        On Postgres this is one UPDATE ... RETURNING statement with the checks as
+        predicates; only when no row is updated are the checks re-run to pick
+        404 or 403. Other providers check first, then update through the ORM.
+        Malformed ids are 404s on both paths, like ids that don't exist.
+        """
+        if not _is_uuid(task_id):
+            not_found(msg="Task not found")
+        assigned_to_id = data.get("assigned_to")
+        if assigned_to_id is not None and not _is_uuid(assigned_to_id):
+            not_found(msg=f"User '{assigned_to_id}' not found")
+
+        if not self.repo.is_postgres:
+            task, assignee = self._check_task_update(task_id, data.get("assigned_to"), user_id)
+            before = self.task_counter_service.snapshot(task)
+            if "assigned_to" in data:
+                data = {**data, "assigned_to": assignee}
+            task.set(**data)
+            after = self.task_counter_service.snapshot(task)
+            self.task_counter_service.record_change(before, after)
+            self._bump_list_versions(before, after)
+            return TaskResponse.model_validate(task).model_dump(mode="json")
+
+        row = self.repo.update_checked(task_id, data, user_id=user_id)
+        if row is None:
+            self._check_task_update(task_id, data.get("assigned_to"), user_id)
+            not_found(msg="Task not found")  # changed concurrently
+
+        before = self.task_counter_service.snapshot_values(
+            row.pop("old_status"), row.pop("old_group_id"), row.pop("old_assigned_to_id")
+        )
+        after = self.task_counter_service.snapshot_values(
+            row["status"],
+            row["group"]["id"] if row["group"] else None,
+            row["assigned_to"]["id"] if row["assigned_to"] else None,
+        )
+        self.task_counter_service.record_change(before, after)
+        self._bump_list_versions(before, after)
+
+        return get_serializer(TaskResponse)(row)
+
+    @staticmethod
+    def _bump_list_versions(*snapshots):
+        """Invalidate cached task lists of the scopes (personal or group) the task was or is in."""
+        bump_version(*(scope(CounterScope(kind), scope_id) for kind, scope_id, _ in filter(None, snapshots)))
+
+    def _check_task_update(self, task_id: str, assigned_to_id: str = None, user_id: str = None):
+        """Raise the 404/403 a task update would fail with. Returns (task, new assignee)."""
+        task = self.repo.get_by_id(task_id, to_model=True)
+        if not task:
+            not_found(msg="Task not found")
+
+        if user_id:
+            if task.group:
+                member = self.group_member_service.get_one_by_filters(
+                    {"group_id": str(task.group.id), "user_id": user_id},
                     to_model=True,
                     raise_error=False,
                 )
+                allowed = member is not None and member.role != GroupRole.PENDING.value
+            else:
+                allowed = task.assigned_to is not None and str(task.assigned_to.id) == str(user_id)
+            if not allowed:
+                forbidden(msg="You do not have access to this task")
+
+        assignee = None
+        if assigned_to_id:
+            assignee = self.user_service.get_by_id(
+                id=assigned_to_id,
+                to_model=True,
+                raise_error=False,
+            )
+            if not assignee:
+                not_found(msg=f"User '{assigned_to_id}' not found")
 
-                if not new_user:
-                    not_found(msg=f"User '{validated.assigned_to_id}' not found")
-
-                # Optional: check group membership
-                if task.group:
-                    is_member = self.group_member_service.get_one_by_filters(
-                        {
-                            "group_id": str(task.group.id),
-                            "user_id": validated.assigned_to_id,
-                        },
-                        raise_error=False,
-                    )
-
-                    if not is_member:
-                        not_found(msg="User is not in this group")
-
-                update_data["assigned_to"] = new_user
+            if task.group:
+                is_member = self.group_member_service.get_one_by_filters(
+                    {"group_id": str(task.group.id), "user_id": assigned_to_id},
+                    to_model=True,
+                    raise_error=False,
+                )
+                if not is_member or is_member.role == GroupRole.PENDING.value:
+                    not_found(msg="User is not in this group")
 
-            return self.repo.update(update_data)
+        return task, assignee
 
-        except Exception as e:
-            logger.error(f"Error update_status_or_assign: {e}")
-            raise
+    def get_task_counters(self, user_id: str, group_id: str = None):
+        """Per-status task counts for a group (of which the user is a member), or for the user's personal tasks."""
+        if group_id:
+            self.group_member_service.require_member(group_id, user_id)
+            return self.task_counter_service.get_counters(CounterScope.GROUP, group_id)
+        return self.task_counter_service.get_counters(CounterScope.USER, user_id)
 
     def unassign_tasks_by_user_in_group(self, group_id: str, user_id: str):
+        bump_version(scope(CounterScope.GROUP, group_id))
         return self.update_all_with_filters(filters={
             "group_id": group_id,
             "user_id": user_id,
@@ -207,6 +271,9 @@ class TaskService(BaseService[TaskRepository]):
             if not task:
                 not_found(msg="Task not found")
 
+            # Don't start the upload if the client has already given up
+            check_deadline()
+
             # Upload to Supabase Storage
             uploaded = self.storage_service.upload_file(
                 file_bytes=file_bytes,
@@ -224,6 +291,7 @@ class TaskService(BaseService[TaskRepository]):
             })
 
             task.attachment = current_attachments
+            self._bump_list_versions(self.task_counter_service.snapshot(task))
 
             return TaskResponse.model_validate(task).model_dump(mode="json")
 
@@ -261,6 +329,7 @@ class TaskService(BaseService[TaskRepository]):
 
             # Remove from attachment list
             task.attachment = [a for a in current_attachments if a.get("id") != attachment_id]
+            self._bump_list_versions(self.task_counter_service.snapshot(task))
 
             return TaskResponse.model_validate(task).model_dump(mode="json")
 
@@ -293,7 +362,12 @@ class TaskService(BaseService[TaskRepository]):
             if attachments:
                 self.storage_service.delete_folder(task_id=task_id)
 
-            return self.delete_by_id(id=task_id, soft_delete=False)
+            before = self.task_counter_service.snapshot(task)
+            result = self.delete_by_id(id=task_id, soft_delete=False)
+            self.task_counter_service.record_change(before=before)
+            self._bump_list_versions(before)
+
+            return result
 
         except Exception as e:
             logger.error(f"Delete task with attachments error: {e}")
@@ -1,4 +1,6 @@
 import re
+from typing import TYPE_CHECKING
+from app.container import ServiceContainer
 from app.schemas.user import *
 from app.repositories.user_repository import UserRepository
 from app.services.base import BaseService
@@ -6,6 +8,11 @@ from app.utils.logger import logger
 from app.utils.other import check_string, hash_string
 from app.utils.jwt import create_access_token
 from app.utils.http_exceptions import not_found, conflict, bad_request
+from app.utils.enums import EntityType, CounterScope
+from app.utils.response_cache import bump_version, scope, enabled as response_cache_enabled
+
+if TYPE_CHECKING:
+    from app.services.group_member_service import GroupMemberService
 
 class UserService(BaseService[UserRepository]):
     EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
@@ -13,6 +20,10 @@ class UserService(BaseService[UserRepository]):
     def __init__(self):
         # We pass the repo and the schema variable to the parent
         super().__init__(repository=UserRepository())
+
+    @property
+    def group_member_service(self) -> "GroupMemberService":
+        return ServiceContainer.get(EntityType.GROUP_MEMBER)
         
     def auth_login(self, payload: dict = {}):
         try:
@@ -66,19 +77,51 @@ class UserService(BaseService[UserRepository]):
             logger.error(f"Err in auth_register: {str(e)}", exc_info=True)
             raise e
     
+    def update_profile(self, payload: dict, user_id: str):
+        try:
+            updated = self.update_one_with_filters(filters={"id": user_id}, data=payload)
+
+            # The user's name shows in their task list and in the member lists of their groups
+            if response_cache_enabled():
+                memberships, _ = self.group_member_service.get_all_with_filters_and_pagination(
+                    filters=[{"field": "user_id", "value": user_id}], limit=0, to_model=True,
+                )
+                bump_version(
+                    scope(CounterScope.USER, user_id),
+                    *(scope(CounterScope.GROUP, member.group.id) for member in memberships),
+                )
+
+            return updated
+        except Exception as e:
+            logger.error(f"Err in update_profile: {str(e)}", exc_info=True)
+            raise e
+
     def update_password_user(self, payload: dict, user_id: str):
         try:
             current_password = payload.get("current_password")
             new_password = payload.get("password")
 
-            user_exist = self.get_by_id(id=user_id, to_model=True)
+            user_exist = self.get_by_id(id=user_id, to_model=True, cached=False)
             if not user_exist:
                 not_found(msg="User not found.")
 
             if not check_string(current_password, user_exist.password):
                 bad_request(msg="Current password is incorrect.")
             
-            self.update({"id": user_exist.id, "password": hash_string(new_password)})
+            if not self.repo.is_postgres:
+                user_exist.password = hash_string(new_password)
+                self.repo.invalidate_cache(user_exist.id)
+                return True
+
+            # One conditional UPDATE; the hash guard rejects a concurrent password change
+            updated = self.repo.update_returning(
+                user_exist.id,
+                {"password": hash_string(new_password)},
+                conditions=["t.password = $current_hash"],
+                params={"current_hash": user_exist.password},
+            )
+            if not updated:
+                conflict(msg="Password was changed by another request, please try again.")
 
             return True
         
@@ -0,0 +1,319 @@
+import fcntl
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory, resource_tracker
+from typing import Protocol
+from urllib.parse import parse_qs, urlparse
+from app.config.config import CACHE_URL
+from app.utils.logger import logger
+
+
+class CacheBackend(Protocol):
+    """Byte-value store behind the application caches."""
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl: float): ...
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set the key only if it is absent; True when it was set."""
+        ...
+
+    def delete(self, key: str): ...
+
+
+class MemoryCache:
+    """Bounded LRU with per-entry expiry, private to the worker process."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _store(self, key, value, ttl):
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class RedisCache:
+    """
+    Shared tier on Redis. Failures are logged and behave as misses, so an
+    unavailable Redis slows requests down instead of failing them.
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self.errors = redis.RedisError
+
+    def get(self, key):
+        try:
+            return self.client.get(key)
+        except self.errors as e:
+            logger.warning(f"[CACHE] Redis get failed: {e}")
+            return None
+
+    def set(self, key, value, ttl):
+        try:
+            self.client.set(key, value, ex=max(math.ceil(ttl), 1))
+        except self.errors as e:
+            logger.warning(f"[CACHE] Redis set failed: {e}")
+
+    def add(self, key, value, ttl):
+        try:
+            return bool(self.client.set(key, value, ex=max(math.ceil(ttl), 1), nx=True))
+        except self.errors as e:
+            logger.warning(f"[CACHE] Redis add failed: {e}")
+            return False
+
+    def delete(self, key):
+        try:
+            self.client.delete(key)
+        except self.errors as e:
+            logger.warning(f"[CACHE] Redis delete failed: {e}")
+
+
+class SharedMemoryCache:
+    """
+    Shared tier in a shared memory segment, for the workers of one host.
+
+    The segment is a set-associative table of fixed-size slots: a key hashes
+    to a set of WAYS slots, whose 128-bit key tags sit next to each other so
+    a lookup reads them at once. When the set is full, the slot to reuse is
+    picked by a clock over the set's reference bits (reads set the bit, the
+    hand clears it and takes the first slot it finds clear). Values that
+    don't fit in a slot are not cached.
+
+    Reads take no lock: every slot carries a sequence number, odd while it is
+    being written, and a read that sees it change retries, then misses.
+    Writes lock the set's stripe: a thread lock in the process and a byte of
+    the lock file (fcntl record locks) across processes.
+    """
+
+    MAGIC = b"TODOSHM1"
+    HEADER = struct.Struct("<8sII")  # magic, slots, slot size
+    WAYS = 8
+    TAG_SIZE = 16  # key hash, all zeros when empty
+    EMPTY_TAG = bytes(TAG_SIZE)
+    SLOT = struct.Struct("<IdI")  # sequence, expires at, value length
+    STRIPES = 64
+    READ_RETRIES = 3
+
+    def __init__(self, name: str, slots: int = 32_768, slot_size: int = 2048):
+        if slots % self.WAYS or slot_size <= self.SLOT.size:
+            raise ValueError(f"slots must be a multiple of {self.WAYS} and slot_size larger than {self.SLOT.size}")
+        self.slots, self.slot_size = slots, slot_size
+        self.capacity = slot_size - self.SLOT.size
+        self.sets = slots // self.WAYS
+        self.ref_offset = self.HEADER.size
+        self.hand_offset = self.ref_offset + slots
+        self.tag_offset = self.hand_offset + self.sets
+        self.slot_offset = self.tag_offset + slots * self.TAG_SIZE
+        size = self.slot_offset + slots * slot_size
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.HEADER.pack_into(self.shm.buf, 0, self.MAGIC, slots, slot_size)
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.HEADER.unpack_from(self.shm.buf, 0) != (self.MAGIC, slots, slot_size):
+                raise ValueError(f"Shared memory '{name}' has another layout; remove /dev/shm/{name} or change its name")
+        # Outlive the worker that created it: the tracker would unlink it on exit
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.buf = self.shm.buf
+
+        self.lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self.lock_fd, self.lock_pid = None, None
+        self.thread_locks = [threading.Lock() for _ in range(self.STRIPES)]
+
+    def _hash(self, key):
+        """(tag, set index)."""
+        tag = hashlib.blake2b(key.encode(), digest_size=self.TAG_SIZE).digest()
+        return tag, int.from_bytes(tag[:8], "little") % self.sets
+
+    def _set_tags(self, set_index) -> bytes:
+        start = self.tag_offset + set_index * self.WAYS * self.TAG_SIZE
+        return bytes(self.buf[start:start + self.WAYS * self.TAG_SIZE])
+
+    def _find(self, tag, set_index):
+        """Way holding the tag in the set, or None."""
+        tags = self._set_tags(set_index)
+        position = tags.find(tag)
+        while position > 0 and position % self.TAG_SIZE:  # straddles two tags
+            position = tags.find(tag, position + 1)
+        return None if position < 0 else position // self.TAG_SIZE
+
+    def _process_lock_fd(self):
+        # Record locks belong to the process: open the file once per process
+        if self.lock_pid != os.getpid():
+            self.lock_fd, self.lock_pid = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600), os.getpid()
+        return self.lock_fd
+
+    def _locked(self, set_index, fn):
+        stripe = set_index % self.STRIPES
+        with self.thread_locks[stripe]:
+            fd = self._process_lock_fd()
+            fcntl.lockf(fd, fcntl.LOCK_EX, 1, stripe)
+            try:
+                return fn()
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, 1, stripe)
+
+    def _write(self, index, tag, expires_at, value):
+        offset = self.slot_offset + index * self.slot_size
+        tag_offset = self.tag_offset + index * self.TAG_SIZE
+        # Odd while writing, even again (and different) once done
+        seq = self.SLOT.unpack_from(self.buf, offset)[0] | 1
+        self.SLOT.pack_into(self.buf, offset, seq, expires_at, len(value))
+        self.buf[tag_offset:tag_offset + self.TAG_SIZE] = tag
+        self.buf[offset + self.SLOT.size:offset + self.SLOT.size + len(value)] = value
+        self.SLOT.pack_into(self.buf, offset, (seq + 1) & 0xFFFFFFFF, expires_at, len(value))
+
+    def get(self, key):
+        tag, set_index = self._hash(key)
+        way = self._find(tag, set_index)
+        if way is None:
+            return None
+
+        index = set_index * self.WAYS + way
+        offset = self.slot_offset + index * self.slot_size
+        for _ in range(self.READ_RETRIES):
+            seq, expires_at, length = self.SLOT.unpack_from(self.buf, offset)
+            value = bytes(self.buf[offset + self.SLOT.size:offset + self.SLOT.size + length])
+            if seq % 2 or self.SLOT.unpack_from(self.buf, offset)[0] != seq:
+                continue
+            # The slot may have been given to another key before the read
+            tag_offset = self.tag_offset + index * self.TAG_SIZE
+            if bytes(self.buf[tag_offset:tag_offset + self.TAG_SIZE]) != tag:
+                return None
+            if expires_at <= time.time():
+                return None
+            self.buf[self.ref_offset + index] = 1
+            return value
+        return None  # kept changing under us
+
+    def set(self, key, value, ttl):
+        self._store(key, value, ttl, only_if_absent=False)
+
+    def add(self, key, value, ttl):
+        return self._store(key, value, ttl, only_if_absent=True)
+
+    def _store(self, key, value, ttl, only_if_absent):
+        if len(value) > self.capacity:
+            return False
+
+        tag, set_index = self._hash(key)
+
+        def store():
+            way = self._find(tag, set_index)
+            now = time.time()
+            if way is None:
+                way = self._victim(set_index, now)
+            elif only_if_absent:
+                offset = self.slot_offset + (set_index * self.WAYS + way) * self.slot_size
+                if self.SLOT.unpack_from(self.buf, offset)[1] > now:
+                    return False
+            index = set_index * self.WAYS + way
+            self._write(index, tag, now + ttl, value)
+            self.buf[self.ref_offset + index] = 1
+            return True
+
+        return self._locked(set_index, store)
+
+    def _victim(self, set_index, now):
+        """Way of an empty or expired slot of the set, else the clock's pick (caller holds the stripe)."""
+        first = set_index * self.WAYS
+        empty = self._find(self.EMPTY_TAG, set_index)
+        if empty is not None:
+            return empty
+        for way in range(self.WAYS):
+            if self.SLOT.unpack_from(self.buf, self.slot_offset + (first + way) * self.slot_size)[1] <= now:
+                return way
+
+        hand = self.buf[self.hand_offset + set_index]
+        while True:
+            way = hand
+            hand = (hand + 1) % self.WAYS
+            if self.buf[self.ref_offset + first + way]:
+                self.buf[self.ref_offset + first + way] = 0
+                continue
+            self.buf[self.hand_offset + set_index] = hand
+            return way
+
+    def delete(self, key):
+        tag, set_index = self._hash(key)
+
+        def delete():
+            way = self._find(tag, set_index)
+            if way is not None:
+                index = set_index * self.WAYS + way
+                self._write(index, self.EMPTY_TAG, 0.0, b"")
+                self.buf[self.ref_offset + index] = 0
+
+        self._locked(set_index, delete)
+
+    def unlink(self):
+        """Remove the segment (benchmarks); processes attached to it keep their mapping."""
+        resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+
+
+_shared = None
+
+
+def get_shared_cache() -> CacheBackend | None:
+    """The shared tier configured by `cache_url`, or None."""
+    global _shared
+
+    if _shared is None and CACHE_URL:
+        if CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+            _shared = RedisCache(CACHE_URL)
+        elif CACHE_URL.startswith("shm://"):
+            _shared = _shared_memory_cache(CACHE_URL)
+        else:
+            raise ValueError(f"Unsupported cache_url '{CACHE_URL}'")
+        logger.info(f"[CACHE] Shared tier: {type(_shared).__name__}")
+    return _shared
+
+
+def _shared_memory_cache(url: str) -> SharedMemoryCache:
+    """shm://<name>?slots=<n>&slot_size=<bytes>"""
+    parsed = urlparse(url)
+    options = {name: int(values[-1]) for name, values in parse_qs(parsed.query).items()}
+    return SharedMemoryCache(parsed.netloc or "todo_cache", **options)
@@ -0,0 +1,64 @@
+import math
+import time
+from contextvars import ContextVar
+from app.utils.http_exceptions import service_unavailable
+
+# Monotonic time after which the client has given up on the current request
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+def set_deadline(seconds: float | None):
+    """Start the deadline of the current request, `seconds` from now (None clears it)."""
+    _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline, or None when the request has none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check_deadline():
+    """Abort with 503 when the client has already given up on this request."""
+    if expired():
+        service_unavailable(msg="Request deadline exceeded")
+
+
+def enforce_deadline(database):
+    """
+    Make Postgres cancel statements that would run past the request deadline.
+
+    The timeout is set lazily, in the same round trip as the first statement
+    of each transaction: prefixed to every statement in autocommit mode (each
+    is its own transaction) and to the one that opens a transaction otherwise.
+    It is transaction-local, so it never leaks to the next use of the
+    connection, and a request that sends no statement costs no database work.
+    """
+    if database.provider_name != "postgres":
+        return
+
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+    provider = database.provider
+    execute = provider.execute
+
+    def deadline_execute(cursor, sql, arguments=None, returning_id=False):
+        left = remaining()
+        connection = cursor.connection
+        if left is not None and (
+            connection.autocommit or connection.get_transaction_status() == TRANSACTION_STATUS_IDLE
+        ):
+            check_deadline()
+            timeout = f"SELECT set_config('statement_timeout', '{max(math.ceil(left * 1000), 1)}', true); "
+            if type(arguments) is list:  # executemany repeats the statement: set it once, first
+                cursor.execute(timeout)
+            else:
+                sql = timeout + sql
+        return execute(cursor, sql, arguments, returning_id)
+
+    provider.execute = deadline_execute
@@ -0,0 +1,230 @@
+"""
+Second-level cache of entities loaded by id (see BaseRepository.cache_ttl).
+
+Entries are pickled Pony entities, which Pony supports for exactly this use:
+unpickling one inside a db_session puts it in the session's identity map as
+if it had just been loaded, and relations load lazily as usual. Lookups go
+through the worker's LRU, then the shared tier (`cache_url`); without a
+shared tier the cache is off.
+
+Every key has a generation in the shared tier, and every entry records the
+generation it was loaded under. Writes give the key a new generation right
+away and again once the request's transaction is over
+(PonyDbSessionMiddleware), so every worker drops its copy on its next read,
+and a load that started before a write can never be stored as current.
+
+Entries are signed with an HMAC of SECRET_KEY over the key and the pickle,
+and one that fails the check is dropped unread: unpickling runs code, so
+write access to the shared tier must not be enough to run it in a worker.
+Attributes a repository lists in `cache_exclude` (password hashes) are left
+out of the pickle; reading one reloads the row.
+
+Entries are stale-while-revalidate (utils/swr.py): hot ones are reloaded in
+the background before they go stale, and a stale one is still served for up
+to `stale_ttl` while it is reloaded, as long as its generation is current.
+"""
+import hashlib
+import hmac
+import io
+import os
+import pickle
+import time
+import uuid
+from contextvars import ContextVar
+from pony.orm import db_session
+from app.config.config import CACHE_URL, ENTITY_CACHE_SIZE, SECRET_KEY
+from app.utils import swr
+from app.utils.cache import MemoryCache, get_shared_cache
+from app.utils.logger import logger
+from app.utils.metrics import record_cache
+
+# The generations every worker checks live in the shared tier; entries are signed
+ENTITY_CACHE_ENABLED = ENTITY_CACHE_SIZE > 0 and bool(CACHE_URL) and bool(SECRET_KEY)
+if ENTITY_CACHE_SIZE > 0 and CACHE_URL and not SECRET_KEY:
+    logger.warning("[ENTITY CACHE] Off: entries are signed with SECRET_KEY, which is not set")
+
+# Generations outlive any entry; an expired one only causes misses
+GENERATION_TTL = 7 * 86400
+GENERATION_SIZE = 16
+
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+_SIGNING_KEY = hashlib.sha256(b"entity-cache:" + (SECRET_KEY or "").encode()).digest()
+
+_local = MemoryCache(ENTITY_CACHE_SIZE)
+
+# Keys invalidated by the current request, to invalidate again after the commit
+_invalidated_var: ContextVar[set | None] = ContextVar("invalidated_entities", default=None)
+
+
+def _new_generation() -> bytes:
+    return os.urandom(GENERATION_SIZE // 2).hex().encode()
+
+
+def _signature(key: str, value: bytes) -> bytes:
+    return hmac.new(_SIGNING_KEY, key.encode() + b"\0" + value, hashlib.sha256).digest()
+
+
+class _Pickler(pickle.Pickler):
+    """Pickles entities of `entity` without the attributes in `exclude`."""
+
+    def __init__(self, file, entity, exclude):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.entity, self.exclude = entity, exclude
+
+    def reducer_override(self, obj):
+        if not isinstance(obj, self.entity):
+            return NotImplemented
+        unpickle, (state,) = obj.__reduce__()
+        return unpickle, ({name: value for name, value in state.items() if name not in self.exclude},)
+
+
+class EntityCache:
+    def __init__(self, entity, ttl: float, stale_ttl: float = 0, exclude=()):
+        self.entity = entity
+        self.exclude = frozenset(exclude)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.shared = get_shared_cache()
+        self.metric = f"entity_{entity.__name__.replace('DB', '').lower()}"
+
+    def key(self, id) -> str:
+        try:
+            id = uuid.UUID(str(id))
+        except ValueError:
+            pass
+        return f"entity:{self.entity.__name__}:{id}"
+
+    def generation(self, key) -> bytes | None:
+        """Current generation of a key, created when missing; None when the shared tier failed."""
+        generation_key = f"generation:{key}"
+        generation = self.shared.get(generation_key)
+        if generation is None:
+            self.shared.add(generation_key, _new_generation(), GENERATION_TTL)
+            generation = self.shared.get(generation_key)
+        return generation
+
+    def get(self, id):
+        """
+        Returns:
+            (the cached entity bound to the current db_session or None, the
+            key's generation to pass to put() after loading it).
+        """
+        key = self.key(id)
+        generation = self.generation(key)
+        if generation is None:
+            record_cache(self.metric, False)
+            return None, None
+
+        data = _local.get(key)
+        if not self._current(data, generation):
+            data = self.shared.get(key)
+            if self._current(data, generation):
+                _local.set(key, data, self.ttl + self.stale_ttl)
+            else:
+                data = None
+
+        record_cache(self.metric, data is not None)
+        if data is None:
+            return None, generation
+
+        try:
+            value, reason = swr.unpack(data[GENERATION_SIZE:])
+            signature, value = value[:SIGNATURE_SIZE], value[SIGNATURE_SIZE:]
+            if not hmac.compare_digest(signature, _signature(key, value)):
+                raise ValueError("bad signature")
+            obj = pickle.loads(value)
+        except Exception as e:
+            logger.warning(f"[ENTITY CACHE] Dropping unreadable entry {key}: {e}")
+            self._delete(key)
+            return None, generation
+
+        if reason:
+            swr.refresh(key, lambda: self._refresh(id, generation), self.metric, reason)
+        return obj, generation
+
+    @staticmethod
+    def _current(data, generation) -> bool:
+        return data is not None and data[:GENERATION_SIZE] == generation
+
+    def put(self, obj, generation: bytes | None, load_time: float = 0):
+        """
+        Cache an entity as loaded from the database (not one changed by this transaction).
+
+        Args:
+            generation: The key's generation read by get() before the load.
+                An entry stored under a generation a write has since replaced
+                is never served.
+            load_time: Seconds the load took; slower entries are refreshed earlier.
+        """
+        key = self.key(obj.get_pk())
+        invalidated = _invalidated_var.get()
+        if generation is None or obj._status_ != "loaded" or (invalidated and key in invalidated):
+            return
+
+        self._store(key, generation, self._dumps(obj), load_time)
+
+    def _dumps(self, obj) -> bytes:
+        if not self.exclude:
+            return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        file = io.BytesIO()
+        _Pickler(file, self.entity, self.exclude).dump(obj)
+        return file.getvalue()
+
+    def _store(self, key, generation, value, load_time):
+        data = generation + swr.pack(_signature(key, value) + value, self.ttl, load_time)
+        _local.set(key, data, self.ttl + self.stale_ttl)
+        self.shared.set(key, data, self.ttl + self.stale_ttl)
+
+    def _refresh(self, id, generation):
+        """Reload an entry on the refresh pool, unless a write replaced its generation."""
+        key = self.key(id)
+        if self.generation(key) != generation:
+            return
+
+        started = time.perf_counter()
+        with db_session:
+            obj = self.entity.get(id=id)
+            if obj is None or getattr(obj, "is_deleted", False):
+                self._delete(key)
+                return
+            value = self._dumps(obj)
+        load_time = time.perf_counter() - started
+
+        # A write committed during the load: don't bring the old row back
+        if self.generation(key) != generation:
+            return
+        self._store(key, generation, value, load_time)
+
+    def invalidate(self, id):
+        key = self.key(id)
+        _invalidate(self.shared, key)
+        invalidated = _invalidated_var.get()
+        if invalidated is not None:
+            invalidated.add(key)
+
+    def _delete(self, key):
+        _local.delete(key)
+        self.shared.delete(key)
+
+
+def _invalidate(shared, key):
+    """New generation for the key: every worker's copy is outdated."""
+    _local.delete(key)
+    shared.set(f"generation:{key}", _new_generation(), GENERATION_TTL)
+    shared.delete(key)
+
+
+def begin_transaction():
+    _invalidated_var.set(set())
+
+
+def end_transaction():
+    """Invalidate the keys written during the transaction again, now that it is committed or rolled back."""
+    invalidated = _invalidated_var.get()
+    _invalidated_var.set(None)
+    if not invalidated:
+        return
+
+    shared = get_shared_cache()
+    for key in invalidated:
+        _invalidate(shared, key)
@@ -12,12 +12,19 @@ class GroupRole(str, Enum):
     PENDING = "pending"
 
 
+class CounterScope(str, Enum):
+    GROUP = "group"
+    USER = "user"
+
+
 class EntityType(Enum):
     USER = "user"
     GROUP = "group"
     GROUP_MEMBER = "group_member"
     TASK = "task"
     STORAGE = "storage"  # ← tambahkan
+    TASK_COUNTER = "task_counter"
+    IDEMPOTENCY_KEY = "idempotency_key"
 
 
 class RoleType(str, Enum):
@@ -2,6 +2,8 @@ import traceback
 import falcon
 import uuid
 from app.config.config import ENVIRONMENT
+from app.utils.deadline import expired
+from app.utils.http_exceptions import service_unavailable
 from app.utils.logger import logger
 
 
@@ -12,20 +14,26 @@ def generic_error_handler(req, resp, ex, params):
     if isinstance(ex, falcon.HTTPError):
         raise ex
 
+    # Queries cancelled by the request deadline (statement_timeout)
+    if expired():
+        logger.warning(f"Request deadline exceeded: {req.method} {req.path}: {ex}")
+        service_unavailable(msg="Request deadline exceeded")
+
     # Generate unique error ID
     error_id = str(uuid.uuid4())
 
-    # Always log full error details
-    logger.error(f"[{error_id}] Unhandled exception", exc_info=ex)
+    # Always log full error details (once per request: see utils/logger.py)
+    logger.error(
+        f"[{error_id}] Unhandled exception on {req.method} {req.path}",
+        exc_info=ex,
+        extra={"boundary": True, "error_id": error_id},
+    )
 
     # For LOCAL (developer mode)
     if ENVIRONMENT == "develop":
         tb_list = traceback.format_exception(type(ex), ex, ex.__traceback__)
         traceback_clean = [line.rstrip("\n") for line in tb_list]
 
-        # OPTIONAL: log traceback separately (lebih mudah dibaca)
-        logger.error(f"[{error_id}] Traceback:\n" + "".join(tb_list))
-
         raise falcon.HTTPInternalServerError(
             title="Internal Server Error",
             description={
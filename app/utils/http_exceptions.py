@@ -11,13 +11,15 @@ class CustomHTTPError(falcon.HTTPError):
         status: str,
         title: str,
         msg: str,
-        code: str | int | None = None
+        code: str | int | None = None,
+        headers: dict | None = None
     ):
         super().__init__(
             code=code,
             status=status,
             title=title,
             description=msg,
+            headers=headers,
         )
         self._message = msg
 
@@ -82,3 +84,21 @@ def unprocessable(title: str = "Unprocessable Entity", msg: str = "Unprocessable
         title=title,
         msg=msg,
     )
+
+def too_many_requests(title: str = "Too Many Requests", msg: str = "Too many requests, please retry later", retry_after: int = 1, headers: dict | None = None):
+    """429 - Too Many Requests"""
+    raise CustomHTTPError(
+        status=falcon.HTTP_429,
+        title=title,
+        msg=msg,
+        headers={**(headers or {}), "Retry-After": str(retry_after)},
+    )
+
+def service_unavailable(title: str = "Service Unavailable", msg: str = "Server is busy, please retry later", retry_after: int = 1):
+    """503 - Service Unavailable"""
+    raise CustomHTTPError(
+        status=falcon.HTTP_503,
+        title=title,
+        msg=msg,
+        headers={"Retry-After": str(retry_after)},
+    )
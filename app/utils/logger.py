@@ -1,22 +1,181 @@
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
-from rich.logging import RichHandler
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from app.config.config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_LIMIT, LOG_SAMPLE_WINDOW
+
+# Id of the request being handled on this thread (set by RequestIdMiddleware)
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+# Exceptions logged by inner layers during the request: {id(exc): (exc, [records])}
+_pending_var: ContextVar[dict | None] = ContextVar("pending_exceptions", default=None)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.pathname}:{record.lineno}",
+        }
+        for key in ("request_id", "error_id", "context", "suppressed"):
+            value = getattr(record, key, None)
+            if value:
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class _RequestContext(logging.Filter):
+    """
+    Attach the request id, and log each exception once per request.
+
+    Inside a request, records of layers that log an exception and re-raise it
+    (`logger.error(..., exc_info=e)`) are held back. The boundary
+    (`extra={"boundary": True}`) logs the traceback once, with their messages
+    as context; exceptions that never reach it are logged by end_request().
+    Outside a request (jobs, startup) every record is logged as usual.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        exc = record.exc_info[1] if record.exc_info else None
+        if exc is None:
+            return True
+
+        pending = _pending_var.get()
+        if pending is None or getattr(record, "boundary", False):
+            held = _pop_held(pending, exc)
+            if held:
+                record.context = [r.getMessage() for r in held]
+            return True
+
+        pending.setdefault(id(exc), (exc, []))[1].append(record)
+        return False
+
+
+def _pop_held(pending, exc):
+    """Records held for `exc` and the exceptions it was raised from."""
+    held = []
+    while exc is not None and pending:
+        held += pending.pop(id(exc), (None, []))[1]
+        exc = exc.__cause__ or exc.__context__
+    return held
+
+
+def begin_request(request_id: str):
+    request_id_var.set(request_id)
+    _pending_var.set({})
+
+
+def end_request(ignore: tuple = ()):
+    """
+    Log exceptions that were logged by inner layers but never reached the
+    boundary (e.g. caught and handled), once each. `ignore` are expected
+    exception types (HTTP errors) whose held records are dropped.
+    """
+    pending = _pending_var.get()
+    _pending_var.set(None)
+    try:
+        for exc, records in (pending or {}).values():
+            if isinstance(exc, ignore):
+                continue
+            record = records[-1]
+            record.context = [r.getMessage() for r in records[:-1]] or None
+            logging.getLogger(record.name).handle(record)
+    finally:
+        request_id_var.set(None)
+
+
+class _ErrorSampler(logging.Filter):
+    """Let through at most LOG_SAMPLE_LIMIT errors per call site and window; report how many were dropped."""
+
+    def __init__(self):
+        super().__init__()
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.ERROR:
+            return True
+
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.pathname, record.lineno, exc_type)
+        now = time.monotonic()
+        with self.lock:
+            started, count, suppressed = self.windows.get(key, (now, 0, 0))
+            if now - started >= LOG_SAMPLE_WINDOW:
+                started, count = now, 0
+            if count >= LOG_SAMPLE_LIMIT:
+                self.windows[key] = (started, count, suppressed + 1)
+                return False
+            self.windows[key] = (started, count + 1, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records without formatting them: the message is resolved on the
+    request thread (cheap), tracebacks and JSON are rendered by the listener.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener = None
+
+
+def _output_handler():
+    if LOG_FORMAT == "rich":
+        from rich.logging import RichHandler
+        return RichHandler(rich_tracebacks=True)
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _start_listener(queue_handler):
+    global _listener
+
+    queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(queue_handler.queue, _output_handler(), respect_handler_level=True)
+    _listener.start()
 
 
 def get_logger():
 
     logger = logging.getLogger("api-gk-app")
-    log_format = "%(asctime)s - %(levelname)s - [%(pathname)s:%(lineno)d]\n%(message)s"
-
-    logging.basicConfig(
-        format=log_format,
-        datefmt="[%X]",
-        handlers=[RichHandler(rich_tracebacks=True)],
-    )
-    if not logger.level:
-        log_level_value = getattr(logging, 'DEBUG', logging.INFO)
-        logger.setLevel(log_level_value)
-    
+
+    root = logging.getLogger()
+    if not any(isinstance(h, _DeferredQueueHandler) for h in root.handlers):
+        queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(_RequestContext())
+        queue_handler.addFilter(_ErrorSampler())
+        root.addHandler(queue_handler)
+
+        _start_listener(queue_handler)
+        # The listener thread doesn't survive fork (gunicorn --preload): restart it in the child
+        os.register_at_fork(after_in_child=lambda: _start_listener(queue_handler))
+        atexit.register(lambda: _listener.stop())
+
+    logger.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
     return logger
 
-logger = get_logger()
\ No newline at end of file
+logger = get_logger()
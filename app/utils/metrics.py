@@ -0,0 +1,92 @@
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess,
+)
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py), every worker writes
+# its samples to files in that directory and /metrics aggregates all of them.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# Up to the 60s upload deadline (middlewares/admission_middleware.py)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["route", "method"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by status code",
+    ["route", "method", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Database statement execution time",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+CACHE_REFRESHES = Counter(
+    "cache_refreshes_total", "Background cache refreshes by cache and reason (early/stale)",
+    ["cache", "reason"],
+)
+
+BCRYPT_IN_PROGRESS = Gauge(
+    "bcrypt_operations_in_progress", "bcrypt hashes/checks running or waiting for the GIL",
+    multiprocess_mode="livesum",
+)
+BCRYPT_LATENCY = Histogram(
+    "bcrypt_operation_duration_seconds", "bcrypt hash/check time",
+    ["operation"], buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1, 2),
+)
+
+STORAGE_LATENCY = Histogram(
+    "storage_request_duration_seconds", "Object storage call latency",
+    ["operation"], buckets=LATENCY_BUCKETS,
+)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_cache_refresh(cache: str, reason: str):
+    CACHE_REFRESHES.labels(cache, reason).inc()
+
+
+def instrument_database(database):
+    """Time every statement Pony sends through the database's provider."""
+    provider = database.provider
+    execute = provider.execute
+
+    def timed_execute(cursor, sql, arguments=None, returning_id=False):
+        started = time.perf_counter()
+        try:
+            return execute(cursor, sql, arguments, returning_id)
+        finally:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - started)
+
+    provider.execute = timed_execute
+
+
+def render_metrics():
+    """Prometheus text exposition of this process, or of all workers in multi-process mode."""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop the live gauges of an exited worker (gunicorn child_exit hook)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
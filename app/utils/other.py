@@ -1,22 +1,34 @@
 import bcrypt
+from app.utils.metrics import BCRYPT_IN_PROGRESS, BCRYPT_LATENCY
+from datetime import datetime, timezone
 from typing import List, Dict, Any
 
 
 def hash_string(value: str) -> str:
     """Hash string using bcrypt and return as string."""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(value.encode("utf-8"), salt)
+    with BCRYPT_IN_PROGRESS.track_inprogress(), BCRYPT_LATENCY.labels("hash").time():
+        salt = bcrypt.gensalt()
+        hashed = bcrypt.hashpw(value.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 def check_string(provided_value: str, stored_hash: str) -> bool:
     """Verify string against stored bcrypt hash."""
-    return bcrypt.checkpw(
-        provided_value.encode("utf-8"),
-        stored_hash.encode("utf-8"),
-    )
+    with BCRYPT_IN_PROGRESS.track_inprogress(), BCRYPT_LATENCY.labels("check").time():
+        return bcrypt.checkpw(
+            provided_value.encode("utf-8"),
+            stored_hash.encode("utf-8"),
+        )
 
 def list_filter_to_dict(filters: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {dfilter['field']: dfilter['value'] for dfilter in filters}
 
 def list_filter_dict_to_list(filters: Dict[str, Any] = None):
-    return [{'field': key, 'value': filters[key]} for key in (filters or {}).keys()]
\ No newline at end of file
+    return [{'field': key, 'value': filters[key]} for key in (filters or {}).keys()]
+
+def parse_datetime(value) -> datetime:
+    """Parse an ISO 8601 date/datetime (a trailing "Z" means UTC); naive values are taken as UTC."""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
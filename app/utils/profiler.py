@@ -0,0 +1,194 @@
+"""
+Sampling profiler for single requests (see middlewares/profiler_middleware.py).
+
+A background thread snapshots the stacks of the threads being profiled every
+PROFILE_INTERVAL seconds; nothing runs while no request is profiled. Each
+profile is saved as JSON with its route, timing and collapsed stacks
+("outer;inner;leaf" → sample count).
+
+Usage:
+    python -m app.utils.profiler token                     # signed X-Debug-Profile header value
+    python -m app.utils.profiler summary                   # profiles and total time per route
+    python -m app.utils.profiler collapse --route "/api/user/tasks" > tasks.folded
+        # merged stacks for flamegraph.pl or https://speedscope.app
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+
+# Also used as a CLI: read .env before the config
+load_dotenv()
+
+from app.config.config import SECRET_KEY, PROFILE_DIR, PROFILE_INTERVAL, PROFILE_TOKEN_TTL, PROFILE_MAX_FILES
+
+
+class RequestProfile:
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.stacks = Counter()
+        self.duration = None
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.active = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self) -> RequestProfile:
+        profile = RequestProfile(threading.get_ident())
+        with self.lock:
+            self.active[profile.thread_id] = profile
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+        return profile
+
+    def stop(self, profile: RequestProfile) -> RequestProfile:
+        with self.lock:
+            self.active.pop(profile.thread_id, None)
+        profile.duration = time.perf_counter() - profile.started
+        return profile
+
+    def _run(self):
+        while True:
+            with self.lock:
+                idle = not self.active
+                if idle:
+                    self.wakeup.clear()
+            if idle:
+                self.wakeup.wait()
+                continue
+
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, profile in self.active.items():
+                    frame = frames.get(thread_id)
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    if stack:
+                        profile.stacks[";".join(reversed(stack))] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+_sampler = _Sampler(PROFILE_INTERVAL)
+
+
+def start_profile() -> RequestProfile:
+    """Start sampling the current thread."""
+    return _sampler.start()
+
+
+def stop_profile(profile: RequestProfile) -> RequestProfile:
+    return _sampler.stop(profile)
+
+
+def save_profile(profile: RequestProfile, route: str, method: str, status: int, request_id: str) -> str:
+    """Write the profile to PROFILE_DIR, keeping the newest PROFILE_MAX_FILES. Returns the file name."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    existing = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for name in existing[:max(len(existing) - PROFILE_MAX_FILES + 1, 0)]:
+        os.remove(os.path.join(PROFILE_DIR, name))
+
+    duration_ms = round(profile.duration * 1000, 1)
+    slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+    name = f"{profile.started_at:%Y%m%dT%H%M%S}_{method}_{slug}_{int(duration_ms)}ms_{request_id}.json"
+
+    with open(os.path.join(PROFILE_DIR, name), "w") as f:
+        json.dump({
+            "route": route,
+            "method": method,
+            "status": status,
+            "request_id": request_id,
+            "started_at": profile.started_at.isoformat(),
+            "duration_ms": duration_ms,
+            "interval_ms": PROFILE_INTERVAL * 1000,
+            "stacks": dict(profile.stacks),
+        }, f)
+    return name
+
+
+# Signed X-Debug-Profile header
+def _token_serializer():
+    if not SECRET_KEY:
+        raise ValueError("SECRET_KEY not found")
+    return URLSafeTimedSerializer(SECRET_KEY, salt="request-profile")
+
+
+def generate_profile_token() -> str:
+    return _token_serializer().dumps({"profile": True})
+
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        return bool(_token_serializer().loads(token, max_age=PROFILE_TOKEN_TTL).get("profile"))
+    except (BadSignature, ValueError, AttributeError):
+        return False
+
+
+# CLI
+def _load_profiles(directory, route=None, method=None):
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            profile = json.load(f)
+        if route and profile["route"] != route:
+            continue
+        if method and profile["method"] != method.upper():
+            continue
+        yield profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request profiles")
+    parser.add_argument("command", choices=["token", "summary", "collapse"])
+    parser.add_argument("--dir", default=PROFILE_DIR, help="Profile directory")
+    parser.add_argument("--route", help="Only profiles of this route template")
+    parser.add_argument("--method", help="Only profiles of this HTTP method")
+    args = parser.parse_args()
+
+    if args.command == "token":
+        print(generate_profile_token())
+        return
+
+    profiles = _load_profiles(args.dir, args.route, args.method)
+
+    if args.command == "collapse":
+        merged = Counter()
+        for profile in profiles:
+            merged.update(profile["stacks"])
+        for stack, count in merged.most_common():
+            print(f"{stack} {count}")
+        return
+
+    routes = defaultdict(list)
+    for profile in profiles:
+        routes[(profile["method"], profile["route"])].append(profile["duration_ms"])
+    print(f"{'profiles':>8} {'avg ms':>9} {'max ms':>9}  route")
+    for (method, route), durations in sorted(routes.items(), key=lambda item: -sum(item[1])):
+        print(f"{len(durations):>8} {sum(durations) / len(durations):>9.1f} {max(durations):>9.1f}  {method} {route}")
+
+
+if __name__ == "__main__":
+    main()
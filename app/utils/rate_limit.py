@@ -0,0 +1,144 @@
+import fcntl
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory, resource_tracker
+from app.config.config import RATE_LIMIT_BACKEND, RATE_LIMIT_SHM_NAME
+from app.utils.logger import logger
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float  # tokens refilled per second
+    burst: int   # bucket size
+
+    @classmethod
+    def per_minute(cls, n: int, burst: int | None = None):
+        return cls(rate=n / 60, burst=burst or n)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until the next token
+
+
+def _refill(tokens, updated_at, limit: RateLimit, now):
+    """Token bucket step shared by the stores. Returns (result, tokens)."""
+    tokens = min(limit.burst, tokens + (now - updated_at) * limit.rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    retry_after = 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+    return RateLimitResult(allowed, limit.burst, int(tokens), retry_after), tokens
+
+
+class MemoryRateLimitStore:
+    """Token buckets in a dict: per worker process, so limits multiply by the worker count."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key: str, limit: RateLimit) -> RateLimitResult:
+        now = time.time()
+        with self.lock:
+            tokens, updated_at = self.buckets.pop(key, (limit.burst, now))
+            result, tokens = _refill(tokens, updated_at, limit, now)
+            if len(self.buckets) >= self.max_keys:
+                # dicts keep insertion order and consume() re-inserts: drop the least recent key
+                del self.buckets[next(iter(self.buckets))]
+            self.buckets[key] = (tokens, now)
+        return result
+
+
+class SharedMemoryRateLimitStore:
+    """
+    Token buckets in a fixed-size shared memory table, shared by every worker
+    process on the host and guarded by a file lock.
+
+    Keys are stored as 64-bit hashes with open addressing; when all probed
+    slots are taken, the least recently used one is reused (buckets idle for
+    `burst / rate` seconds are full again anyway).
+    """
+
+    MAGIC = b"TODORLM1"
+    HEADER = struct.Struct("<8sII")  # magic, slots, slot size
+    SLOT = struct.Struct("<Qdd")  # key hash, tokens, updated_at
+    PROBES = 8
+
+    def __init__(self, name: str = RATE_LIMIT_SHM_NAME, slots: int = 65_536):
+        self.slots = slots
+        size = self.HEADER.size + slots * self.SLOT.size
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.HEADER.pack_into(self.shm.buf, 0, self.MAGIC, slots, self.SLOT.size)
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.size < size or self.HEADER.unpack_from(self.shm.buf, 0) != (self.MAGIC, slots, self.SLOT.size):
+                self.shm.close()
+                raise ValueError(f"Shared memory '{name}' has another layout; remove /dev/shm/{name} or change its name")
+        # Outlive the worker that created it: the tracker would unlink it on exit
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        self.lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self.lock_file, self.lock_pid = None, None
+        self.thread_lock = threading.Lock()
+
+    def _process_lock_file(self):
+        # flock is shared by file descriptors inherited across fork: open one per process
+        if self.lock_pid != os.getpid():
+            self.lock_file, self.lock_pid = open(self.lock_path, "a"), os.getpid()
+        return self.lock_file
+
+    def consume(self, key: str, limit: RateLimit) -> RateLimitResult:
+        # 0 marks an empty slot
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big") or 1
+        now = time.time()
+        buf = self.shm.buf
+
+        with self.thread_lock:
+            lock_file = self._process_lock_file()
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                victim, tokens, updated_at = None, limit.burst, now
+                for i in range(self.PROBES):
+                    offset = self.HEADER.size + ((key_hash + i) % self.slots) * self.SLOT.size
+                    slot_hash, slot_tokens, slot_updated_at = self.SLOT.unpack_from(buf, offset)
+                    if slot_hash == key_hash:
+                        victim, tokens, updated_at = offset, slot_tokens, slot_updated_at
+                        break
+                    if slot_hash == 0:
+                        victim = offset
+                        break
+                    if victim is None or slot_updated_at < self.SLOT.unpack_from(buf, victim)[2]:
+                        victim = offset
+
+                result, tokens = _refill(tokens, updated_at, limit, now)
+                self.SLOT.pack_into(buf, victim, key_hash, tokens, now)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return result
+
+
+_store = None
+
+
+def get_rate_limit_store():
+    """The configured store (`rate_limit_backend`: "memory" or "shared")."""
+    global _store
+
+    if _store is None:
+        if RATE_LIMIT_BACKEND == "shared":
+            _store = SharedMemoryRateLimitStore()
+        else:
+            _store = MemoryRateLimitStore()
+        logger.info(f"[RATE LIMIT] Using {type(_store).__name__}")
+    return _store
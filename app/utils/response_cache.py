@@ -0,0 +1,157 @@
+"""
+Versioned cache of per-user list responses (see cached_response).
+
+A cached response records the generation of every scope its data came from:
+the requesting user ("user:<id>") and, per endpoint, the groups it shows
+("group:<id>"). Writes call bump_version() for the scopes they change, which
+gives each one a new random generation once the transaction is over. A
+lookup is a hit only while all recorded generations are still current, so
+invalidation is O(1) and a response is never served after a write replaced it.
+
+Generations live in the shared tier (`cache_url`), the only place every
+worker sees the same ones; without it the cache stays off.
+"""
+import functools
+import hashlib
+import json
+import os
+from contextvars import ContextVar
+from app.config.config import RESPONSE_CACHE_TTL
+from app.utils.cache import MemoryCache, get_shared_cache
+from app.utils.enums import CounterScope
+from app.utils.metrics import record_cache
+
+# Generations outlive any entry; an expired one only causes misses
+VERSION_TTL = 7 * 86400
+
+_entries = MemoryCache(10_000)
+
+# Scopes written by the current request, bumped once it is committed
+_pending_var: ContextVar[set | None] = ContextVar("pending_version_bumps", default=None)
+
+
+def scope(kind: CounterScope, id) -> str:
+    return f"{kind.value}:{id}"
+
+
+def enabled() -> bool:
+    return RESPONSE_CACHE_TTL > 0 and get_shared_cache() is not None
+
+
+def _new_generation() -> bytes:
+    return os.urandom(8).hex().encode()
+
+
+def current_versions(scopes) -> dict:
+    """Generation of each scope, created when missing; None where the shared tier failed."""
+    shared = get_shared_cache()
+    versions = {}
+    for name in scopes:
+        key = f"version:{name}"
+        generation = shared.get(key)
+        if generation is None:
+            shared.add(key, _new_generation(), VERSION_TTL)
+            generation = shared.get(key)
+        versions[name] = generation.decode() if generation is not None else None
+    return versions
+
+
+def bump_version(*scopes):
+    """Invalidate every cached response that depends on `scopes`."""
+    if not enabled():
+        return
+
+    pending = _pending_var.get()
+    if pending is not None:
+        pending.update(scopes)
+        return
+    _bump(scopes)
+
+
+def _bump(scopes):
+    shared = get_shared_cache()
+    for name in scopes:
+        shared.set(f"version:{name}", _new_generation(), VERSION_TTL)
+
+
+def defer_bumps():
+    """Collect bump_version() calls until flush_bumps() (PonyDbSessionMiddleware)."""
+    _pending_var.set(set())
+
+
+def flush_bumps():
+    pending = _pending_var.get()
+    _pending_var.set(None)
+    if pending:
+        _bump(pending)
+
+
+def _entry_key(req, user_id) -> str:
+    params = sorted((name, value) for name, value in req.params.items() if value not in ("", None, []))
+    raw = json.dumps([req.method, req.uri_template or req.path, str(user_id), params], default=str)
+    return "response:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _get_entry(key):
+    data = _entries.get(key)
+    if data is None:
+        data = get_shared_cache().get(key)
+        if data is not None:
+            _entries.set(key, data, RESPONSE_CACHE_TTL)
+    return json.loads(data) if data is not None else None
+
+
+def _put_entry(key, entry):
+    data = json.dumps(entry, separators=(",", ":")).encode()
+    _entries.set(key, data, RESPONSE_CACHE_TTL)
+    get_shared_cache().set(key, data, RESPONSE_CACHE_TTL)
+
+
+def cached_response(scopes=None):
+    """
+    Cache the resp.media of a GET responder per user, route and query parameters.
+
+    Args:
+        scopes: Function of the response media returning the scopes, besides
+            the user's, whose writes change it (e.g. the groups it lists).
+    """
+    def decorator(responder):
+        @functools.wraps(responder)
+        def wrapper(resource, req, resp, *args, **kwargs):
+            if not enabled():
+                return responder(resource, req, resp, *args, **kwargs)
+
+            user_scope = scope(CounterScope.USER, req.context["user"]["id"])
+            key = _entry_key(req, req.context["user"]["id"])
+            metric = f"response:{req.uri_template}"
+
+            # Generations are read before the data: a write committed after this
+            # point leaves the entry stored below outdated, never current
+            entry = _get_entry(key)
+            versions = current_versions([user_scope, *(entry["scopes"] if entry else [])])
+
+            hit = entry is not None and entry["media"] is not None and entry["versions"] == versions
+            record_cache(metric, hit)
+            if hit:
+                resp.media = entry["media"]
+                resp.set_header("X-Cache", "hit")
+                return
+
+            responder(resource, req, resp, *args, **kwargs)
+            resp.set_header("X-Cache", "miss")
+            if resp.status_code != 200:
+                return
+
+            extra = sorted(set(scopes(resp.media))) if scopes else []
+            recorded = {name: versions.get(name) for name in [user_scope, *extra]}
+            # Scopes first seen in this response had no generation read upfront:
+            # remember them so the next call can store the response
+            storable = None not in recorded.values()
+            _put_entry(key, {
+                "versions": recorded if storable else {},
+                "scopes": extra,
+                "media": resp.media if storable else None,
+            })
+
+        return wrapper
+    return decorator
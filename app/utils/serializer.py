@@ -0,0 +1,140 @@
+import types
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Union, get_args, get_origin
+from pydantic import BaseModel, EmailStr
+from app.utils.logger import logger
+
+
+# Compiled serializers, keyed by response schema
+_serializers = {}
+
+_PLAIN_TYPES = (str, int, float, bool, EmailStr)
+_JSON_TYPES = (list, dict, Any)
+
+
+def _datetime(value):
+    # Same format as pydantic's JSON mode: UTC is written as "Z"
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+def _json_value(value):
+    """Convert a value of an untyped/union field the way pydantic's JSON mode would."""
+    if isinstance(value, datetime):
+        return _datetime(value)
+    if isinstance(value, (date, uuid.UUID, Decimal)):
+        return value.isoformat() if isinstance(value, date) else str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _converter(annotation, helpers):
+    """
+    Return a format string turning `{}` (a value expression) into a JSON-ready
+    expression, or None when the value can be passed through as-is.
+    """
+    origin = get_origin(annotation)
+
+    if origin in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            inner = _converter(args[0], helpers)
+            if inner is None:
+                return None
+            return "(None if {0} is None else " + inner + ")"
+        return "_json_value({0})"
+
+    if origin in (list, set, tuple):
+        args = get_args(annotation)
+        inner = _converter(args[0], helpers) if args else None
+        if inner is None:
+            return "list({0})"
+        return "[" + inner.format("_x") + " for _x in {0}]"
+
+    if annotation in _PLAIN_TYPES or annotation in _JSON_TYPES or origin is dict:
+        return None
+    if annotation is uuid.UUID:
+        return "str({0})"
+    if annotation is datetime:
+        return "_datetime({0})"
+    if annotation is date:
+        return "{0}.isoformat()"
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return "{0}.value"
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        name = f"_s{len(helpers)}"
+        helpers[name] = get_serializer(annotation)
+        return name + "({0})"
+    raise _Unsupported(annotation)
+
+
+def _compile(schema):
+    decorators = schema.__pydantic_decorators__
+    if any((
+        decorators.validators, decorators.field_validators, decorators.model_validators,
+        decorators.field_serializers, decorators.model_serializers, decorators.computed_fields,
+    )):
+        raise _Unsupported("custom validators/serializers")
+
+    helpers = {"_datetime": _datetime, "_json_value": _json_value}
+    attr_lines, dict_lines = [], []
+    for name, field in schema.model_fields.items():
+        if field.alias or field.serialization_alias:
+            raise _Unsupported("aliases")
+
+        if field.is_required():
+            attr_get, dict_get = f"obj.{name}", f"obj[{name!r}]"
+        else:
+            default = f"_d_{name}"
+            if field.default_factory is not None:
+                helpers[default] = field.default_factory
+                default += "()"
+            else:
+                helpers[default] = field.default
+            attr_get = f"getattr(obj, {name!r}, {default})"
+            dict_get = f"obj.get({name!r}, {default})"
+
+        convert = _converter(field.annotation, helpers)
+        if convert is not None:
+            # Evaluate the getter once
+            attr_lines.append(f"    v = {attr_get}")
+            dict_lines.append(f"    v = {dict_get}")
+            attr_get = dict_get = convert.format("v")
+        attr_lines.append(f"    out[{name!r}] = {attr_get}")
+        dict_lines.append(f"    out[{name!r}] = {dict_get}")
+
+    code = (
+        "def from_attrs(obj):\n    out = {}\n" + "\n".join(attr_lines) + "\n    return out\n\n"
+        "def from_dict(obj):\n    out = {}\n" + "\n".join(dict_lines) + "\n    return out\n\n"
+        "def serialize(obj):\n"
+        "    return from_dict(obj) if type(obj) is dict else from_attrs(obj)\n"
+    )
+    exec(compile(code, f"<serializer {schema.__name__}>", "exec"), helpers)
+    return helpers["serialize"]
+
+
+def get_serializer(schema: type[BaseModel]):
+    """
+    Return a function turning an entity (or a projected row dict) into the same
+    JSON-ready dict as `schema.model_validate(obj).model_dump(mode="json")`.
+
+    The function is generated once per schema and reads each field directly,
+    skipping validation — use it only for data that comes from the database.
+    Schemas with validators, custom serializers or aliases fall back to pydantic.
+    """
+    serializer = _serializers.get(schema)
+    if serializer is None:
+        try:
+            serializer = _compile(schema)
+        except _Unsupported as e:
+            logger.debug(f"[SERIALIZER] {schema.__name__} uses pydantic ({e})")
+            serializer = lambda obj: schema.model_validate(obj).model_dump(mode="json")
+        _serializers[schema] = serializer
+    return serializer
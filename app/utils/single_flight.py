@@ -0,0 +1,104 @@
+"""
+Request coalescing for identical concurrent reads (see single_flight).
+
+The first request for a key (the leader) runs the responder; identical
+requests arriving while it runs wait for its result instead of querying the
+database again. Coalescing is per worker process and only covers requests
+that overlap: nothing is kept once the leader is done.
+"""
+import functools
+import hashlib
+import json
+import threading
+from app.utils.deadline import remaining
+from app.utils.metrics import record_cache
+
+
+class _Flight:
+    __slots__ = ("done", "result", "failed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight:
+    def __init__(self):
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, fn, max_wait: float):
+        """
+        Run `fn` once for concurrent callers with the same key.
+
+        Returns:
+            (result, shared). A caller whose leader fails or takes longer
+            than `max_wait` runs `fn` itself (shared is then False).
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+
+        if leader:
+            try:
+                flight.result = fn()
+                return flight.result, False
+            except BaseException:
+                flight.failed = True
+                raise
+            finally:
+                with self.lock:
+                    del self.flights[key]
+                flight.done.set()
+
+        if flight.done.wait(max_wait) and not flight.failed:
+            return flight.result, True
+        return fn(), False
+
+
+_flights = SingleFlight()
+
+
+def _flight_key(req, scope) -> str:
+    params = sorted((name, value) for name, value in req.params.items() if value not in ("", None, []))
+    raw = json.dumps([req.method, req.uri_template, scope, params], default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def single_flight(scope=None, max_wait: float = 2.0):
+    """
+    Share one run of a GET responder between identical concurrent requests.
+
+    Args:
+        scope: Function of (req, **route params) giving the authorization
+            scope: requests only share a result within the same scope.
+            Defaults to the user, so nothing is shared across users; a wider
+            scope is only correct when the responder's result and access
+            checks don't depend on who asks.
+        max_wait: Seconds a request waits for the leader (never past its
+            deadline) before running the responder itself.
+    """
+    def decorator(responder):
+        @functools.wraps(responder)
+        def wrapper(resource, req, resp, **params):
+            key_scope = scope(req, **params) if scope else f"user:{req.context['user']['id']}"
+            key = _flight_key(req, key_scope)
+
+            def run():
+                responder(resource, req, resp, **params)
+                return resp.status, resp.media
+
+            left = remaining()
+            wait = max_wait if left is None else max(min(max_wait, left), 0)
+            (status, media), shared = _flights.do(key, run, wait)
+
+            record_cache(f"single_flight:{req.uri_template}", shared)
+            if shared:
+                resp.status = status
+                resp.media = media
+
+        return wrapper
+    return decorator
@@ -0,0 +1,106 @@
+"""
+Stale-while-revalidate for cache entries, with probabilistic early refresh.
+
+A value is stored with the time it goes stale and how long it took to load
+(pack). Reads of a stale value still get it, for up to the cache's stale
+window, while a background thread loads a new one. Before that point each
+read refreshes early with a probability that rises as expiry nears and with
+the load time (XFetch: stale_at - now < delta * beta * -ln(rand)), so a hot
+key is usually reloaded by one reader ahead of time instead of by every
+reader at once when it expires, and a cold key simply expires.
+
+Refreshes run on a small thread pool per process. A key is refreshed once at
+a time per process and, with the shared tier, across workers.
+"""
+import math
+import random
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.config.config import CACHE_REFRESH_THREADS
+from app.utils.cache import get_shared_cache
+from app.utils.logger import logger
+from app.utils.metrics import record_cache_refresh
+
+# Stale at (epoch seconds, comparable across workers), load time in seconds
+_HEADER = struct.Struct("!dd")
+
+# Larger values refresh earlier
+BETA = 1.0
+
+# Refreshes queued or running per process; more are dropped (the entry expires normally)
+MAX_PENDING = 1000
+
+# Longest a worker holds a key's refresh before another may take it
+LOCK_TTL = 10
+
+_pool = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def pack(value: bytes, ttl: float, load_time: float) -> bytes:
+    return _HEADER.pack(time.time() + ttl, load_time) + value
+
+
+def unpack(data: bytes):
+    """Returns (value, reason to refresh: None, "early" or "stale")."""
+    stale_at, load_time = _HEADER.unpack_from(data)
+    value = data[_HEADER.size:]
+
+    now = time.time()
+    if now >= stale_at:
+        return value, "stale"
+    if load_time > 0 and now - load_time * BETA * math.log(1.0 - random.random()) >= stale_at:
+        return value, "early"
+    return value, None
+
+
+def refresh(key: str, fn, cache: str, reason: str):
+    """
+    Run `fn` on the refresh pool, unless `key` is already being refreshed.
+
+    Args:
+        key: Cache key; also names the cross-worker refresh lock.
+        fn: Loads and stores the new value. Exceptions are logged.
+        cache: Metric label, as in cache_requests_total.
+        reason: "early" or "stale" (cache_refreshes_total).
+    """
+    global _pool
+
+    with _lock:
+        if key in _pending or len(_pending) >= MAX_PENDING:
+            return
+        _pending.add(key)
+        if _pool is None:
+            _pool = ThreadPoolExecutor(CACHE_REFRESH_THREADS, thread_name_prefix="cache-refresh")
+
+    record_cache_refresh(cache, reason)
+    _pool.submit(_run, key, fn)
+
+
+def reset_pool():
+    """Forget a pool inherited through fork (its threads don't exist in this process)."""
+    global _pool, _lock
+
+    _pool, _lock = None, threading.Lock()
+    _pending.clear()
+
+
+def _run(key, fn):
+    shared = get_shared_cache()
+    lock_key = f"refresh:{key}"
+    try:
+        if shared is not None and not shared.add(lock_key, b"1", LOCK_TTL):
+            return  # another worker is on it
+        try:
+            fn()
+        finally:
+            if shared is not None:
+                shared.delete(lock_key)
+    except Exception as e:
+        logger.warning(f"[CACHE] Refresh of {key} failed: {e}")
+    finally:
+        with _lock:
+            _pending.discard(key)
@@ -0,0 +1,273 @@
+"""
+In-process tracing with context-propagated spans, exported as OTLP/JSON.
+
+Spans nest through a context variable: the request span (TracingMiddleware)
+is the parent of service spans, which are parents of repository and storage
+spans. Finished traces are exported by a background thread, either appended
+to a JSON-lines file or POSTed to an OTLP/HTTP collector (/v1/traces).
+
+Disabled unless `trace_exporter` is set; methods are then left unwrapped.
+"""
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from app.config.config import (
+    TRACE_EXPORTER, TRACE_FILE, TRACE_ENDPOINT, TRACE_SAMPLE_RATE, SERVICE_NAME,
+)
+from app.utils.logger import logger
+
+TRACING_ENABLED = TRACE_EXPORTER in ("file", "otlp")
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+# OTLP span kinds / status codes
+SPAN_KIND_INTERNAL, SPAN_KIND_SERVER, SPAN_KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+class Span:
+    __slots__ = (
+        "trace_id", "span_id", "parent_span_id", "name", "kind", "attributes",
+        "start_ns", "end_ns", "status", "status_message", "events", "sampled", "root", "finished",
+    )
+
+    def __init__(self, name, trace_id, parent_span_id=None, kind=SPAN_KIND_INTERNAL, sampled=True, attributes=None, root=None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = None
+        self.status_message = None
+        self.events = []
+        self.sampled = sampled
+        # Local root of the trace; collects the finished spans until it ends
+        self.root = root or self
+        self.finished = []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exc):
+        self.status, self.status_message = STATUS_ERROR, str(exc)
+        self.events.append({
+            "timeUnixNano": str(time.time_ns()),
+            "name": "exception",
+            "attributes": _otlp_attributes({"exception.type": type(exc).__name__, "exception.message": str(exc)}),
+        })
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.events:
+            span["events"] = self.events
+        if self.status:
+            span["status"] = {"code": self.status, **({"message": self.status_message} if self.status_message else {})}
+        return span
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def parse_traceparent(header):
+    """W3C traceparent → (trace_id, parent_span_id, sampled), or None when invalid."""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+def open_span(name, kind=SPAN_KIND_INTERNAL, attributes=None, traceparent=None):
+    """
+    Start a span as a child of the current one and make it current. Without a
+    current span a new trace starts (continuing `traceparent` if given).
+
+    Returns:
+        (span, token) to pass to close_span().
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        span = Span(name, parent.trace_id, parent.span_id, kind, parent.sampled, attributes, root=parent.root)
+    else:
+        remote = parse_traceparent(traceparent)
+        if remote:
+            trace_id, parent_span_id, sampled = remote
+        else:
+            trace_id, parent_span_id, sampled = os.urandom(16).hex(), None, random.random() < TRACE_SAMPLE_RATE
+        span = Span(name, trace_id, parent_span_id, kind, sampled, attributes)
+
+    return span, _current_span.set(span)
+
+
+def close_span(span, token):
+    """End a span from open_span(); ending the local root exports the trace."""
+    _current_span.reset(token)
+    span.end_ns = time.time_ns()
+    if span.sampled:
+        span.root.finished.append(span)
+        if span.root is span:
+            _exporter.export(span.finished)
+
+
+@contextmanager
+def start_span(name, kind=SPAN_KIND_INTERNAL, attributes=None, traceparent=None):
+    """Run the block inside a new span (see open_span); exceptions mark it as failed."""
+    span, token = open_span(name, kind, attributes, traceparent)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        close_span(span, token)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def _row_count(result):
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], dict) and "page" in result[1]:
+        return len(result[0])  # (rows, pagination)
+    return None
+
+
+def trace_methods(cls, layer: str, kind=SPAN_KIND_INTERNAL):
+    """
+    Wrap the public methods defined on `cls` in spans named `Class.method`,
+    with the layer, entity label and (for list results) row count as attributes.
+    No-op when tracing is disabled.
+    """
+    if not TRACING_ENABLED:
+        return cls
+
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(method) or getattr(method, "__traced__", False):
+            continue
+        setattr(cls, name, _traced_method(method, f"{cls.__name__}.{name}", layer, kind))
+    return cls
+
+
+def _traced_method(method, span_name, layer, kind):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            # Outside a traced request (jobs, startup) or not sampled
+            return method(self, *args, **kwargs)
+
+        entity = getattr(getattr(self, "repo", self), "entity", None)
+        attributes = {"app.layer": layer, "code.function": span_name}
+        if entity is not None:
+            attributes["app.entity"] = entity.__name__.replace("DB", "")
+
+        with start_span(span_name, kind, attributes) as span:
+            result = method(self, *args, **kwargs)
+            rows = _row_count(result)
+            if rows is not None:
+                span.set_attribute("app.row_count", rows)
+            return result
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+class _Exporter:
+    """Background export of finished traces (batched, never blocks requests)."""
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def export(self, spans):
+        if not TRACING_ENABLED:
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self.thread.start()
+        self.queue.put(spans)
+
+    def _run(self):
+        while True:
+            batch = self.queue.get()
+            try:
+                while len(batch) < 512:
+                    batch += self.queue.get(timeout=1.0)
+            except queue.Empty:
+                pass
+
+            try:
+                self._write(self._payload(batch))
+            except Exception as e:
+                logger.warning(f"[TRACING] Export of {len(batch)} spans failed: {e}")
+
+    @staticmethod
+    def _payload(spans):
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME, "process.pid": os.getpid()})},
+                "scopeSpans": [{
+                    "scope": {"name": "app.utils.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }],
+        }
+
+    @staticmethod
+    def _write(payload):
+        body = json.dumps(payload, separators=(",", ":"))
+        if TRACE_EXPORTER == "file":
+            with open(TRACE_FILE, "a") as f:
+                f.write(body + "\n")
+            return
+
+        request = urllib.request.Request(
+            TRACE_ENDPOINT, data=body.encode(), headers={"Content-Type": "application/json"}, method="POST",
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+
+
+_exporter = _Exporter()
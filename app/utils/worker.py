@@ -0,0 +1,75 @@
+"""
+Process state around gunicorn's fork (hooks in gunicorn.conf.py).
+
+With `--preload`, the master imports the app once (models, Pony mapping,
+routes, schemas) and workers share those pages copy-on-write. What cannot be
+shared is made per worker: the master closes its database connection and
+freezes the garbage collector before forking, and each worker drops the
+thread pools and clients it inherited so it creates its own on first use.
+Without `--preload` the master never imports the app and the hooks only
+measure.
+"""
+import gc
+import os
+import sys
+import time
+from app.utils.logger import logger
+
+_forked_at = None
+
+
+def before_fork():
+    """In the master, before each worker is forked."""
+    if "app.main" not in sys.modules:
+        return  # not preloaded
+
+    from app.db.database import disconnect_db
+    disconnect_db()
+
+    # Objects of the preloaded app go to the permanent generation: collections
+    # in the workers don't touch them, so their pages stay shared
+    gc.freeze()
+
+
+def after_fork():
+    """In the worker, right after the fork."""
+    global _forked_at
+    _forked_at = time.monotonic()
+
+    if "app.main" not in sys.modules:
+        return
+
+    from app.container import ServiceContainer
+    from app.utils import swr
+    from app.utils.enums import EntityType
+
+    # HTTP connection pool of the storage client
+    ServiceContainer.discard(EntityType.STORAGE)
+    swr.reset_pool()
+
+
+def worker_ready(pid: int):
+    """In the worker, once the app is loaded: log startup time and memory."""
+    started = "" if _forked_at is None else f" in {time.monotonic() - _forked_at:.2f}s"
+    memory = ", ".join(f"{name} {kb / 1024:.1f} MB" for name, kb in process_memory().items())
+    logger.info(f"[WORKER] Worker {pid} ready{started} ({memory})")
+
+
+def process_memory() -> dict:
+    """
+    Resident memory of this process in kB: RSS, PSS (shared pages divided
+    between the processes mapping them) and USS (pages private to it).
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            next(f)  # address range of the rollup
+            kb = {name: int(value.split()[0]) for name, value in (line.split(":", 1) for line in f)}
+    except OSError:
+        import resource
+        return {"RSS": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+    return {
+        "RSS": kb.get("Rss", 0),
+        "PSS": kb.get("Pss", 0),
+        "USS": kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0),
+    }
@@ -0,0 +1,121 @@
+"""
+Benchmark of the in-process LRU (MemoryCache) against the shared memory
+tier (SharedMemoryCache).
+
+Two measurements:
+  - latency: get (hit and miss) and set in one process, in microseconds;
+  - workers: N forked processes doing read-through lookups of Zipf
+    distributed keys, as gunicorn workers would. With MemoryCache each
+    process warms its own copy; with SharedMemoryCache they share one.
+
+Usage:
+    python -m benchmarks.cache_bench
+    python -m benchmarks.cache_bench --workers 8 --keys 50000 --ops 100000
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from app.utils.cache import MemoryCache, SharedMemoryCache
+
+VALUE = os.urandom(600)  # about a pickled user or group
+TTL = 300
+
+
+def _latency(cache, n):
+    keys = [f"entity:bench:{i}" for i in range(n)]
+    results = {}
+
+    started = time.perf_counter()
+    for key in keys:
+        cache.set(key, VALUE, TTL)
+    results["set"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    results["get hit"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(n):
+        cache.get(f"entity:absent:{i}")
+    results["get miss"] = time.perf_counter() - started
+
+    return {name: seconds / n * 1e6 for name, seconds in results.items()}
+
+
+def _zipf_keys(keys, ops, seed):
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, keys + 1)))
+    rng = random.Random(seed)
+    return [f"entity:bench:{i}" for i in rng.choices(range(keys), cum_weights=weights, k=ops)]
+
+
+def _worker(make_cache, keys, ops, seed, results):
+    cache = make_cache()
+    lookups = _zipf_keys(keys, ops, seed)
+    hits = 0
+    started = time.perf_counter()
+    for key in lookups:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, VALUE, TTL)
+    results.put((hits, time.perf_counter() - started))
+
+
+def _workers(make_cache, workers, keys, ops):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(make_cache, keys, ops, seed, results)) for seed in range(workers)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    hits = sum(h for h, _ in outcomes)
+    elapsed = max(seconds for _, seconds in outcomes)
+    return hits / (workers * ops), workers * ops - hits, workers * ops / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MemoryCache vs SharedMemoryCache")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=20_000, help="Distinct keys looked up")
+    parser.add_argument("--ops", type=int, default=50_000, help="Lookups per worker")
+    parser.add_argument("--capacity", type=int, default=8_192, help="Entries per cache (slots of the shared one)")
+    args = parser.parse_args()
+
+    name = f"todo_cache_bench_{os.getpid()}"
+    shared = SharedMemoryCache(name, slots=args.capacity)
+    try:
+        caches = {
+            "MemoryCache": lambda: MemoryCache(args.capacity),
+            "SharedMemoryCache": lambda: shared,
+        }
+
+        print(f"Latency, 1 process, {len(VALUE)} byte values (us/op)")
+        for label, make_cache in caches.items():
+            cache = make_cache()
+            _latency(cache, min(args.capacity, 5_000))  # first touch of the pages
+            stats = _latency(cache, min(args.capacity, 5_000))
+            print(f"  {label:<18} " + "  ".join(f"{op} {us:6.2f}" for op, us in stats.items()))
+            if cache is shared:
+                for i in range(min(args.capacity, 5_000)):
+                    shared.delete(f"entity:bench:{i}")
+
+        print(
+            f"Read-through, {args.workers} workers x {args.ops} lookups, "
+            f"{args.keys} Zipf keys, capacity {args.capacity}"
+        )
+        for label, make_cache in caches.items():
+            hit_rate, loads, ops_per_second = _workers(make_cache, args.workers, args.keys, args.ops)
+            print(f"  {label:<18} hit rate {hit_rate:6.1%}  {loads:8,} loads  {ops_per_second:10,.0f} lookups/s")
+    finally:
+        shared.unlink()
+
+
+if __name__ == "__main__":
+    main()
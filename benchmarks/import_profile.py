@@ -0,0 +1,60 @@
+"""
+Import-time profile of a cold start: the modules with the largest cumulative
+import time (`python -X importtime`) when a fresh interpreter imports app.main
+against the SQLite stand-in, as tests/test_startup.py boots it.
+
+Usage:
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --top 40
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dotenv import load_dotenv
+
+# Also used as a CLI: read .env before the config
+load_dotenv()
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+
+_BOOT = """
+from tests.sqlite_standin import use_sqlite_standin
+use_sqlite_standin()
+import app.main
+"""
+
+
+def profile(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BOOT],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"Boot failed (exit {result.returncode})")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            rows.append((int(cumulative), int(own), len(indent) // 2, module))
+
+    total = sum(cumulative for cumulative, _, depth, _ in rows if depth == 0)
+    print(f"Imports: {total / 1e6:.3f}s in {len(rows)} modules")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative, own, depth, module in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1e3:10.1f}ms {own / 1e3:8.1f}ms  {'  ' * depth}{module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slowest imports of a cold start")
+    parser.add_argument("--top", type=int, default=25, help="Modules listed")
+    args = parser.parse_args()
+    profile(args.top)
+
+
+if __name__ == "__main__":
+    main()
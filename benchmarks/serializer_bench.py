@@ -0,0 +1,120 @@
+"""
+Benchmark of the compiled response serializers (app/utils/serializer.py)
+against pydantic's `model_validate(obj).model_dump(mode="json")`, on pages of
+100 and 1000 entities seeded into the in-memory SQLite stand-in. That both
+produce the same output is checked by tests/test_serializer.py.
+
+Usage:
+    python -m benchmarks.serializer_bench
+    python -m benchmarks.serializer_bench --repeat 20
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+
+# Also used as a CLI: read .env before the config
+load_dotenv()
+
+ITEMS = 1000
+PAGE_SIZES = (100, 1000)
+
+_UTC = timezone.utc
+
+
+def _seed():
+    from pony.orm import commit
+    from app.db.models import GroupDB, GroupMemberDB, TaskDB, UserDB
+
+    started = datetime(2024, 5, 1, 8, 30, tzinfo=_UTC)
+    users = [
+        UserDB(
+            email=f"user{i}@example.com",
+            username=f"user{i}" if i % 4 else None,
+            password="x",
+            full_name=f"User {i}",
+            created_at=started + timedelta(minutes=i, microseconds=0 if i % 2 else 123456),
+            updated_at=None if i % 5 == 0 else started + timedelta(days=1, seconds=i),
+        )
+        for i in range(ITEMS)
+    ]
+    groups = [
+        GroupDB(name=f"Group {i}", created_at=started + timedelta(hours=i), member_count=i % 4, pending_count=i % 2)
+        for i in range(ITEMS)
+    ]
+    for i, group in enumerate(groups):
+        for j in range(i % 4):  # every fourth group has no members
+            GroupMemberDB(group=group, user=users[(i + j) % ITEMS], role="admin" if j == 0 else "member")
+    for i in range(ITEMS):
+        TaskDB(
+            title=f"Task {i}",
+            description="" if i % 3 else "Description",
+            status=("todo", "in_progress", "done")[i % 3],
+            due_date=None if i % 4 == 0 else started + timedelta(days=i, microseconds=i % 7),
+            attachment=[{"path": f"tasks/{i}.pdf", "size": i}] if i % 6 == 0 else [],
+            assigned_to=None if i % 2 == 0 else users[i],
+            group=None if i % 3 == 0 else groups[i],
+            created_at=started + timedelta(seconds=i),
+            updated_at=None if i % 7 == 0 else started + timedelta(seconds=2 * i),
+        )
+    commit()
+
+
+def _cases():
+    """{schema name: (schema, [entities])}"""
+    from app.db.models import GroupDB, TaskDB, UserDB
+    from app.schemas.group import GroupResponse, GroupSummaryResponse
+    from app.schemas.task import TaskResponse
+    from app.schemas.user import UserPublicResponse
+
+    tasks = TaskDB.select().order_by(TaskDB.created_at)[:]
+    groups = GroupDB.select().order_by(GroupDB.created_at)[:]
+    users = UserDB.select().order_by(UserDB.created_at)[:]
+
+    return {
+        "TaskResponse": (TaskResponse, tasks),
+        "GroupResponse": (GroupResponse, groups),
+        "GroupSummaryResponse": (GroupSummaryResponse, groups),
+        "UserPublicResponse": (UserPublicResponse, users),
+    }
+
+
+def _best(fn, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench(cases, repeat: int):
+    from app.utils.serializer import get_serializer
+
+    print(f"{'schema':<22} {'page':>5} {'pydantic':>10} {'compiled':>10} {'speedup':>8}  (ms per page, best of {repeat})")
+    for name, (schema, entities) in cases.items():
+        serialize = get_serializer(schema)
+        for size in PAGE_SIZES:
+            page = entities[:size]
+            pydantic = _best(lambda: [schema.model_validate(obj).model_dump(mode="json") for obj in page], repeat)
+            compiled = _best(lambda: [serialize(obj) for obj in page], repeat)
+            print(f"{name:<22} {size:>5} {pydantic * 1e3:10.2f} {compiled * 1e3:10.2f} {pydantic / compiled:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled serializers vs pydantic")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per page, the best is kept")
+    args = parser.parse_args()
+
+    from pony.orm import db_session
+    from tests.sqlite_standin import use_sqlite_standin
+
+    use_sqlite_standin()
+    with db_session:
+        _seed()
+    with db_session:
+        bench(_cases(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of uuid4 against uuid7 (app/utils/uuid7.py) primary keys on Postgres.
+
+Creates two scratch tables shaped like the app's (uuid primary key, a
+timestamp and a ~200 byte payload), fills each with the same number of rows
+in batches, one transaction per batch, then drops them. Reports insert
+throughput (overall and over the last tenth, when the index is largest) and
+the size of the table and of its primary key index. uuid4 keys land on random
+index pages, so pages split half full and are written back all over the
+index; uuid7 keys append to the rightmost page.
+
+Connects with the app's database settings (provider, host, user, ...) unless
+`--dsn` is given. Needs a database where the user may create tables.
+
+Usage:
+    python -m benchmarks.uuid7_bench
+    python -m benchmarks.uuid7_bench --rows 2000000 --batch 500
+    python -m benchmarks.uuid7_bench --dsn "host=localhost dbname=todo user=postgres"
+"""
+import argparse
+import os
+import time
+import uuid
+from dotenv import load_dotenv
+
+# Also used as a CLI: read .env before the config
+load_dotenv()
+
+PAYLOAD = "x" * 200
+
+
+def _connect(dsn):
+    import psycopg2
+    from app.config import config
+
+    if dsn:
+        return psycopg2.connect(dsn)
+    return psycopg2.connect(
+        host=config.HOST, port=config.PORT, user=config.USER, password=config.PASSWORD,
+        dbname=config.DBNAME, sslmode="require",
+    )
+
+
+def _fill(conn, table, generate, rows, batch):
+    """Returns (seconds for all rows, seconds for the last tenth)."""
+    from psycopg2.extras import execute_values
+
+    tail_from = rows - rows // 10
+    elapsed = tail = 0.0
+    with conn.cursor() as cur:
+        for done in range(0, rows, batch):
+            values = [(str(generate()), PAYLOAD) for _ in range(min(batch, rows - done))]
+            started = time.perf_counter()
+            execute_values(cur, f"INSERT INTO {table} (id, payload) VALUES %s", values, page_size=batch)
+            conn.commit()
+            seconds = time.perf_counter() - started
+            elapsed += seconds
+            if done >= tail_from:
+                tail += seconds
+    return elapsed, tail
+
+
+def _sizes(conn, table):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT pg_table_size(%s::regclass), pg_relation_size(%s::regclass)",
+            (table, f"{table}_pkey"),
+        )
+        return cur.fetchone()
+
+
+def main():
+    from app.utils.uuid7 import uuid7
+
+    parser = argparse.ArgumentParser(description="uuid4 vs uuid7 primary keys on Postgres")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1_000, help="Rows per transaction")
+    parser.add_argument("--dsn", help="psycopg2 connection string (default: the app's settings)")
+    args = parser.parse_args()
+
+    generators = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+    conn = _connect(args.dsn)
+    suffix = os.getpid()
+
+    print(f"{args.rows:,} rows, {args.batch:,} per transaction")
+    print(f"{'key':<6} {'rows/s':>10} {'last 10%':>10} {'table MB':>9} {'index MB':>9}")
+    for name, generate in generators.items():
+        table = f"uuid_bench_{name}_{suffix}"
+        with conn.cursor() as cur:
+            cur.execute(
+                f"CREATE TABLE {table} ("
+                "id uuid PRIMARY KEY, created_at timestamptz NOT NULL DEFAULT now(), payload text NOT NULL)"
+            )
+        conn.commit()
+        try:
+            elapsed, tail = _fill(conn, table, generate, args.rows, args.batch)
+            table_bytes, index_bytes = _sizes(conn, table)
+            print(
+                f"{name:<6} {args.rows / elapsed:10,.0f} {(args.rows // 10) / tail:10,.0f} "
+                f"{table_bytes / 2**20:9.1f} {index_bytes / 2**20:9.1f}"
+            )
+        finally:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.commit()
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Gunicorn hooks (loaded automatically from the working directory).
+
+Metrics run in prometheus_client's multi-process mode so /metrics, served by
+any worker, reports all workers: each worker writes its samples to
+PROMETHEUS_MULTIPROC_DIR, which is reset when the server starts. This happens
+when this file is loaded, before the app is imported: with `--preload` the
+master imports the app before any server hook runs, and prometheus_client
+picks its value class at import.
+
+With `--preload` the app is imported once by the master and shared by the
+workers copy-on-write; the fork hooks below keep connections and thread pools
+per worker (see app/utils/worker.py). Each worker logs its startup time and
+memory when it is ready.
+"""
+import os
+import shutil
+import tempfile
+
+
+_metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "todo_metrics"))
+shutil.rmtree(_metrics_dir, ignore_errors=True)
+os.makedirs(_metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
+
+
+def pre_fork(server, worker):
+    from app.utils.worker import before_fork
+    before_fork()
+
+
+def post_fork(server, worker):
+    from app.utils.worker import after_fork
+    after_fork()
+
+
+def post_worker_init(worker):
+    from app.utils.worker import worker_ready
+    worker_ready(worker.pid)
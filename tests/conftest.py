@@ -0,0 +1,28 @@
+"""
+Tests run against an in-memory SQLite stand-in of the database, mapped once
+per session by the `db` fixture. Import app modules that touch the models
+(app.db.models, services, app.main) inside fixtures or tests, after `db`.
+"""
+import os
+import pytest
+
+os.environ.setdefault("environment", "test")
+os.environ.setdefault("jwt_secret", "test-jwt-secret-of-at-least-32-bytes")
+os.environ.setdefault("secret_key", "test-secret-key")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-budgets", action="store_true",
+        help="Rewrite tests/query_budgets.json from this run instead of checking it",
+    )
+    parser.addoption(
+        "--startup-budget", type=float,
+        help="Cold start budget in seconds (default: test_startup.STARTUP_BUDGET)",
+    )
+
+
+@pytest.fixture(scope="session")
+def db():
+    from tests.sqlite_standin import use_sqlite_standin
+    return use_sqlite_standin()
@@ -0,0 +1,77 @@
+"""
+In-memory SQLite stand-in of the database, for the tests and the benchmarks.
+
+The models are mapped (tables created) in place of init_db(), which expects
+them to exist, and must be before the app boots. Rows fetched are counted per
+statement for the query budgets (test_query_budget.py).
+"""
+import sqlite3
+from datetime import datetime, timezone
+from pony.orm.dbproviders.sqlite import SQLiteDatetimeConverter, SQLiteProvider
+
+
+class CountingCursor(sqlite3.Cursor):
+    """Adds the rows it fetches to `statement` ([sql, rows]) when one is set."""
+    statement = None
+
+    def _count(self, rows):
+        if self.statement is not None:
+            self.statement[1] += rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        self._count(row is not None)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __next__(self):
+        row = super().__next__()
+        self._count(1)
+        return row
+
+
+class _CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+class _AwareDatetimeConverter(SQLiteDatetimeConverter):
+    """The app stores aware UTC datetimes; SQLite gives them back naive."""
+
+    def sql2py(self, val):
+        val = super().sql2py(val)
+        if isinstance(val, str):
+            val = datetime.fromisoformat(val)
+        return val.replace(tzinfo=timezone.utc) if val.tzinfo is None else val
+
+
+class _Provider(SQLiteProvider):
+    converter_classes = [
+        (py_type, _AwareDatetimeConverter if converter is SQLiteDatetimeConverter else converter)
+        for py_type, converter in SQLiteProvider.converter_classes
+    ]
+
+
+def use_sqlite_standin():
+    from pony.orm import Database
+    import app.db.database as database
+    from app.utils.metrics import instrument_database
+
+    database._db = Database()
+    database._db.bind(provider=_Provider, filename=":memory:", factory=_CountingConnection)
+    database._db.provider_name = "sqlite"  # only set by bind() for providers given by name
+
+    import app.db.models  # noqa: F401
+    database._db.generate_mapping(create_tables=True)
+    instrument_database(database._db)
+    database.init_db = lambda: None
+    return database._db
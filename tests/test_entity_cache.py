@@ -0,0 +1,83 @@
+"""
+Entity cache entries (app/utils/entity_cache.py): signed, so an entry written
+to the shared tier by anyone else is dropped before it is unpickled, and
+without the attributes a repository excludes.
+"""
+import pytest
+from app.utils.cache import MemoryCache
+
+PASSWORD_HASH = "$2b$12$not-a-real-hash-but-secret"
+
+
+@pytest.fixture
+def users(db):
+    from pony.orm import db_session
+    from app.db.models import UserDB
+
+    with db_session:
+        ids = [
+            UserDB(email=f"{name}@cache.example.com", username=None, password=PASSWORD_HASH, full_name=name.title()).id
+            for name in ("ann", "ben")
+        ]
+    yield ids
+    with db_session:
+        for id in ids:
+            UserDB[id].delete()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    from app.db.models import UserDB
+    from app.utils import entity_cache
+
+    monkeypatch.setattr(entity_cache, "_local", MemoryCache())
+    cache = entity_cache.EntityCache(UserDB, ttl=60, exclude=("password",))
+    cache.shared = MemoryCache()
+    return cache
+
+
+def _put(cache, id):
+    from pony.orm import db_session
+    from app.db.models import UserDB
+
+    with db_session:
+        _, generation = cache.get(id)
+        cache.put(UserDB[id], generation)
+    return cache.key(id)
+
+
+def _get(cache, id):
+    from pony.orm import db_session
+    from app.utils import entity_cache
+
+    entity_cache._local.delete(cache.key(id))  # read through the shared tier
+    with db_session:
+        obj, _ = cache.get(id)
+        return obj and (obj.full_name, obj.password)
+
+
+def test_cached_entity_leaves_out_excluded_attributes(users, cache):
+    key = _put(cache, users[0])
+
+    assert PASSWORD_HASH.encode() not in cache.shared.get(key)
+    # Read from the cache, then the password loaded again from the row
+    assert _get(cache, users[0]) == ("Ann", PASSWORD_HASH)
+
+
+def test_tampered_entry_is_dropped(users, cache):
+    key = _put(cache, users[0])
+    cache.shared.set(key, cache.shared.get(key).replace(b"Ann", b"Eve"), 60)
+
+    assert _get(cache, users[0]) is None
+    assert cache.shared.get(key) is None
+
+
+def test_entry_under_another_key_is_dropped(users, cache):
+    ann, ben = users
+    ann_key, ben_key = _put(cache, ann), _put(cache, ben)
+    generation = cache.generation(ben_key)
+    # Ann's signed entry, with the generation Ben's key expects
+    cache.shared.set(ben_key, generation + cache.shared.get(ann_key)[len(generation):], 60)
+
+    assert _get(cache, ben) is None
+    assert _get(cache, ann) == ("Ann", PASSWORD_HASH)
@@ -0,0 +1,235 @@
+"""
+Per-route query budgets.
+
+Boots create_app() against the SQLite stand-in, seeds a few users, a group
+and a page worth of tasks, then calls every registered route once and
+records the SQL statements it issues and the rows it fetches. Each route is
+compared with its budget in query_budgets.json; a route over budget fails
+with a diff of the expected and issued statements, which is usually enough
+to spot an N+1 or a lost prefetch.
+
+When a change adds queries on purpose, rewrite the file from a run and
+commit it:
+
+    python -m pytest tests/test_query_budget.py --update-budgets
+"""
+import difflib
+import json
+import os
+import re
+import pytest
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+
+# Routes that need external services and are not exercised here
+SKIPPED_ROUTES = {
+    "POST /api/user/tasks/{id}/attachments": "object storage",
+    "DELETE /api/user/tasks/{id}/attachments/{attachment_id}": "object storage",
+}
+
+# Statements of the route being measured: [[sql, rows fetched], ...]
+_recording = None
+
+
+def _load_budgets():
+    if not os.path.exists(BUDGET_FILE):
+        return {}
+    with open(BUDGET_FILE) as f:
+        return json.load(f)
+
+
+BUDGETS = _load_budgets()
+
+
+def _normalize_sql(sql: str) -> str:
+    """One line per statement; IN lists of any length compare equal."""
+    sql = " ".join(sql.split())
+    return re.sub(r"IN \((\?(, )?)+\)", "IN (?...)", sql)
+
+
+def _registered_routes(app):
+    routes = set()
+
+    def walk(nodes):
+        for node in nodes:
+            if node.resource is not None:
+                for method, responder in node.method_map.items():
+                    if getattr(responder, "__name__", "").startswith("on_"):
+                        routes.add(f"{method} {node.uri_template}")
+            walk(node.children)
+
+    walk(app._router._roots)
+    return routes
+
+
+class _Session:
+    """Test client that records the statements of the routes it measures."""
+
+    def __init__(self, app):
+        from falcon import testing
+        self.client = testing.TestClient(app)
+        self.results = {}
+        self.failures = []
+
+    def call(self, method, path, token=None, **kwargs):
+        if token:
+            kwargs.setdefault("headers", {})["Authorization"] = f"Bearer {token}"
+        return self.client.simulate_request(method, path, **kwargs)
+
+    def measure(self, method, route, path, token=None, **kwargs):
+        global _recording
+
+        _recording = []
+        try:
+            result = self.call(method, path, token, **kwargs)
+        finally:
+            statements, _recording = _recording, None
+
+        key = f"{method} {route}"
+        if not 200 <= result.status_code < 300:
+            self.failures.append(f"{key}: {result.status} {result.text[:200]}")
+        self.results[key] = {
+            "queries": len(statements),
+            "rows": sum(rows for _, rows in statements),
+            "statements": [sql for sql, _ in statements],
+        }
+        return result
+
+
+def _register_and_login(session, name):
+    email = f"{name}@example.com"
+    session.call("POST", "/api/auth/register", json={
+        "email": email, "password": "password1", "password_confirm": "password1", "username": f"{name}_user", "full_name": name.title(),
+    })
+    data = session.call("POST", "/api/auth/login", json={"identity": email, "password": "password1"}).json["data"]
+    return data["token"], data["id"]
+
+
+def _run_scenario(session):
+    from app.resources.user_resource import PASS_ADMIN
+
+    # Seed: an owner with personal and group tasks, a member, and an outsider
+    owner, owner_id = _register_and_login(session, "owner")
+    member, member_id = _register_and_login(session, "member")
+    outsider, outsider_id = _register_and_login(session, "outsider")
+
+    group_id = session.call("POST", "/api/user/groups", owner, json={"name": "Budget group"}).json["data"]["id"]
+    link = session.call("GET", f"/api/user/groups/{group_id}/invite", owner).json["data"]["link"]
+    invite = link.rsplit("/", 1)[-1]
+    session.call("POST", "/api/user/groups/join", member, json={"token": invite})
+    session.call("POST", f"/api/user/groups/{group_id}/approve", owner, json={"user_id": member_id})
+
+    for i in range(25):
+        session.call("POST", "/api/user/tasks", owner, json={"title": f"Personal task {i}"})
+        session.call("POST", "/api/user/tasks", owner, json={
+            "title": f"Group task {i}", "group_id": group_id, "assigned_to_id": member_id if i % 2 else owner_id,
+        })
+
+    # Measured calls, one per route
+    measure = session.measure
+    measure("GET", "/health", "/health")
+    measure("POST", "/api/auth/register", "/api/auth/register", json={
+        "email": "new@example.com", "password": "password1", "password_confirm": "password1", "username": "new_user", "full_name": "New",
+    })
+    measure("POST", "/api/auth/login", "/api/auth/login", json={"identity": "owner@example.com", "password": "password1"})
+
+    measure("GET", "/api/user/profile", "/api/user/profile", owner)
+    measure("PUT", "/api/user/profile", "/api/user/profile", owner, json={"full_name": "Owner Renamed"})
+    measure("PUT", "/api/user/profile/password", "/api/user/profile/password", outsider, json={
+        "current_password": "password1", "password": "password2",
+    })
+    measure("GET", "/api/admin/users", "/api/admin/users", owner, params={"pass_admin": PASS_ADMIN})
+
+    measure("GET", "/api/user/groups", "/api/user/groups", owner)
+    measure("GET", "/api/user/groups/me", "/api/user/groups/me", owner)
+    extra_id = measure("POST", "/api/user/groups", "/api/user/groups", owner, json={"name": "Extra group"}).json["data"]["id"]
+    measure("GET", "/api/user/groups/{id}", f"/api/user/groups/{group_id}", owner)
+    measure("PUT", "/api/user/groups/{id}", f"/api/user/groups/{group_id}", owner, json={"name": "Budget group 2"})
+    measure("GET", "/api/user/groups/{id}/members", f"/api/user/groups/{group_id}/members", owner)
+    measure("GET", "/api/user/groups/{id}/invite", f"/api/user/groups/{group_id}/invite", owner)
+    measure("GET", "/api/user/groups/preview/{token}", f"/api/user/groups/preview/{invite}", outsider)
+    measure("POST", "/api/user/groups/join", "/api/user/groups/join", outsider, json={"token": invite})
+    measure("POST", "/api/user/groups/{id}/approve", f"/api/user/groups/{group_id}/approve", owner, json={"user_id": outsider_id})
+    measure("GET", "/api/user/groups/{id}/tasks", f"/api/user/groups/{group_id}/tasks", owner)
+    measure("GET", "/api/user/groups/{id}/tasks/counters", f"/api/user/groups/{group_id}/tasks/counters", owner)
+
+    measure("GET", "/api/user/tasks", "/api/user/tasks", owner)
+    measure("GET", "/api/user/tasks/counters", "/api/user/tasks/counters", owner)
+    task_id = measure("POST", "/api/user/tasks", "/api/user/tasks", owner, json={"title": "Measured task", "assigned_to_id": owner_id}).json["data"]["id"]
+    measure("GET", "/api/user/tasks/{id}", f"/api/user/tasks/{task_id}", owner)
+    measure("PUT", "/api/user/tasks/{id}", f"/api/user/tasks/{task_id}", owner, json={
+        "title": "Measured task 2", "description": "updated", "status": "in progress", "assigned_to_id": owner_id,
+    })
+    measure("PATCH", "/api/user/tasks/{id}", f"/api/user/tasks/{task_id}", owner, json={"status": "done"})
+    measure("DELETE", "/api/user/tasks/{id}", f"/api/user/tasks/{task_id}", owner)
+
+    measure("DELETE", "/api/user/groups/{id}/members/{user_id}", f"/api/user/groups/{group_id}/members/{outsider_id}", owner)
+    measure("DELETE", "/api/user/groups/{id}/leave", f"/api/user/groups/{group_id}/leave", member)
+    measure("DELETE", "/api/user/groups/{id}", f"/api/user/groups/{extra_id}", owner)
+    measure("GET", "/metrics", "/metrics")
+
+
+@pytest.fixture(scope="module")
+def update_budgets(request):
+    return request.config.getoption("--update-budgets")
+
+
+@pytest.fixture(scope="module")
+def measured(db, update_budgets):
+    """Run the scenario once. Returns (results by "METHOD /route", failed calls, routes not exercised)."""
+    from app.main import app
+
+    provider = db.provider
+    execute = provider.execute
+
+    def recording_execute(cursor, sql, arguments=None, returning_id=False):
+        if _recording is not None:
+            statement = [_normalize_sql(sql), 0]
+            _recording.append(statement)
+            cursor.statement = statement
+        return execute(cursor, sql, arguments, returning_id)
+
+    provider.execute = recording_execute
+    try:
+        session = _Session(app)
+        _run_scenario(session)
+    finally:
+        provider.execute = execute
+    missing = _registered_routes(app) - set(session.results) - set(SKIPPED_ROUTES)
+
+    if update_budgets and not session.failures:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(dict(sorted(session.results.items())), f, indent=2)
+            f.write("\n")
+    return session.results, session.failures, sorted(missing)
+
+
+def test_calls_succeed(measured):
+    _, failures, _ = measured
+    assert not failures, "\n".join(failures)
+
+
+def test_every_route_is_exercised(measured):
+    _, _, missing = measured
+    assert not missing, f"Not exercised: {', '.join(missing)}"
+
+
+def test_every_route_has_a_budget(measured, update_budgets):
+    results, _, _ = measured
+    new = sorted(set(results) - set(BUDGETS))
+    if update_budgets:
+        pytest.skip("budgets rewritten")
+    assert not new, f"No budget (run with --update-budgets): {', '.join(new)}"
+
+
+@pytest.mark.parametrize("route", sorted(BUDGETS))
+def test_route_within_budget(measured, update_budgets, route):
+    results, _, _ = measured
+    if update_budgets:
+        pytest.skip("budgets rewritten")
+    assert route in results, f"{route} is no longer measured (run with --update-budgets)"
+
+    actual, budget = results[route], BUDGETS[route]
+    diff = "\n".join(difflib.unified_diff(budget["statements"], actual["statements"], "budget", "actual", lineterm=""))
+    assert actual["queries"] <= budget["queries"], f"{actual['queries']} queries, budget {budget['queries']}\n{diff}"
+    assert actual["rows"] <= budget["rows"], f"{actual['rows']} rows fetched, budget {budget['rows']}\n{diff}"
@@ -0,0 +1,45 @@
+"""
+Token buckets of the shared memory store (app/utils/rate_limit.py): shared by
+every store attached to the segment, and refusing a segment of another layout.
+"""
+import os
+from multiprocessing import shared_memory
+import pytest
+from app.utils.rate_limit import RateLimit, SharedMemoryRateLimitStore
+
+
+@pytest.fixture
+def name():
+    name = f"test_rate_limit_{os.getpid()}"
+    yield name
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+def test_buckets_are_shared(name):
+    limit = RateLimit.per_minute(3)
+    first = SharedMemoryRateLimitStore(name=name, slots=16)
+    second = SharedMemoryRateLimitStore(name=name, slots=16)
+
+    assert [first.consume("k", limit).allowed for _ in range(2)] == [True, True]
+    assert [second.consume("k", limit).allowed for _ in range(2)] == [True, False]
+    assert second.consume("other", limit).allowed
+
+
+def test_other_slot_count_is_refused(name):
+    SharedMemoryRateLimitStore(name=name, slots=16)
+    with pytest.raises(ValueError, match="another layout"):
+        SharedMemoryRateLimitStore(name=name, slots=32)
+
+
+def test_segment_without_header_is_refused(name):
+    # e.g. left by a previous version of the store, or by another program
+    segment = shared_memory.SharedMemory(name=name, create=True, size=16 * 24)
+    segment.buf[:8] = (12345).to_bytes(8, "little")
+    segment.close()
+    with pytest.raises(ValueError, match="another layout"):
+        SharedMemoryRateLimitStore(name=name, slots=16)
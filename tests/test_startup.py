@@ -0,0 +1,90 @@
+"""
+Cold start of the app, as a new worker does it.
+
+Each boot runs in a fresh interpreter that imports app.main (which runs
+create_app()) against the SQLite stand-in, so the database connection is the
+only part of a real boot left out. Slower hosts can raise the budget with
+`--startup-budget 1.0`.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import pytest
+
+# Seconds from the first import to create_app() returning, median of the runs
+STARTUP_BUDGET = 0.75
+RUNS = 5
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Subsystems that should only load on first use
+LAZY_MODULES = ("supabase", "rich")
+
+_BOOT = f"""
+import sys, time
+started = time.perf_counter()
+from tests.sqlite_standin import use_sqlite_standin
+use_sqlite_standin()
+import app.main
+print(f"STARTUP {{time.perf_counter() - started:.6f}}")
+print("LOADED", *[m for m in {LAZY_MODULES!r} if m in sys.modules])
+"""
+
+# The OpenAPI document, with the models' schemas generated as routes are
+# decorated (SpecTree's own methods) or with the document (LazySpecTree)
+_SPEC = """
+import json
+from tests.sqlite_standin import use_sqlite_standin
+use_sqlite_standin()
+from spectree import SpecTree
+from app.config.spectree import LazySpecTree, api_spec
+if {eager}:
+    LazySpecTree._add_model = SpecTree._add_model
+    LazySpecTree._generate_spec = SpecTree._generate_spec
+import app.main
+if not hasattr(api_spec, "app"):  # only registered in develop
+    api_spec.register(app.main.app)
+print("SPEC", json.dumps(api_spec.spec, sort_keys=True, default=str))
+"""
+
+
+def _boot(code, *args) -> str:
+    result = subprocess.run([sys.executable, *args, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, f"Boot failed (exit {result.returncode}):\n{result.stderr}"
+    return result.stdout
+
+
+def _line(stdout, prefix) -> str:
+    return re.search(rf"^{prefix} ?(.*)$", stdout, re.M).group(1)
+
+
+@pytest.fixture(scope="module")
+def boots():
+    return [_boot(_BOOT) for _ in range(RUNS)]
+
+
+def test_cold_start_within_budget(boots, request):
+    budget = request.config.getoption("--startup-budget") or STARTUP_BUDGET
+    seconds = [float(_line(stdout, "STARTUP")) for stdout in boots]
+    median = statistics.median(seconds)
+    assert median <= budget, (
+        f"cold start {median:.3f}s over budget {budget:.3f}s "
+        f"(min {min(seconds):.3f}s, max {max(seconds):.3f}s over {RUNS} runs); "
+        f"see python -m benchmarks.import_profile"
+    )
+
+
+def test_lazy_modules_not_loaded_at_boot(boots):
+    loaded = sorted({module for stdout in boots for module in _line(stdout, "LOADED").split()})
+    assert not loaded, f"Loaded at boot, should load on first use: {', '.join(loaded)}"
+
+
+def test_lazy_spec_matches_eager():
+    # LazySpecTree overrides private SpecTree methods: the document must not change
+    lazy = json.loads(_line(_boot(_SPEC.format(eager=False)), "SPEC"))
+    eager = json.loads(_line(_boot(_SPEC.format(eager=True)), "SPEC"))
+    assert lazy["components"]["schemas"], "no model schemas generated"
+    assert lazy == eager
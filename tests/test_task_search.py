@@ -0,0 +1,72 @@
+"""
+Task search (`q`) through TaskRepository.build_query. The rank is a raw SQL
+fragment that names columns by the alias Pony gives the loop variable, so a
+search that runs at all checks the alias; on SQLite it uses the fallback
+phrase match, title hits first.
+"""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def tasks(db):
+    from pony.orm import db_session, flush, rollback
+    from app.db.models import TaskDB
+
+    with db_session:
+        for title, description in [
+            ("Weekly report", "numbers"),
+            ("Groceries", "milk, and the report card"),
+            ("Call mom", ""),
+            ("Deleted report", ""),
+        ]:
+            TaskDB(title=title, description=description, status="todo", attachment=[],
+                   is_deleted=title.startswith("Deleted"))
+        flush()
+        yield
+        rollback()
+
+
+@pytest.fixture(scope="module")
+def repository(db):
+    from app.repositories.task_repository import TaskRepository
+    return TaskRepository()
+
+
+def _titles(repository, q, **extra):
+    filters = [{"field": "q", "value": q}] + [{"field": k, "value": v} for k, v in extra.items()]
+    return [task.title for task in repository.build_query(filters)[:]]
+
+
+def test_alias_is_pony_alias(repository):
+    from pony.orm import db_session, select
+    from app.db.models import TaskDB
+
+    with db_session:
+        sql = select(t for t in TaskDB).get_sql()
+    assert f'FROM "tasks" "{repository.sql_alias}"' in sql
+
+
+def test_search_ranks_title_hits_first(tasks, repository):
+    from pony.orm import db_session
+
+    with db_session:
+        assert _titles(repository, "Report") == ["Weekly report", "Groceries"]
+        assert _titles(repository, "  mom ") == ["Call mom"]
+        assert _titles(repository, "nothing") == []
+
+
+def test_search_with_other_filters(tasks, repository):
+    from pony.orm import db_session
+
+    with db_session:
+        assert _titles(repository, "report", status="done") == []
+        assert _titles(repository, "report", status="todo") == ["Weekly report", "Groceries"]
+
+
+def test_blank_search_is_ignored(tasks, repository):
+    from pony.orm import db_session
+
+    with db_session:
+        titles = _titles(repository, "  ")  # other modules may have committed tasks too
+    assert {"Call mom", "Groceries", "Weekly report"} <= set(titles)
+    assert "Deleted report" not in titles